@@ -3,21 +3,35 @@ Data Analysis Agent using LLaMA
 Specialized for business data analysis
 """
 
-from typing import Dict, List, Any
+import asyncio
+import os
+from typing import Dict, List, Any, Optional
 from .llama_agent import get_llama_agent
+from app.core.singleflight import SingleFlight, flight_key
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Concurrency limit and overall deadline for the async LLM fan-out
+ANALYSIS_MAX_CONCURRENCY = int(os.getenv("ANALYSIS_MAX_CONCURRENCY", "4"))
+ANALYSIS_DEADLINE_SECONDS = float(os.getenv("ANALYSIS_DEADLINE_SECONDS", "45"))
+
 class AnalysisAgent:
     """Specialized agent for data analysis"""
     
     def __init__(self):
         self.agent = get_llama_agent()
+        # Identical analyses requested at the same time (a dashboard opened by
+        # many managers at once) share one set of LLM calls
+        self.flights = SingleFlight("analysis")
     
     def analyze_department_performance(self, department: str, kpis: List[Dict], chart_data: List[Dict]) -> Dict[str, Any]:
         """
-        Comprehensive department analysis
+        Comprehensive department analysis, one LLM call after another
+        
+        Blocking, for scripts without an event loop; async code (request and
+        job handlers) awaits ``analyze_department_performance_async``. Failed
+        LLM calls fall back per section as in the async variant.
         
         Args:
             department: Department name
@@ -26,47 +40,131 @@ class AnalysisAgent:
             
         Returns:
             Complete analysis with insights and recommendations
+            
+        Raises:
+            RuntimeError: If called from a running event loop
         """
         try:
-            # Prepare context
-            context = {
-                "department": department,
-                "kpis": kpis,
-                "chart_data": chart_data,
-                "analysis_type": "comprehensive_performance_review"
-            }
-            
-            # Generate summary
-            summary = self.agent.generate_report_summary(context, department)
-            
-            # Analyze trends
-            trends = self.agent.analyze_trends(chart_data)
-            
-            # Detect anomalies
-            anomalies = self.agent.detect_anomalies(chart_data, "performance")
-            
-            # Generate recommendations
-            recommendations = self.agent.generate_recommendations(context)
-            
-            return {
-                "summary": summary,
-                "trends": trends,
-                "anomalies": anomalies,
-                "recommendations": recommendations,
-                "kpis": kpis,
-                "chart_data": chart_data
-            }
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError(
+                "analyze_department_performance blocks; await "
+                "analyze_department_performance_async inside an event loop"
+            )
+        
+        async def run():
+            try:
+                return await self.analyze_department_performance_async(
+                    department, kpis, chart_data, max_concurrency=1
+                )
+            finally:
+                # The pooled connections belong to this short-lived event loop
+                await self.agent.client.aclose()
+        
+        return asyncio.run(run())
+    
+    async def analyze_department_performance_async(self, department: str, kpis: List[Dict],
+                                                   chart_data: List[Dict],
+                                                   max_concurrency: Optional[int] = None,
+                                                   deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Comprehensive department analysis with the LLM calls issued concurrently
+        
+        The summary, trend, anomaly and recommendation prompts are independent,
+        so they run in parallel. Calls still running when the deadline expires
+        are abandoned and replaced with fallback values.
+        
+        Args:
+            department: Department name
+            kpis: Key performance indicators
+            chart_data: Time series data
+            max_concurrency: Max simultaneous LLM calls for this request
+            deadline: Overall time budget in seconds
             
-        except Exception as e:
-            logger.error(f"Analysis error: {str(e)}")
-            return {
-                "summary": f"{department} performance analysis completed",
-                "trends": {"trend": "stable"},
-                "anomalies": [],
-                "recommendations": ["Continue monitoring"],
-                "kpis": kpis,
-                "chart_data": chart_data
-            }
+        Returns:
+            Complete analysis; ``partial`` and ``timed_out`` are set when
+            some calls did not finish in time
+        """
+        context = self._build_context(department, kpis, chart_data)
+        semaphore = asyncio.Semaphore(max_concurrency or ANALYSIS_MAX_CONCURRENCY)
+        
+        async def run(fn, *args):
+            async with semaphore:
+                return await fn(*args)
+        
+        tasks = {
+            "summary": asyncio.ensure_future(run(self.agent.generate_report_summary, context, department)),
+            "trends": asyncio.ensure_future(run(self.agent.analyze_trends, chart_data)),
+            "anomalies": asyncio.ensure_future(run(self.agent.detect_anomalies, chart_data, "performance")),
+            "recommendations": asyncio.ensure_future(run(self.agent.generate_recommendations, context)),
+        }
+        
+        done, pending = await asyncio.wait(
+            tasks.values(),
+            timeout=deadline if deadline is not None else ANALYSIS_DEADLINE_SECONDS
+        )
+        for task in pending:
+            task.cancel()
+        
+        fallback = self._fallback_analysis(department, kpis, chart_data)
+        result = {}
+        timed_out = []
+        for name, task in tasks.items():
+            if task not in done:
+                timed_out.append(name)
+                result[name] = fallback[name]
+            elif task.exception() is not None:
+                logger.error(f"Analysis error in {name}: {str(task.exception())}")
+                result[name] = fallback[name]
+            else:
+                result[name] = task.result()
+        
+        result["kpis"] = kpis
+        result["chart_data"] = chart_data
+        if timed_out:
+            logger.warning(f"⏱️ Analysis deadline hit for {department}, missing: {', '.join(timed_out)}")
+            result["partial"] = True
+            result["timed_out"] = timed_out
+        
+        return result
+    
+    async def analyze_department_performance_shared(self, department: str, kpis: List[Dict],
+                                                    chart_data: List[Dict]) -> Dict[str, Any]:
+        """
+        ``analyze_department_performance_async``, coalesced across concurrent callers
+        
+        Requests for the same department and KPI data that arrive while an
+        analysis is running wait for it instead of starting their own.
+        
+        Returns:
+            The analysis, shared between the coalesced callers (read-only)
+        """
+        key = flight_key(department, kpis, chart_data)
+        return await self.flights.do(
+            key, lambda: self.analyze_department_performance_async(department, kpis, chart_data)
+        )
+    
+    def _build_context(self, department: str, kpis: List[Dict], chart_data: List[Dict]) -> Dict[str, Any]:
+        """Context shared by the summary and recommendation prompts"""
+        return {
+            "department": department,
+            "kpis": kpis,
+            "chart_data": chart_data,
+            "analysis_type": "comprehensive_performance_review"
+        }
+    
+    def _fallback_analysis(self, department: str, kpis: List[Dict], chart_data: List[Dict]) -> Dict[str, Any]:
+        """Fallback analysis if the agent fails"""
+        return {
+            "summary": f"{department} performance analysis completed",
+            "trends": {"trend": "stable"},
+            "anomalies": [],
+            "recommendations": ["Continue monitoring"],
+            "kpis": kpis,
+            "chart_data": chart_data
+        }
 
 # Singleton
 _analysis_agent = None
@@ -75,4 +173,4 @@ def get_analysis_agent() -> AnalysisAgent:
     global _analysis_agent
     if _analysis_agent is None:
         _analysis_agent = AnalysisAgent()
-    return _analysis_agent
\ No newline at end of file
+    return _analysis_agent
@@ -0,0 +1,267 @@
+"""
+Conversation memory
+Bounded per-session chat history for LlamaAgent: a window of recent turns plus a running summary
+"""
+
+import os
+import threading
+import time
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from .prompt_builder import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Most recent question/answer pairs sent verbatim with a follow-up query
+CONVERSATION_WINDOW_TURNS = int(os.getenv("CONVERSATION_WINDOW_TURNS", "4"))
+# Token cap of the running summary of turns that left the window
+CONVERSATION_SUMMARY_TOKENS = int(os.getenv("CONVERSATION_SUMMARY_TOKENS", "300"))
+CONVERSATION_MAX_SESSIONS = int(os.getenv("CONVERSATION_MAX_SESSIONS", "5000"))
+CONVERSATION_TTL_SECONDS = float(os.getenv("CONVERSATION_TTL_SECONDS", "3600"))
+# "memory" keeps sessions in this process; "mongo" also persists them so a
+# session survives restarts and can move between workers
+CONVERSATION_BACKEND = os.getenv("CONVERSATION_BACKEND", "memory").lower()
+CONVERSATION_COLLECTION = os.getenv("CONVERSATION_COLLECTION", "conversations")
+
+# Characters of each side of a turn kept in its summary line
+SUMMARY_QUESTION_CHARS = 120
+SUMMARY_ANSWER_CHARS = 200
+
+
+def _first_sentence(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    end = text.find(". ")
+    if 0 < end < limit:
+        return text[:end + 1]
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+
+@dataclass
+class Conversation:
+    """One session: recent turns verbatim, older ones as summary lines"""
+    turns: List[Dict[str, str]] = field(default_factory=list)
+    summary: List[str] = field(default_factory=list)
+    updated_at: float = field(default_factory=time.time)
+
+    def to_doc(self) -> Dict[str, Any]:
+        return {"turns": self.turns, "summary": self.summary}
+
+    @classmethod
+    def from_doc(cls, doc: Dict[str, Any]) -> "Conversation":
+        return cls(turns=list(doc.get("turns", [])), summary=list(doc.get("summary", [])))
+
+
+class MongoConversationStore:
+    """
+    Sessions in a MongoDB collection, expired by a TTL index on ``updated_at``
+
+    Uses the synchronous pymongo driver; LlamaAgent calls it on the
+    blocking-I/O executor so the event loop never waits on MongoDB.
+    """
+
+    def __init__(self, collection=None, ttl_seconds: float = CONVERSATION_TTL_SECONDS):
+        if collection is None:
+            from pymongo import MongoClient
+            client = MongoClient(os.getenv("MONGODB_URI"), serverSelectionTimeoutMS=2000)
+            collection = client[os.getenv("MONGODB_DB_NAME", "report_generator")][CONVERSATION_COLLECTION]
+            collection.create_index("updated_at", expireAfterSeconds=int(ttl_seconds))
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+
+    def load(self, key: str) -> Optional[Conversation]:
+        doc = self.collection.find_one({"_id": key})
+        if not doc or doc["updated_at"] <= datetime.utcnow() - timedelta(seconds=self.ttl_seconds):
+            return None
+        return Conversation.from_doc(doc)
+
+    def save(self, key: str, conversation: Conversation) -> None:
+        self.collection.update_one(
+            {"_id": key},
+            {"$set": {**conversation.to_doc(), "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+
+    def delete(self, key: str) -> None:
+        self.collection.delete_one({"_id": key})
+
+
+class ConversationMemory:
+    """
+    LRU + TTL map of session key -> Conversation
+
+    Each session keeps its last ``window_turns`` question/answer pairs. Turns
+    pushed out of the window become one-line extractive summaries (question
+    plus the first sentence of the answer) with no extra LLM call; the
+    oldest lines are dropped once the summary exceeds ``summary_tokens``.
+    Memory per session and the number of sessions are both bounded.
+    """
+
+    def __init__(self, window_turns: int = CONVERSATION_WINDOW_TURNS,
+                 summary_tokens: int = CONVERSATION_SUMMARY_TOKENS,
+                 max_sessions: int = CONVERSATION_MAX_SESSIONS,
+                 ttl_seconds: float = CONVERSATION_TTL_SECONDS,
+                 store=None):
+        self.window_turns = window_turns
+        self.summary_tokens = summary_tokens
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        self._sessions: "OrderedDict[str, Conversation]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+        self.store_errors = 0
+
+    def _get(self, key: str) -> Optional[Conversation]:
+        """Live conversation for a session, loading it from the store on a local miss"""
+        with self._lock:
+            conversation = self._sessions.get(key)
+            if conversation is not None:
+                if time.time() - conversation.updated_at <= self.ttl_seconds:
+                    self._sessions.move_to_end(key)
+                    return conversation
+                del self._sessions[key]
+                self.expirations += 1
+
+        if self.store is None:
+            return None
+        try:
+            conversation = self.store.load(key)
+        except Exception as e:
+            self.store_errors += 1
+            logger.warning(f"⚠️ Conversation store read failed: {str(e)}")
+            return None
+        if conversation is not None:
+            with self._lock:
+                self._remember(key, conversation)
+        return conversation
+
+    def _remember(self, key: str, conversation: Conversation) -> None:
+        self._sessions[key] = conversation
+        self._sessions.move_to_end(key)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evictions += 1
+
+    def history(self, key: Optional[str]) -> List[Dict[str, str]]:
+        """
+        Chat messages to send ahead of a follow-up question
+
+        Args:
+            key: Session key (None for a one-off query)
+
+        Returns:
+            An optional system message with the summary of earlier turns,
+            then the recent turns as user/assistant messages
+        """
+        if not key:
+            return []
+        conversation = self._get(key)
+        if conversation is None:
+            return []
+        with self._lock:
+            messages = []
+            if conversation.summary:
+                messages.append({
+                    "role": "system",
+                    "content": "Earlier in this conversation:\n" + "\n".join(conversation.summary)
+                })
+            for turn in conversation.turns:
+                messages.append({"role": "user", "content": turn["user"]})
+                messages.append({"role": "assistant", "content": turn["assistant"]})
+            return messages
+
+    def append(self, key: Optional[str], user: str, assistant: str) -> None:
+        """Record a question and the answer given, folding old turns into the summary"""
+        if not key:
+            return
+        conversation = self._get(key) or Conversation()
+        with self._lock:
+            conversation.turns.append({"user": user, "assistant": assistant})
+            while len(conversation.turns) > self.window_turns:
+                old = conversation.turns.pop(0)
+                conversation.summary.append(
+                    f"- Q: {_first_sentence(old['user'], SUMMARY_QUESTION_CHARS)} "
+                    f"A: {_first_sentence(old['assistant'], SUMMARY_ANSWER_CHARS)}"
+                )
+            while len(conversation.summary) > 1 and \
+                    estimate_tokens("\n".join(conversation.summary)) > self.summary_tokens:
+                conversation.summary.pop(0)
+            conversation.updated_at = time.time()
+            self._remember(key, conversation)
+            snapshot = Conversation(list(conversation.turns), list(conversation.summary))
+
+        if self.store is not None:
+            try:
+                self.store.save(key, snapshot)
+            except Exception as e:
+                self.store_errors += 1
+                logger.warning(f"⚠️ Conversation store write failed: {str(e)}")
+
+    def clear(self, key: str) -> None:
+        """Forget a session everywhere"""
+        with self._lock:
+            self._sessions.pop(key, None)
+        if self.store is not None:
+            try:
+                self.store.delete(key)
+            except Exception as e:
+                self.store_errors += 1
+                logger.warning(f"⚠️ Conversation store delete failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions = len(self._sessions)
+            turns = sum(len(c.turns) for c in self._sessions.values())
+        return {
+            "backend": type(self.store).__name__ if self.store is not None else "memory",
+            "sessions": sessions,
+            "max_sessions": self.max_sessions,
+            "window_turns": self.window_turns,
+            "turns_in_window": turns,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "store_errors": self.store_errors,
+        }
+
+
+def session_key(user_id: str, session_id: Optional[str]) -> Optional[str]:
+    """
+    Sessions are scoped to their user so ids can't be used across accounts
+
+    Returns:
+        Session key, or None when no session id was given (a one-off query
+        with no history, whose answers the LLM cache can share)
+    """
+    if not session_id:
+        return None
+    return f"{user_id}:{session_id}"
+
+
+# ============================================================================
+# Singleton instance
+# ============================================================================
+
+_conversation_memory: Optional[ConversationMemory] = None
+
+
+def get_conversation_memory() -> ConversationMemory:
+    """Get or create the process-wide conversation memory"""
+    global _conversation_memory
+    if _conversation_memory is None:
+        store = None
+        if CONVERSATION_BACKEND == "mongo":
+            try:
+                store = MongoConversationStore()
+            except Exception as e:
+                logger.warning(f"⚠️ Conversation store unavailable, using memory only: {str(e)}")
+        _conversation_memory = ConversationMemory(store=store)
+    return _conversation_memory
@@ -0,0 +1,310 @@
+"""
+Groq API client
+Pooled async chat-completions client with retries, Retry-After aware backoff and a token-bucket rate limiter
+"""
+
+import asyncio
+import email.utils
+import json
+import os
+import random
+import threading
+import time
+import weakref
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .prompt_builder import estimate_message_tokens
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com")
+GROQ_CONNECT_TIMEOUT_SECONDS = float(os.getenv("GROQ_CONNECT_TIMEOUT_SECONDS", "5"))
+GROQ_READ_TIMEOUT_SECONDS = float(os.getenv("GROQ_READ_TIMEOUT_SECONDS", "60"))
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "32"))
+GROQ_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", "16"))
+GROQ_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("GROQ_KEEPALIVE_EXPIRY_SECONDS", "30"))
+
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "4"))
+GROQ_RETRY_BASE_SECONDS = float(os.getenv("GROQ_RETRY_BASE_SECONDS", "0.5"))
+# Longest single wait; a Retry-After beyond this fails the call instead
+GROQ_RETRY_MAX_SECONDS = float(os.getenv("GROQ_RETRY_MAX_SECONDS", "20"))
+
+# Client-side limits matched to the Groq plan; set 0 to disable one. Requests
+# default to the free-tier quota (30/min); set both to your plan's values.
+GROQ_REQUESTS_PER_MINUTE = float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+GROQ_TOKENS_PER_MINUTE = float(os.getenv("GROQ_TOKENS_PER_MINUTE", "0"))
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class GroqAPIError(RuntimeError):
+    """Non-retryable (or retries exhausted) error response from Groq"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Groq API error {status_code}: {message}")
+        self.status_code = status_code
+
+
+class GroqRateLimitError(GroqAPIError):
+    """429 that could not be retried within the configured wait limit"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at ``rate_per_minute``
+
+    ``acquire`` reserves capacity up front (the balance may go negative) and
+    sleeps until the reservation is covered, so waiters are served in
+    arrival order without a lock held across ``await``. Safe to share
+    between event loops and threads.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def reserve(self, cost: float = 1.0) -> float:
+        """Take ``cost`` tokens; returns the seconds to wait before using them"""
+        if not self.enabled:
+            return 0.0
+        cost = min(cost, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= cost
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller back for ``seconds`` (after an upstream 429)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self, cost: float = 1.0) -> float:
+        wait = self.reserve(cost)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class GroqClient:
+    """
+    Async client for Groq's OpenAI-compatible chat completions API
+
+    One pooled ``httpx.AsyncClient`` (keep-alive, connection limits,
+    connect/read timeouts) is kept per event loop. Requests pass through
+    request and token buckets, and retryable failures (429, 5xx, transport
+    errors) are retried with full-jitter exponential backoff, waiting at
+    least as long as the server's Retry-After.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 max_retries: int = GROQ_MAX_RETRIES,
+                 retry_base: float = GROQ_RETRY_BASE_SECONDS,
+                 retry_max: float = GROQ_RETRY_MAX_SECONDS,
+                 requests_per_minute: float = GROQ_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = GROQ_TOKENS_PER_MINUTE,
+                 connect_timeout: float = GROQ_CONNECT_TIMEOUT_SECONDS,
+                 read_timeout: float = GROQ_READ_TIMEOUT_SECONDS):
+        self.api_key = api_key or os.getenv("GROQ_API_KEY")
+        self.base_url = (base_url or os.getenv("GROQ_BASE_URL") or GROQ_BASE_URL).rstrip("/")
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self._stats = {"requests": 0, "retries": 0, "rate_limited": 0, "failures": 0,
+                       "throttle_wait_seconds": 0.0, "backoff_wait_seconds": 0.0}
+
+    def _http(self):
+        """Pooled HTTP client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            import httpx
+            client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(max_connections=GROQ_MAX_CONNECTIONS,
+                                    max_keepalive_connections=GROQ_MAX_KEEPALIVE_CONNECTIONS,
+                                    keepalive_expiry=GROQ_KEEPALIVE_EXPIRY_SECONDS)
+            )
+            self._clients[loop] = client
+        return client
+
+    async def _throttle(self, payload: Dict[str, Any]) -> None:
+        waited = await self.request_bucket.acquire()
+        if self.token_bucket.enabled:
+            cost = estimate_message_tokens(payload["messages"]) + payload.get("max_tokens", 0)
+            waited += await self.token_bucket.acquire(cost)
+        self._stats["throttle_wait_seconds"] += waited
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        delay = random.uniform(0, min(self.retry_max, self.retry_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def _send(self, payload: Dict[str, Any], stream: bool):
+        """POST with throttling and retries; returns an open response with a 2xx status"""
+        import httpx
+
+        http = self._http()
+        attempt = 0
+        while True:
+            await self._throttle(payload)
+            self._stats["requests"] += 1
+            retry_after = None
+            try:
+                request = http.build_request("POST", "/openai/v1/chat/completions", json=payload)
+                response = await http.send(request, stream=stream)
+            except (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError) as e:
+                error = GroqAPIError(0, f"{type(e).__name__}: {str(e) or 'transport error'}")
+            else:
+                if response.status_code < 400:
+                    return response
+                body = (await response.aread()).decode("utf-8", "replace")
+                await response.aclose()
+                retry_after = parse_retry_after(response.headers.get("retry-after"))
+                if response.status_code == 429:
+                    self._stats["rate_limited"] += 1
+                    error = GroqRateLimitError(429, body[:500])
+                    if retry_after:
+                        # Everyone else on this key is limited too
+                        self.request_bucket.pause(retry_after)
+                else:
+                    error = GroqAPIError(response.status_code, body[:500])
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    self._stats["failures"] += 1
+                    raise error
+
+            if attempt >= self.max_retries or (retry_after or 0) > self.retry_max:
+                self._stats["failures"] += 1
+                raise error
+            delay = self._backoff(attempt, retry_after)
+            attempt += 1
+            self._stats["retries"] += 1
+            self._stats["backoff_wait_seconds"] += delay
+            logger.warning(f"🔁 Groq request failed ({str(error)[:80]}), retry {attempt} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _payload(messages: List[Dict[str, str]], model: str, temperature: float,
+                 max_tokens: int, response_format: Optional[Dict[str, str]], stream: bool) -> Dict[str, Any]:
+        payload = {"model": model, "messages": messages,
+                   "temperature": temperature, "max_tokens": max_tokens}
+        if response_format:
+            payload["response_format"] = response_format
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    async def chat(self, messages: List[Dict[str, str]], model: str, temperature: float,
+                   max_tokens: int, response_format: Optional[Dict[str, str]] = None) -> str:
+        """
+        Run one chat completion
+
+        Args:
+            messages: Chat messages
+            model: Groq model name
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            response_format: e.g. ``{"type": "json_object"}``
+
+        Returns:
+            Message content of the first choice
+        """
+        payload = self._payload(messages, model, temperature, max_tokens, response_format, False)
+        response = await self._send(payload, stream=False)
+        data = response.json()
+        return data["choices"][0]["message"]["content"] or ""
+
+    async def stream_chat(self, messages: List[Dict[str, str]], model: str, temperature: float,
+                          max_tokens: int) -> AsyncIterator[str]:
+        """
+        Run a streaming chat completion
+
+        Retries apply until the response starts; a stream that breaks midway
+        raises instead of replaying tokens already yielded.
+
+        Yields:
+            Content deltas as they arrive
+        """
+        payload = self._payload(messages, model, temperature, max_tokens, None, True)
+        response = await self._send(payload, stream=True)
+        try:
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                if chunk.get("choices"):
+                    content = chunk["choices"][0].get("delta", {}).get("content")
+                    if content:
+                        yield content
+        finally:
+            await response.aclose()
+
+    async def aclose(self) -> None:
+        """Close the pooled client of the running event loop"""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["throttle_wait_seconds"] = round(stats["throttle_wait_seconds"], 3)
+        stats["backoff_wait_seconds"] = round(stats["backoff_wait_seconds"], 3)
+        stats["requests_per_minute"] = self.request_bucket.rate * 60
+        stats["tokens_per_minute"] = self.token_bucket.rate * 60
+        return stats
+
+
+# ============================================================================
+# Singleton instance
+# ============================================================================
+
+_groq_client: Optional[GroqClient] = None
+
+
+def get_groq_client() -> GroqClient:
+    """Get or create the process-wide Groq client"""
+    global _groq_client
+    if _groq_client is None:
+        _groq_client = GroqClient()
+    return _groq_client
@@ -4,18 +4,83 @@ Autonomous report generation and analysis
 """
 
 import os
-from typing import Dict, List, Any, Optional
-from groq import Groq
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain_groq import ChatGroq
-from langchain.prompts import PromptTemplate
-from langchain.tools import Tool
-from langchain.memory import ConversationBufferMemory
+from functools import cached_property
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 import logging
 import json
 
+# langchain and jsonschema are imported on first use: together they
+# account for most of the API's cold-start import time
+
+from .llm_cache import cache_key, get_llm_cache
+from .prompt_builder import get_prompt_builder
+from .conversation_memory import get_conversation_memory
+from .groq_client import get_groq_client
+from app.core.executors import run_blocking_io
+
 logger = logging.getLogger(__name__)
 
+# process_query asks for answer, insights and recommendations in one JSON completion
+QUERY_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "answer": {"type": "string", "minLength": 1},
+        "insights": {"type": "array", "items": {"type": "string"}},
+        "recommendations": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["answer", "insights", "recommendations"]
+}
+
+QUERY_RESPONSE_FORMAT = """Respond with only a JSON object in this format:
+{
+    "answer": "direct answer to the question in 2-3 sentences",
+    "insights": ["up to 3 key insights supported by the data"],
+    "recommendations": ["3-5 specific, actionable recommendations"]
+}"""
+
+# Streamed queries put the prose answer first so it can be relayed token by
+# token; insights and recommendations follow the marker as JSON
+QUERY_STREAM_MARKER = "###JSON"
+
+QUERY_STREAM_FORMAT = f"""Write the answer to the question first, as 2-3 sentences of plain text.
+Then write a line containing only {QUERY_STREAM_MARKER} followed by a JSON object in this format:
+{{
+    "insights": ["up to 3 key insights supported by the data"],
+    "recommendations": ["3-5 specific, actionable recommendations"]
+}}"""
+
+QUERY_STREAM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "insights": QUERY_RESPONSE_SCHEMA["properties"]["insights"],
+        "recommendations": QUERY_RESPONSE_SCHEMA["properties"]["recommendations"]
+    },
+    "required": ["insights", "recommendations"]
+}
+
+DEFAULT_INSIGHTS = [
+    "Performance metrics show positive trends",
+    "Key indicators within expected ranges",
+    "Opportunities for optimization identified"
+]
+
+
+def _partial_marker_length(text: str) -> int:
+    """Length of the longest suffix of ``text`` that starts QUERY_STREAM_MARKER"""
+    for length in range(min(len(text), len(QUERY_STREAM_MARKER) - 1), 0, -1):
+        if text.endswith(QUERY_STREAM_MARKER[:length]):
+            return length
+    return 0
+
+
+class ResponseFormatError(ValueError):
+    """A completion did not parse into the requested format; keeps the raw text"""
+    
+    def __init__(self, message: str, text: str):
+        super().__init__(message)
+        self.text = text
+
+
 class LlamaAgent:
     """
     LLaMA 3.1 Intelligent Agent
@@ -28,34 +93,113 @@ class LlamaAgent:
         if not self.api_key:
             raise ValueError("GROQ_API_KEY not found. Get free key at https://console.groq.com/")
         
-        # Initialize Groq client
-        self.client = Groq(api_key=self.api_key)
         self.model = os.getenv("GROQ_MODEL", "llama-3.1-70b-versatile")
         self.temperature = float(os.getenv("AGENT_TEMPERATURE", "0.7"))
         self.max_tokens = int(os.getenv("AGENT_MAX_TOKENS", "2000"))
+        # Ask Groq for JSON mode on structured calls (disable for models without it)
+        self.json_mode = os.getenv("AGENT_JSON_MODE", "true").lower() == "true"
+        self.cache = get_llm_cache()
+        self.prompts = get_prompt_builder()
+        # Per-session history; bounded, never shared between users
+        self.conversations = get_conversation_memory()
         
-        # Initialize LangChain agent
-        self.llm = ChatGroq(
+        logger.info(f"✅ LLaMA Agent initialized with model: {self.model}")
+    
+    def generation_settings(self) -> Dict[str, Any]:
+        """Settings that shape generated text (part of report dedup fingerprints)"""
+        return {
+            "model": self.model,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "json_mode": self.json_mode,
+            "prompt_budgets": self.prompts.budgets
+        }
+
+    @cached_property
+    def client(self):
+        """Shared pooled Groq client (rate limits are per API key, not per agent)"""
+        return get_groq_client()
+    
+    @cached_property
+    def llm(self):
+        """LangChain chat model (not used on request paths)"""
+        from langchain_groq import ChatGroq
+        return ChatGroq(
             groq_api_key=self.api_key,
             model_name=self.model,
             temperature=self.temperature
         )
+    
+    async def _complete(self, method: str, messages: List[Dict[str, str]],
+                        temperature: float, max_tokens: int,
+                        parse: Optional[Callable[[str], Any]] = None,
+                        json_mode: bool = False) -> Any:
+        """
+        Run a chat completion through the LLM response cache
         
-        # Memory for conversation
-        self.memory = ConversationBufferMemory(
-            memory_key="chat_history",
-            return_messages=True
-        )
+        Args:
+            method: Calling method name (selects the cache TTL / opt-out)
+            messages: Chat messages
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            parse: Optional parser applied to the text; completions it rejects
+                are not cached and raise ``ResponseFormatError``
+            json_mode: Request a JSON object response from Groq
+            
+        Returns:
+            Completion text (or ``parse(text)``), from the cache when an
+            identical request was seen
+        """
+        key = cache_key(self.model, temperature, max_tokens, messages)
+        cached = await self._offload(self.cache, self.cache.get, method, key)
+        if cached is not None:
+            logger.info(f"⚡ LLM cache hit: {method}")
+            return self._apply_parser(parse, cached)
         
-        logger.info(f"✅ LLaMA Agent initialized with model: {self.model}")
+        self.prompts.record(method, messages)
+        text = await self.client.chat(
+            messages,
+            model=self.model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format={"type": "json_object"} if json_mode and self.json_mode else None
+        )
+        result = self._apply_parser(parse, text)
+        await self._offload(self.cache, self.cache.set, method, key, text)
+        return result
+    
+    @staticmethod
+    async def _offload(owner: Any, fn: Callable[..., Any], *args) -> Any:
+        """Call ``fn`` inline when ``owner`` is memory-only, else on the I/O pool (Mongo/disk)"""
+        if owner.store is None:
+            return fn(*args)
+        return await run_blocking_io(fn, *args)
     
-    def process_query(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def _history(self, session: Optional[str]) -> List[Dict[str, str]]:
+        """Recent turns of ``session`` (none for a one-off query)"""
+        if not session:
+            return []
+        return await self._offload(self.conversations, self.conversations.history, session)
+    
+    @staticmethod
+    def _apply_parser(parse: Optional[Callable[[str], Any]], text: str) -> Any:
+        if parse is None:
+            return text
+        try:
+            return parse(text)
+        except Exception as e:
+            raise ResponseFormatError(str(e), text) from e
+    
+    async def process_query(self, query: str, context: Dict[str, Any],
+                            session: Optional[str] = None) -> Dict[str, Any]:
         """
         Process natural language query with context
         
         Args:
             query: User's question
             context: Department data, KPIs, metrics
+            session: Conversation session key; its recent history is sent
+                along and the answer is added to it
             
         Returns:
             Dict with answer, insights, recommendations, chart_data
@@ -65,25 +209,28 @@ class LlamaAgent:
             system_prompt = self._build_system_prompt(context)
             
             # Create messages
+            history = await self._history(session)
             messages = [
                 {"role": "system", "content": system_prompt},
+                *history,
                 {"role": "user", "content": query}
             ]
             
-            # Call Groq API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
-            )
-            
-            # Parse response
-            result = self._parse_response(
-                response.choices[0].message.content,
-                context
-            )
+            # One completion carries answer, insights and recommendations
+            try:
+                result = await self._complete("process_query", messages,
+                                              self.temperature, self.max_tokens,
+                                              parse=self._parse_structured_response,
+                                              json_mode=True)
+                result["chart_data"] = context.get('chart_data', None)
+            except ResponseFormatError as e:
+                # Free-text answer: parse it and ask for recommendations separately
+                logger.warning(f"⚠️ Structured query response invalid, falling back: {str(e)}")
+                result = await self._parse_response(e.text, context)
             
+            if session:
+                await self._offload(self.conversations, self.conversations.append,
+                                    session, query, result["answer"])
             logger.info(f"✅ Query processed: {query[:50]}...")
             return result
             
@@ -91,7 +238,89 @@ class LlamaAgent:
             logger.error(f"❌ Query processing error: {str(e)}")
             return self._fallback_response(query)
     
-    def generate_report_summary(self, data: Dict[str, Any], department: str) -> str:
+    async def stream_query(self, query: str, context: Dict[str, Any],
+                           session: Optional[str] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Process natural language query, relaying the answer as it is generated
+        
+        Args:
+            query: User's question
+            context: Department data, KPIs, metrics
+            session: Conversation session key (see ``process_query``)
+            
+        Yields:
+            ``("token", text)`` pieces of the answer as they arrive, then one
+            ``("result", dict)`` with answer, insights, recommendations, chart_data
+        """
+        history = await self._history(session)
+        messages = [
+            {"role": "system", "content": self._build_system_prompt(context, QUERY_STREAM_FORMAT)},
+            *history,
+            {"role": "user", "content": query}
+        ]
+        key = cache_key(self.model, self.temperature, self.max_tokens, messages)
+        cached = await self._offload(self.cache, self.cache.get, "process_query_stream", key)
+        
+        text = ""
+        sent = 0
+        try:
+            if cached is not None:
+                logger.info("⚡ LLM cache hit: process_query_stream")
+                deltas = self._replay(cached)
+            else:
+                self.prompts.record("process_query_stream", messages)
+                deltas = self.client.stream_chat(messages, model=self.model,
+                                                 temperature=self.temperature,
+                                                 max_tokens=self.max_tokens)
+            
+            async for delta in deltas:
+                text += delta
+                # Relay the answer up to the marker, holding back a possibly split marker
+                end = text.find(QUERY_STREAM_MARKER)
+                if end == -1:
+                    end = len(text) - _partial_marker_length(text)
+                if end > sent:
+                    yield "token", text[sent:end]
+                    sent = end
+        except Exception as e:
+            logger.error(f"❌ Query streaming error: {str(e)}")
+            result = self._fallback_response(query)
+            if sent:
+                result["answer"] = self._clean_ai_response(text[:sent])
+            yield "result", result
+            return
+        
+        import jsonschema
+        
+        answer, marker, tail = text.partition(QUERY_STREAM_MARKER)
+        if not marker and len(text) > sent:
+            yield "token", text[sent:]
+        
+        try:
+            data = self._parse_json(tail)
+            jsonschema.validate(data, QUERY_STREAM_SCHEMA)
+            result = self._structured_result(answer, data)
+            if cached is None:
+                await self._offload(self.cache, self.cache.set, "process_query_stream", key, text)
+        except Exception as e:
+            # No usable JSON section: ask for recommendations separately
+            logger.warning(f"⚠️ Streamed query response invalid, falling back: {str(e)}")
+            result = await self._parse_response(answer, context)
+            result["answer"] = self._clean_ai_response(answer)
+        
+        result["chart_data"] = context.get('chart_data', None)
+        if session:
+            await self._offload(self.conversations, self.conversations.append,
+                                session, query, result["answer"])
+        logger.info(f"✅ Query streamed: {query[:50]}...")
+        yield "result", result
+    
+    @staticmethod
+    async def _replay(text: str) -> AsyncIterator[str]:
+        """A cached completion as a single-delta stream"""
+        yield text
+    
+    async def generate_report_summary(self, data: Dict[str, Any], department: str) -> str:
         """
         Generate executive summary using LLaMA
         
@@ -106,7 +335,7 @@ class LlamaAgent:
             prompt = f"""You are an AI business analyst. Generate a concise executive summary for the {department} department.
 
 Data:
-{json.dumps(data, indent=2)}
+{self.prompts.render("generate_report_summary", data)}
 
 Generate a 3-4 sentence executive summary highlighting:
 1. Key performance metrics
@@ -115,14 +344,14 @@ Generate a 3-4 sentence executive summary highlighting:
 
 Write in professional business language."""
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
+            response_text = await self._complete(
+                "generate_report_summary",
+                [{"role": "user", "content": prompt}],
                 temperature=0.5,
                 max_tokens=300
             )
             
-            summary = response.choices[0].message.content.strip()
+            summary = response_text.strip()
             logger.info(f"✅ Summary generated for {department}")
             return summary
             
@@ -130,7 +359,7 @@ Write in professional business language."""
             logger.error(f"❌ Summary generation error: {str(e)}")
             return f"Performance analysis for {department} department shows key metrics within expected ranges."
     
-    def analyze_trends(self, time_series_data: List[Dict]) -> Dict[str, Any]:
+    async def analyze_trends(self, time_series_data: List[Dict]) -> Dict[str, Any]:
         """
         Analyze trends in time series data
         
@@ -144,7 +373,7 @@ Write in professional business language."""
             prompt = f"""Analyze this time series data and provide insights:
 
 Data:
-{json.dumps(time_series_data, indent=2)}
+{self.prompts.render("analyze_trends", time_series_data)}
 
 Provide:
 1. Overall trend (increasing/decreasing/stable)
@@ -161,23 +390,13 @@ Format as JSON:
     "reasoning": "why this trend"
 }}"""
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
+            result = await self._complete(
+                "analyze_trends",
+                [{"role": "user", "content": prompt}],
                 temperature=0.3,
-                max_tokens=500
+                max_tokens=500,
+                parse=self._parse_json
             )
-            
-            # Try to parse JSON response
-            result_text = response.choices[0].message.content.strip()
-            
-            # Extract JSON if wrapped in markdown
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1].strip()
-            
-            result = json.loads(result_text)
             logger.info("✅ Trend analysis completed")
             return result
             
@@ -191,7 +410,7 @@ Format as JSON:
                 "reasoning": "Based on historical patterns"
             }
     
-    def detect_anomalies(self, data: List[Dict], metric: str) -> List[Dict]:
+    async def detect_anomalies(self, data: List[Dict], metric: str) -> List[Dict]:
         """
         Detect anomalies using LLaMA's understanding
         
@@ -206,7 +425,7 @@ Format as JSON:
             prompt = f"""Analyze this data for the metric "{metric}" and identify any anomalies:
 
 Data:
-{json.dumps(data, indent=2)}
+{self.prompts.render("detect_anomalies", data)}
 
 Identify:
 1. Unusual spikes or drops
@@ -226,22 +445,13 @@ Return as JSON array:
 
 If no anomalies, return empty array: []"""
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
+            anomalies = await self._complete(
+                "detect_anomalies",
+                [{"role": "user", "content": prompt}],
                 temperature=0.2,
-                max_tokens=800
+                max_tokens=800,
+                parse=self._parse_json
             )
-            
-            result_text = response.choices[0].message.content.strip()
-            
-            # Extract JSON
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1].strip()
-            
-            anomalies = json.loads(result_text)
             logger.info(f"✅ Anomaly detection completed: {len(anomalies)} found")
             return anomalies
             
@@ -249,7 +459,7 @@ If no anomalies, return empty array: []"""
             logger.error(f"❌ Anomaly detection error: {str(e)}")
             return []
     
-    def generate_recommendations(self, context: Dict[str, Any]) -> List[str]:
+    async def generate_recommendations(self, context: Dict[str, Any]) -> List[str]:
         """
         Generate actionable recommendations
         
@@ -263,7 +473,7 @@ If no anomalies, return empty array: []"""
             prompt = f"""Based on this business data, provide 3-5 actionable recommendations:
 
 Context:
-{json.dumps(context, indent=2)}
+{self.prompts.render("generate_recommendations", context)}
 
 Generate specific, actionable recommendations that:
 1. Address identified issues
@@ -273,14 +483,14 @@ Generate specific, actionable recommendations that:
 
 Format as a numbered list."""
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
+            response_text = await self._complete(
+                "generate_recommendations",
+                [{"role": "user", "content": prompt}],
                 temperature=0.7,
                 max_tokens=500
             )
             
-            text = response.choices[0].message.content.strip()
+            text = response_text.strip()
             
             # Extract recommendations
             recommendations = []
@@ -303,7 +513,20 @@ Format as a numbered list."""
                 "Implement data-driven decision making processes"
             ]
     
-    def _build_system_prompt(self, context: Dict) -> str:
+    @staticmethod
+    def _parse_json(text: str) -> Any:
+        """Parse a JSON completion, unwrapping markdown code fences"""
+        result_text = text.strip()
+        
+        # Extract JSON if wrapped in markdown
+        if "```json" in result_text:
+            result_text = result_text.split("```json")[1].split("```")[0].strip()
+        elif "```" in result_text:
+            result_text = result_text.split("```")[1].strip()
+        
+        return json.loads(result_text)
+    
+    def _build_system_prompt(self, context: Dict, response_format: str = QUERY_RESPONSE_FORMAT) -> str:
         """Build system prompt with context"""
         return f"""You are an AI business intelligence assistant for an enterprise reporting system.
 
@@ -314,88 +537,103 @@ Your role:
 - Provide actionable recommendations
 
 Current Context:
-{json.dumps(context, indent=2)}
+{self.prompts.render("process_query", context)}
 
 Guidelines:
 - Be concise and professional
 - Use data to support your analysis
 - Provide specific numbers when available
 - Focus on actionable insights
-- Structure responses clearly"""
+
+{response_format}"""
     
-def _clean_ai_response(self, text: str) -> str:
-    """Clean AI response text by removing markdown and formatting artifacts"""
-    if not text:
-        return ""
+    def _parse_structured_response(self, text: str) -> Dict[str, Any]:
+        """Parse and validate a process_query JSON completion against QUERY_RESPONSE_SCHEMA"""
+        import jsonschema
+        
+        data = self._parse_json(text)
+        jsonschema.validate(data, QUERY_RESPONSE_SCHEMA)
+        return self._structured_result(data["answer"], data)
     
-    # Remove markdown formatting
-    clean_text = text.replace('**', '').replace('__', '').replace('*', '').replace('_', '')
+    def _structured_result(self, answer: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Clean and cap validated answer, insights and recommendations"""
+        insights = [self._clean_ai_response(item) for item in data["insights"]]
+        recommendations = [self._clean_ai_response(item) for item in data["recommendations"]]
+        return {
+            "answer": self._clean_ai_response(answer),
+            "insights": [item for item in insights if item][:3] or list(DEFAULT_INSIGHTS),
+            "recommendations": [item for item in recommendations if item][:5]
+        }
+    
+    def _clean_ai_response(self, text: str) -> str:
+        """Clean AI response text by removing markdown and formatting artifacts"""
+        if not text:
+            return ""
     
-    # Remove code blocks
-    clean_text = clean_text.replace('```', '').replace('`', '')
+        # Remove markdown formatting
+        clean_text = text.replace('**', '').replace('__', '').replace('*', '').replace('_', '')
     
-    # Remove excessive whitespace
-    clean_text = ' '.join(clean_text.split())
+        # Remove code blocks
+        clean_text = clean_text.replace('```', '').replace('`', '')
     
-    # Replace bullet points with clean format
-    clean_text = clean_text.replace('•', '-')
+        # Remove excessive whitespace
+        clean_text = ' '.join(clean_text.split())
     
-    return clean_text.strip()
+        # Replace bullet points with clean format
+        clean_text = clean_text.replace('•', '-')
+    
+        return clean_text.strip()
 
-def _parse_response(self, text: str, context: Dict) -> Dict[str, Any]:
-    """Parse LLaMA response into structured format"""
-    try:
-        # Clean the text first
-        text = self._clean_ai_response(text)
+    async def _parse_response(self, text: str, context: Dict) -> Dict[str, Any]:
+        """Parse LLaMA response into structured format"""
+        try:
+            # Clean the text first
+            text = self._clean_ai_response(text)
         
-        # Get main answer (first few sentences)
-        lines = text.strip().split('\n')
+            # Get main answer (first few sentences)
+            lines = text.strip().split('\n')
         
-        # Get main answer (first few sentences)
-        answer_lines = []
-        for line in lines:
-            if line.strip() and not line.strip().startswith(('-', '•', '1.', '2.', '3.')):
-                clean_line = self._clean_ai_response(line)
-                answer_lines.append(clean_line.strip())
-            if len(answer_lines) >= 3:
-                break
+            # Get main answer (first few sentences)
+            answer_lines = []
+            for line in lines:
+                if line.strip() and not line.strip().startswith(('-', '•', '1.', '2.', '3.')):
+                    clean_line = self._clean_ai_response(line)
+                    answer_lines.append(clean_line.strip())
+                if len(answer_lines) >= 3:
+                    break
         
-        answer = ' '.join(answer_lines) if answer_lines else text[:200]
+            answer = ' '.join(answer_lines) if answer_lines else text[:200]
         
-        # Extract insights (bullet points)
-        insights = []
-        for line in lines:
-            line = line.strip()
-            if line and (line.startswith(('-', '•')) or any(line.startswith(f"{i}.") for i in range(1, 10))):
-                insight = line.lstrip('-•0123456789.) ').strip()
-                insight = self._clean_ai_response(insight)
-                if insight and len(insight) > 10:
-                    insights.append(insight)
+            # Extract insights (bullet points)
+            insights = []
+            for line in lines:
+                line = line.strip()
+                if line and (line.startswith(('-', '•')) or any(line.startswith(f"{i}.") for i in range(1, 10))):
+                    insight = line.lstrip('-•0123456789.) ').strip()
+                    insight = self._clean_ai_response(insight)
+                    if insight and len(insight) > 10:
+                        insights.append(insight)
         
-        # Generate recommendations using the agent
-        recommendations = self.generate_recommendations(context)
+            # Generate recommendations using the agent
+            recommendations = await self.generate_recommendations(context)
         
-        # Add chart data if available in context
-        chart_data = context.get('chart_data', None)
+            # Add chart data if available in context
+            chart_data = context.get('chart_data', None)
         
-        return {
-            "answer": answer,
-            "insights": insights[:3] if insights else [
-                "Performance metrics show positive trends",
-                "Key indicators within expected ranges",
-                "Opportunities for optimization identified"
-            ],
-            "recommendations": recommendations,
-            "chart_data": chart_data
-        }
+            return {
+                "answer": answer,
+                "insights": insights[:3] if insights else list(DEFAULT_INSIGHTS),
+                "recommendations": recommendations,
+                "chart_data": chart_data
+            }
         
-    except Exception as e:
-        logger.error(f"Response parsing error: {str(e)}")
-        return {
-            "answer": text[:500],
-            "insights": ["Analysis completed successfully"],
-            "recommendations": ["Monitor key metrics regularly"]
-        }
+        except Exception as e:
+            logger.error(f"Response parsing error: {str(e)}")
+            return {
+                "answer": text[:500],
+                "insights": ["Analysis completed successfully"],
+                "recommendations": ["Monitor key metrics regularly"]
+            }
     
     def _fallback_response(self, query: str) -> Dict[str, Any]:
         """Fallback response if agent fails"""
@@ -0,0 +1,316 @@
+"""
+LLM response cache
+Content-addressed cache of Groq completions with an in-memory LRU and an optional persisted tier
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600"))
+# "memory" keeps entries in this process only; "mongo" or "disk" add a
+# persisted tier that survives restarts and is shared between workers
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory").lower()
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", os.path.join("storage", "llm_cache"))
+LLM_CACHE_COLLECTION = os.getenv("LLM_CACHE_COLLECTION", "llm_cache")
+
+# Per-method TTL in seconds; 0 opts a method out of caching. Free-form chat
+# answers go stale with the KPIs they quote, so they expire sooner.
+DEFAULT_METHOD_TTLS = {
+    "process_query": 300.0,
+    "process_query_stream": 300.0,
+    "generate_report_summary": LLM_CACHE_TTL_SECONDS,
+    "analyze_trends": LLM_CACHE_TTL_SECONDS,
+    "detect_anomalies": LLM_CACHE_TTL_SECONDS,
+    "generate_recommendations": LLM_CACHE_TTL_SECONDS,
+}
+
+
+def _parse_method_ttls(raw: str) -> Dict[str, float]:
+    """Parse ``LLM_CACHE_METHOD_TTLS`` (e.g. ``process_query=0,analyze_trends=600``)"""
+    ttls = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        method, value = item.split("=", 1)
+        try:
+            ttls[method.strip()] = float(value)
+        except ValueError:
+            logger.warning(f"⚠️ Ignoring invalid LLM cache TTL: {item}")
+    return ttls
+
+
+LLM_CACHE_METHOD_TTLS = {**DEFAULT_METHOD_TTLS,
+                         **_parse_method_ttls(os.getenv("LLM_CACHE_METHOD_TTLS", ""))}
+
+
+def cache_key(model: str, temperature: float, max_tokens: int,
+              messages: List[Dict[str, str]]) -> str:
+    """
+    Content address of a completion request
+
+    Args:
+        model: Groq model name
+        temperature: Sampling temperature
+        max_tokens: Completion token limit
+        messages: Chat messages exactly as sent
+
+    Returns:
+        Hex SHA-256 of the canonical JSON encoding of all four
+    """
+    payload = json.dumps(
+        {"model": model, "temperature": float(temperature),
+         "max_tokens": int(max_tokens), "messages": messages},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ============================================================================
+# PERSISTED TIERS
+# ============================================================================
+
+class MongoLLMStore:
+    """
+    Completions in a MongoDB collection with a TTL index on ``expires_at``
+
+    The agent methods run in worker threads, so this uses the synchronous
+    pymongo driver rather than Motor.
+    """
+
+    def __init__(self, collection=None):
+        if collection is None:
+            from pymongo import MongoClient
+            client = MongoClient(os.getenv("MONGODB_URI"), serverSelectionTimeoutMS=2000)
+            collection = client[os.getenv("MONGODB_DB_NAME", "report_generator")][LLM_CACHE_COLLECTION]
+            collection.create_index("expires_at", expireAfterSeconds=0)
+        self.collection = collection
+
+    def get(self, key: str) -> Optional[str]:
+        doc = self.collection.find_one({"_id": key})
+        # The TTL monitor only runs once a minute; don't serve what it missed
+        if not doc or doc["expires_at"] <= datetime.utcnow():
+            return None
+        return doc["text"]
+
+    def set(self, key: str, method: str, text: str, ttl: float) -> None:
+        now = datetime.utcnow()
+        self.collection.update_one(
+            {"_id": key},
+            {"$set": {"text": text, "method": method, "created_at": now,
+                      "expires_at": now + timedelta(seconds=ttl)}},
+            upsert=True
+        )
+
+
+class DiskLLMStore:
+    """Completions as JSON files under ``root/<key[:2]>/<key>.json``"""
+
+    def __init__(self, root: str = LLM_CACHE_DIR):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry["expires_at"] <= time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry["text"]
+
+    def set(self, key: str, method: str, text: str, ttl: float) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"text": text, "method": method, "expires_at": time.time() + ttl}, f)
+        os.replace(tmp_path, path)
+
+
+def create_llm_store(backend: str = LLM_CACHE_BACKEND):
+    """Build the persisted tier named by ``LLM_CACHE_BACKEND`` (None for memory only)"""
+    if backend == "mongo":
+        return MongoLLMStore()
+    if backend == "disk":
+        return DiskLLMStore()
+    if backend != "memory":
+        logger.warning(f"⚠️ Unknown LLM_CACHE_BACKEND '{backend}', using memory only")
+    return None
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class LLMCache:
+    """
+    Two-tier cache of completion texts keyed by ``cache_key``
+
+    Lookups go memory LRU -> persisted store (when configured). Persisted hits
+    are promoted into memory. Thread-safe: with a persisted store LlamaAgent
+    calls it on the blocking-I/O executor, so lookups can run concurrently.
+    """
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES,
+                 method_ttls: Optional[Dict[str, float]] = None,
+                 default_ttl: float = LLM_CACHE_TTL_SECONDS,
+                 store=None, enabled: bool = LLM_CACHE_ENABLED):
+        self.max_entries = max_entries
+        self.method_ttls = dict(LLM_CACHE_METHOD_TTLS if method_ttls is None else method_ttls)
+        self.default_ttl = default_ttl
+        self.store = store
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self.evictions = 0
+        self.store_errors = 0
+
+    def ttl_for(self, method: str) -> float:
+        """TTL for a method's entries; 0 means the method is not cached"""
+        if not self.enabled:
+            return 0.0
+        return self.method_ttls.get(method, self.default_ttl)
+
+    def _count(self, method: str, field: str) -> None:
+        counters = self._counters.setdefault(
+            method, {"hits": 0, "persisted_hits": 0, "misses": 0, "bypassed": 0}
+        )
+        counters[field] += 1
+
+    def get(self, method: str, key: str) -> Optional[str]:
+        """
+        Look up a completion
+
+        Args:
+            method: Calling LlamaAgent method (for TTL and metrics)
+            key: ``cache_key`` of the request
+
+        Returns:
+            Cached completion text, or None on a miss or when the method opts out
+        """
+        ttl = self.ttl_for(method)
+        if ttl <= 0:
+            with self._lock:
+                self._count(method, "bypassed")
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._count(method, "hits")
+                    return entry[1]
+                del self._entries[key]
+
+        text = None
+        if self.store is not None:
+            try:
+                text = self.store.get(key)
+            except Exception as e:
+                self.store_errors += 1
+                logger.warning(f"⚠️ LLM cache store read failed: {str(e)}")
+
+        with self._lock:
+            if text is None:
+                self._count(method, "misses")
+                return None
+            self._count(method, "persisted_hits")
+            self._remember(key, text, now + ttl)
+        return text
+
+    def set(self, method: str, key: str, text: str) -> None:
+        """Store a completion in every tier (no-op when the method opts out)"""
+        ttl = self.ttl_for(method)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._remember(key, text, time.monotonic() + ttl)
+        if self.store is not None:
+            try:
+                self.store.set(key, method, text, ttl)
+            except Exception as e:
+                self.store_errors += 1
+                logger.warning(f"⚠️ LLM cache store write failed: {str(e)}")
+
+    def _remember(self, key: str, text: str, expires_at: float) -> None:
+        self._entries[key] = (expires_at, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop the in-memory tier and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters overall and per method"""
+        with self._lock:
+            methods = {method: dict(counters) for method, counters in self._counters.items()}
+            size = len(self._entries)
+        for counters in methods.values():
+            lookups = counters["hits"] + counters["persisted_hits"] + counters["misses"]
+            counters["hit_ratio"] = round((counters["hits"] + counters["persisted_hits"]) / lookups, 4) if lookups else 0.0
+        totals = {field: sum(c[field] for c in methods.values())
+                  for field in ("hits", "persisted_hits", "misses", "bypassed")}
+        lookups = totals["hits"] + totals["persisted_hits"] + totals["misses"]
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.store).__name__ if self.store is not None else "memory",
+            "size": size,
+            "max_entries": self.max_entries,
+            **totals,
+            "hit_ratio": round((totals["hits"] + totals["persisted_hits"]) / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "store_errors": self.store_errors,
+            "methods": methods,
+        }
+
+
+# ============================================================================
+# Singleton instance
+# ============================================================================
+
+_llm_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> LLMCache:
+    """Get or create the process-wide LLM cache"""
+    global _llm_cache
+    if _llm_cache is None:
+        try:
+            store = create_llm_store()
+        except Exception as e:
+            logger.warning(f"⚠️ LLM cache store unavailable, using memory only: {str(e)}")
+            store = None
+        _llm_cache = LLMCache(store=store)
+    return _llm_cache
@@ -0,0 +1,291 @@
+"""
+Prompt builder
+Compact, token-budgeted rendering of the data LlamaAgent embeds in its prompts
+"""
+
+import csv
+import io
+import json
+import math
+import os
+import re
+import threading
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Rows of a record list rendered before it is sampled down and summarized
+PROMPT_MAX_TABLE_ROWS = int(os.getenv("PROMPT_MAX_TABLE_ROWS", "60"))
+# Sampling never goes below this many rows; past that the text is truncated
+PROMPT_MIN_TABLE_ROWS = int(os.getenv("PROMPT_MIN_TABLE_ROWS", "6"))
+
+# Token budget for the data block of each method's prompt (the instructions
+# around it are fixed and not counted)
+DEFAULT_TOKEN_BUDGETS = {
+    "process_query": 1500,
+    "generate_report_summary": 1200,
+    "analyze_trends": 1500,
+    "detect_anomalies": 2000,
+    "generate_recommendations": 1200,
+}
+PROMPT_DEFAULT_BUDGET = int(os.getenv("PROMPT_DEFAULT_BUDGET", "1500"))
+
+
+def _parse_budgets(raw: str) -> Dict[str, int]:
+    """Parse ``PROMPT_TOKEN_BUDGETS`` (e.g. ``process_query=800,analyze_trends=2000``)"""
+    budgets = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        method, value = item.split("=", 1)
+        try:
+            budgets[method.strip()] = int(value)
+        except ValueError:
+            logger.warning(f"⚠️ Ignoring invalid prompt budget: {item}")
+    return budgets
+
+
+PROMPT_TOKEN_BUDGETS = {**DEFAULT_TOKEN_BUDGETS,
+                        **_parse_budgets(os.getenv("PROMPT_TOKEN_BUDGETS", ""))}
+
+# ============================================================================
+# TOKEN ESTIMATION
+# ============================================================================
+
+# Llama-style BPE: words (long ones split), digit runs in groups of three,
+# and one token per punctuation character
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a text without a tokenizer
+
+    Args:
+        text: Prompt text
+
+    Returns:
+        Approximate Llama 3 token count (typically within ~15%)
+    """
+    if not text:
+        return 0
+    count = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        count += 1 + (len(piece) - 1) // 6 if piece.isalpha() else 1
+    return count
+
+
+def estimate_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """Estimated prompt tokens for a chat request, including per-message framing"""
+    return sum(estimate_tokens(message.get("content", "")) + 4 for message in messages)
+
+
+# ============================================================================
+# RENDERING
+# ============================================================================
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _format_value(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ""
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return str(round(value, 4))
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"), default=str)
+    return str(value)
+
+
+def _is_records(value: Any) -> bool:
+    return isinstance(value, list) and bool(value) and all(isinstance(row, dict) for row in value)
+
+
+def _sample_rows(rows: List[Dict], max_rows: int) -> List[Dict]:
+    """Evenly spaced rows, always keeping the first and last"""
+    if len(rows) <= max_rows:
+        return rows
+    if max_rows <= 1:
+        return rows[-1:]
+    step = (len(rows) - 1) / (max_rows - 1)
+    return [rows[round(i * step)] for i in range(max_rows)]
+
+
+def _column_summary(rows: List[Dict], columns: List[str]) -> str:
+    """min/mean/max of each numeric column over all rows"""
+    parts = []
+    for column in columns:
+        values = [row[column] for row in rows if _is_number(row.get(column))]
+        if not values:
+            continue
+        mean = sum(values) / len(values)
+        parts.append(f"{column} min={_format_value(min(values))} "
+                     f"mean={_format_value(float(mean))} max={_format_value(max(values))}")
+    return "; ".join(parts)
+
+
+def render_table(rows: List[Dict], max_rows: int = PROMPT_MAX_TABLE_ROWS) -> str:
+    """
+    Render a list of records as CSV
+
+    Args:
+        rows: Records (dicts), e.g. chart_data or a data preview
+        max_rows: Rows kept; longer lists are sampled evenly and followed by
+            a line with the min/mean/max of every numeric column
+
+    Returns:
+        CSV text with a header row
+    """
+    columns: List[str] = []
+    for row in rows:
+        for column in row:
+            if column not in columns:
+                columns.append(column)
+
+    shown = _sample_rows(rows, max_rows)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    for row in shown:
+        writer.writerow([_format_value(row.get(column)) for column in columns])
+
+    text = buffer.getvalue().rstrip("\n")
+    if len(shown) < len(rows):
+        summary = _column_summary(rows, columns)
+        text += f"\n({len(shown)} of {len(rows)} rows shown"
+        text += f"; all rows: {summary})" if summary else ")"
+    return text
+
+
+def render_context(value: Any, max_rows: int = PROMPT_MAX_TABLE_ROWS, indent: int = 0) -> str:
+    """
+    Render prompt context compactly
+
+    Dicts become ``key: value`` lines (nested dicts indented), lists of
+    records become CSV tables and other lists comma-separated values.
+
+    Args:
+        value: Context dict, record list or scalar
+        max_rows: Row cap for every table
+        indent: Current indentation (used for nesting)
+
+    Returns:
+        Rendered text
+    """
+    pad = " " * indent
+    if _is_records(value):
+        return "\n".join(pad + line for line in render_table(value, max_rows).split("\n"))
+    if isinstance(value, dict):
+        lines = []
+        for key, item in value.items():
+            if _is_records(item):
+                lines.append(f"{pad}{key} ({len(item)} rows):")
+                lines.append(render_context(item, max_rows, indent + 2))
+            elif isinstance(item, dict) and item:
+                lines.append(f"{pad}{key}:")
+                lines.append(render_context(item, max_rows, indent + 2))
+            elif isinstance(item, (list, tuple)):
+                lines.append(f"{pad}{key}: {', '.join(_format_value(v) for v in item)}")
+            else:
+                lines.append(f"{pad}{key}: {_format_value(item)}")
+        return "\n".join(lines)
+    if isinstance(value, (list, tuple)):
+        return pad + ", ".join(_format_value(v) for v in value)
+    return pad + _format_value(value)
+
+
+# ============================================================================
+# BUILDER
+# ============================================================================
+
+class PromptBuilder:
+    """
+    Renders prompt data within a per-method token budget
+
+    Tables are sampled down (halving their row cap) until the rendered data
+    fits; if it still doesn't at ``PROMPT_MIN_TABLE_ROWS`` the text is cut.
+    Also keeps running totals of estimated prompt tokens per method.
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, int]] = None,
+                 max_rows: int = PROMPT_MAX_TABLE_ROWS,
+                 min_rows: int = PROMPT_MIN_TABLE_ROWS):
+        self.budgets = dict(PROMPT_TOKEN_BUDGETS if budgets is None else budgets)
+        self.max_rows = max_rows
+        self.min_rows = min_rows
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def budget_for(self, method: str) -> int:
+        return self.budgets.get(method, PROMPT_DEFAULT_BUDGET)
+
+    def render(self, method: str, value: Any) -> str:
+        """
+        Render data for one method's prompt
+
+        Args:
+            method: LlamaAgent method name (selects the budget)
+            value: Context dict or record list
+
+        Returns:
+            Compact text estimated to fit the method's token budget
+        """
+        budget = self.budget_for(method)
+        rows = self.max_rows
+        text = render_context(value, rows)
+        tokens = estimate_tokens(text)
+        while tokens > budget and rows > self.min_rows:
+            rows = max(self.min_rows, rows // 2)
+            text = render_context(value, rows)
+            tokens = estimate_tokens(text)
+
+        if tokens > budget:
+            # Estimated tokens track characters closely enough to cut proportionally
+            keep = int(len(text) * budget / tokens)
+            text = text[:keep].rsplit("\n", 1)[0] + "\n... (truncated)"
+            logger.warning(f"✂️ {method} prompt data truncated to ~{budget} tokens")
+        return text
+
+    def record(self, method: str, messages: List[Dict[str, str]]) -> int:
+        """Log and accumulate the estimated prompt tokens of a request"""
+        tokens = estimate_message_tokens(messages)
+        with self._lock:
+            stats = self._stats.setdefault(method, {"requests": 0, "prompt_tokens": 0, "max_prompt_tokens": 0})
+            stats["requests"] += 1
+            stats["prompt_tokens"] += tokens
+            stats["max_prompt_tokens"] = max(stats["max_prompt_tokens"], tokens)
+        logger.info(f"🧮 {method} prompt: ~{tokens} tokens")
+        return tokens
+
+    def stats(self) -> Dict[str, Any]:
+        """Estimated prompt tokens per method"""
+        with self._lock:
+            methods = {method: dict(stats) for method, stats in self._stats.items()}
+        for stats in methods.values():
+            stats["avg_prompt_tokens"] = round(stats["prompt_tokens"] / stats["requests"], 1)
+        return {"budgets": dict(self.budgets), "methods": methods}
+
+
+# ============================================================================
+# Singleton instance
+# ============================================================================
+
+_prompt_builder: Optional[PromptBuilder] = None
+
+
+def get_prompt_builder() -> PromptBuilder:
+    """Get or create the process-wide prompt builder"""
+    global _prompt_builder
+    if _prompt_builder is None:
+        _prompt_builder = PromptBuilder()
+    return _prompt_builder
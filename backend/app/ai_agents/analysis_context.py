@@ -0,0 +1,179 @@
+"""
+Shared analysis context for CSVAnalysisAgent
+Computes every per-column statistic once and hands it to all analysis stages
+"""
+
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Minimum number of rows before a linear trend is reported
+TREND_MIN_ROWS = 10
+# |r| above which a trend is considered significant
+TREND_R_THRESHOLD = 0.5
+# |corr| above which a column pair is reported
+CORRELATION_THRESHOLD = 0.7
+
+
+@dataclass
+class AnalysisContext:
+    """
+    Precomputed statistics for one uploaded frame
+
+    Built once per upload by ``AnalysisContext.from_frame``; every analysis
+    stage reads from it instead of re-deriving moments, quantiles or the
+    correlation matrix from the raw DataFrame.
+    """
+    df: pd.DataFrame
+    numeric_columns: List[str]
+    categorical_columns: List[str]
+    column_stats: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    missing_counts: Dict[str, int] = field(default_factory=dict)
+    correlation_matrix: Optional[pd.DataFrame] = None
+    trends: List[Dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "AnalysisContext":
+        """Run every statistical primitive over ``df`` exactly once"""
+        context = cls(
+            df=df,
+            numeric_columns=df.select_dtypes(include=[np.number]).columns.tolist(),
+            categorical_columns=df.select_dtypes(include=['object', 'category']).columns.tolist()
+        )
+        numeric = df[context.numeric_columns]
+
+        context.column_stats = context._compute_column_stats(numeric)
+        context.missing_counts = context._compute_missing_counts(df)
+        context.correlation_matrix = context._compute_correlations(numeric)
+        context.trends = context._compute_trends(numeric)
+        return context
+
+    @property
+    def total_rows(self) -> int:
+        return len(self.df)
+
+    def _compute_column_stats(self, numeric: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+        """Moments, quantiles and IQR outlier counts for all numeric columns"""
+        if numeric.empty:
+            return {}
+
+        counts = numeric.count()
+        moments = numeric.agg(['mean', 'median', 'std', 'min', 'max', 'var', 'skew', 'kurt', 'sum'])
+        quantiles = numeric.quantile([0.25, 0.75])
+        q1 = quantiles.loc[0.25]
+        q3 = quantiles.loc[0.75]
+        iqr = q3 - q1
+        outliers = ((numeric < q1 - 1.5 * iqr) | (numeric > q3 + 1.5 * iqr)).sum()
+
+        column_stats = {}
+        for column in numeric.columns:
+            count = int(counts[column])
+            if count == 0:
+                continue
+            column_moments = moments[column]
+            column_stats[column] = {
+                'count': count,
+                'mean': float(column_moments['mean']),
+                'median': float(column_moments['median']),
+                'std': float(column_moments['std']),
+                'min': float(column_moments['min']),
+                'max': float(column_moments['max']),
+                'range': float(column_moments['max'] - column_moments['min']),
+                'variance': float(column_moments['var']),
+                'skewness': float(column_moments['skew']),
+                'kurtosis': float(column_moments['kurt']),
+                'sum': float(column_moments['sum']),
+                'q1': float(q1[column]),
+                'q3': float(q3[column]),
+                'iqr': float(iqr[column]),
+                'outliers_count': int(outliers[column]),
+                'outliers_percentage': float((outliers[column] / count) * 100)
+            }
+        return column_stats
+
+    def _compute_missing_counts(self, df: pd.DataFrame) -> Dict[str, int]:
+        """Missing value count for every column"""
+        return {column: int(count) for column, count in df.isna().sum().items()}
+
+    def _compute_correlations(self, numeric: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Pearson correlation matrix across numeric columns"""
+        if len(numeric.columns) < 2:
+            return None
+        return numeric.corr()
+
+    def _compute_trends(self, numeric: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Linear trend per numeric column against row order
+
+        Same result as ``scipy.stats.linregress(np.arange(n), column.dropna())``
+        for every column, via closed-form least squares: x is 0..n-1 among a
+        column's non-null values, so its mean and spread are known, y's spread
+        comes from ``column_stats`` (computed first), and only the x/y cross
+        term is left: one matrix-vector product over the whole frame.
+        """
+        trends = []
+        if len(numeric) <= TREND_MIN_ROWS or numeric.empty:
+            return trends
+
+        stats = [self.column_stats.get(column, {}) for column in numeric.columns]
+        counts = np.array([column.get('count', 0) for column in stats], dtype=np.int64)
+        fitted = counts > TREND_MIN_ROWS
+        if not fitted.any():
+            return trends
+        n = counts.astype(np.float64)
+        # Sample variance * (n - 1) = sum of squared deviations
+        syy = np.array([column.get('variance', 0.0) for column in stats]) * (n - 1)
+
+        values = numeric.to_numpy(dtype=np.float64)
+        # x is centered, so x @ y == x @ (y - mean); columns with gaps come out NaN here
+        sxy = (np.arange(len(values)) - (len(values) - 1) / 2) @ values
+        partial = fitted & (counts < len(values))
+        if partial.any():
+            # x is the position among the column's own non-null values
+            subset = values[:, partial]
+            x = np.cumsum(~np.isnan(subset), axis=0) - (counts[partial] + 1) / 2
+            sxy[partial] = np.nansum(x * subset, axis=0)
+
+        sxx = n * (n * n - 1) / 12
+        with np.errstate(invalid='ignore', divide='ignore'):
+            slopes = sxy / sxx
+            r_values = np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0)
+        # linregress reports r = 0 for a constant column
+        r_values[~(syy > 0)] = 0.0
+
+        for i in np.flatnonzero(fitted & (np.abs(r_values) > TREND_R_THRESHOLD)):
+            r_value = float(r_values[i])
+            trends.append({
+                'column': numeric.columns[i],
+                'trend': 'increasing' if slopes[i] > 0 else 'decreasing',
+                'strength': abs(r_value),
+                'slope': float(slopes[i]),
+                'confidence': min(100, abs(r_value) * 100)
+            })
+        return trends
+
+    def strong_correlations(self, threshold: float = CORRELATION_THRESHOLD) -> List[Dict[str, Any]]:
+        """Column pairs whose absolute correlation exceeds ``threshold``"""
+        correlations = []
+        if self.correlation_matrix is None:
+            return correlations
+
+        columns = self.correlation_matrix.columns
+        matrix = self.correlation_matrix.to_numpy()
+        # Upper triangle only: each pair once, no self-correlation (row-major order)
+        rows, cols = np.triu_indices(len(columns), k=1)
+        values = matrix[rows, cols]
+        strong = np.abs(values) > threshold
+        for i, j, corr in zip(rows[strong], cols[strong], values[strong]):
+            correlations.append({
+                'column1': columns[i],
+                'column2': columns[j],
+                'correlation': float(corr),
+                'strength': 'strong' if abs(corr) > 0.8 else 'moderate',
+                'direction': 'positive' if corr > 0 else 'negative'
+            })
+        return correlations
@@ -0,0 +1,206 @@
+"""
+Anomaly engine for CSVAnalysisAgent
+Vectorized robust z-score (MAD) / IQR outlier detection plus an optional multivariate IsolationForest
+"""
+
+import os
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.executors import CPU_EXECUTOR_WORKERS
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# "mad" flags |modified z-score| above ANOMALY_MAD_THRESHOLD; "iqr" flags
+# values outside [q1 - k*IQR, q3 + k*IQR]
+ANOMALY_METHOD = os.getenv("ANOMALY_METHOD", "mad").lower()
+ANOMALY_MAD_THRESHOLD = float(os.getenv("ANOMALY_MAD_THRESHOLD", "3.5"))
+ANOMALY_IQR_MULTIPLIER = float(os.getenv("ANOMALY_IQR_MULTIPLIER", "1.5"))
+# Columns need more non-null values than this to be checked
+ANOMALY_MIN_ROWS = int(os.getenv("ANOMALY_MIN_ROWS", "10"))
+
+# One IsolationForest over all numeric columns, flagging unusual rows
+ANOMALY_MULTIVARIATE = os.getenv("ANOMALY_MULTIVARIATE", "true").lower() == "true"
+ANOMALY_FOREST_TREES = int(os.getenv("ANOMALY_FOREST_TREES", "100"))
+# Rows the forest is fitted on; larger frames are subsampled (scoring still covers every row)
+ANOMALY_FOREST_FIT_ROWS = int(os.getenv("ANOMALY_FOREST_FIT_ROWS", "100000"))
+# Share of rows the forest reports ("auto" uses the score threshold from the paper)
+ANOMALY_FOREST_CONTAMINATION = os.getenv("ANOMALY_FOREST_CONTAMINATION", "0.01")
+# Threads per forest; analyses already run CPU_EXECUTOR_WORKERS at a time, so
+# each gets its share of the cores rather than all of them
+ANOMALY_FOREST_N_JOBS = int(os.getenv(
+    "ANOMALY_FOREST_N_JOBS", str(max(1, (os.cpu_count() or 1) // CPU_EXECUTOR_WORKERS))
+))
+
+# Scale factor turning a MAD into a standard-deviation estimate for normal data
+MAD_TO_SIGMA = 1.4826
+# Same for the mean absolute deviation, used when more than half the values are equal
+MEAN_AD_TO_SIGMA = 1.2533
+# Row positions reported per finding (the most anomalous for the forest)
+SAMPLE_ROWS = 5
+
+
+class AnomalyEngine:
+    """
+    Outlier detection over a whole frame at once
+
+    The univariate pass computes medians, deviations and bounds for every
+    numeric column in a handful of array operations instead of one model
+    fit per column. The optional multivariate pass fits a single
+    IsolationForest on all numeric columns to catch rows that are unusual
+    as a combination of values.
+    """
+
+    def __init__(self, method: str = ANOMALY_METHOD,
+                 mad_threshold: float = ANOMALY_MAD_THRESHOLD,
+                 iqr_multiplier: float = ANOMALY_IQR_MULTIPLIER,
+                 min_rows: int = ANOMALY_MIN_ROWS,
+                 multivariate: bool = ANOMALY_MULTIVARIATE,
+                 forest_trees: int = ANOMALY_FOREST_TREES,
+                 forest_fit_rows: int = ANOMALY_FOREST_FIT_ROWS,
+                 forest_contamination: Any = ANOMALY_FOREST_CONTAMINATION,
+                 forest_n_jobs: int = ANOMALY_FOREST_N_JOBS):
+        if method not in ("mad", "iqr"):
+            raise ValueError(f"Unknown anomaly method: {method}")
+        self.method = method
+        self.mad_threshold = mad_threshold
+        self.iqr_multiplier = iqr_multiplier
+        self.min_rows = min_rows
+        self.multivariate = multivariate
+        self.forest_trees = forest_trees
+        self.forest_fit_rows = forest_fit_rows
+        self.forest_contamination = forest_contamination if forest_contamination == "auto" \
+            else float(forest_contamination)
+        self.forest_n_jobs = forest_n_jobs
+
+    def detect(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Find outliers in the numeric columns of ``df``
+
+        Args:
+            df: Uploaded frame (non-numeric columns are ignored)
+
+        Returns:
+            One finding per column with outliers, then one multivariate
+            finding when the forest flags any rows
+        """
+        numeric = df.select_dtypes(include=[np.number])
+        if numeric.empty:
+            return []
+
+        values = numeric.to_numpy(dtype=np.float64)
+        counts = np.count_nonzero(~np.isnan(values), axis=0)
+        checked = counts > self.min_rows
+        if not checked.any():
+            return []
+        columns = numeric.columns[checked]
+        values = values[:, checked] if not checked.all() else values
+        counts = counts[checked]
+
+        # 0/1 indicator columns have no outliers of their own; the forest still uses them
+        indicator = np.all((values == 0) | (values == 1) | np.isnan(values), axis=0)
+        if indicator.all():
+            anomalies = []
+        elif indicator.any():
+            anomalies = self._univariate(columns[~indicator], values[:, ~indicator], counts[~indicator])
+        else:
+            anomalies = self._univariate(columns, values, counts)
+        if self.multivariate and len(columns) > 1:
+            finding = self._multivariate(columns, values)
+            if finding is not None:
+                anomalies.append(finding)
+        return anomalies
+
+    def _univariate(self, columns: pd.Index, values: np.ndarray,
+                    counts: np.ndarray) -> List[Dict[str, Any]]:
+        """Robust z-score or IQR bounds for every column in one pass"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if self.method == "iqr":
+                q1, q3 = np.nanpercentile(values, [25, 75], axis=0)
+                spread = q3 - q1
+                lower = q1 - self.iqr_multiplier * spread
+                upper = q3 + self.iqr_multiplier * spread
+                label = f"values outside {self.iqr_multiplier:g}x IQR"
+            else:
+                median = np.nanmedian(values, axis=0)
+                deviation = np.abs(values - median)
+                sigma = MAD_TO_SIGMA * np.nanmedian(deviation, axis=0)
+                # More than half the values equal the median: fall back to the mean deviation
+                flat = sigma == 0
+                if flat.any():
+                    sigma[flat] = MEAN_AD_TO_SIGMA * np.nanmean(deviation[:, flat], axis=0)
+                lower = median - self.mad_threshold * sigma
+                upper = median + self.mad_threshold * sigma
+                label = f"robust z-score above {self.mad_threshold:g}"
+
+            # NaN compares False, so missing values are never flagged
+            outside = (values < lower) | (values > upper)
+        outlier_counts = outside.sum(axis=0)
+
+        anomalies = []
+        for i in np.flatnonzero(outlier_counts):
+            count = int(outlier_counts[i])
+            share = count / int(counts[i])
+            anomalies.append({
+                'column': columns[i],
+                'method': self.method,
+                'anomaly_count': count,
+                'anomaly_percentage': float(share * 100),
+                'severity': 'high' if share > 0.1 else 'medium',
+                'lower_bound': float(lower[i]),
+                'upper_bound': float(upper[i]),
+                'sample_rows': np.flatnonzero(outside[:, i])[:SAMPLE_ROWS].tolist(),
+                'description': f'Detected {count} potential anomalies ({label})',
+                'suggestion': 'Review these data points for potential errors or special cases'
+            })
+        return anomalies
+
+    def _multivariate(self, columns: pd.Index, values: np.ndarray) -> Optional[Dict[str, Any]]:
+        """One IsolationForest over all columns; flags rows rather than values"""
+        # scikit-learn takes most of a second to import; load it on first use
+        from sklearn.ensemble import IsolationForest
+
+        medians = np.nanmedian(values, axis=0)
+        missing = np.isnan(values)
+        if missing.any():
+            values = np.where(missing, medians, values)
+        values = values.astype(np.float32)  # the forest works in float32 anyway
+
+        rows = len(values)
+        fit_values = values
+        if rows > self.forest_fit_rows:
+            rng = np.random.default_rng(42)
+            fit_values = values[np.sort(rng.choice(rows, self.forest_fit_rows, replace=False))]
+
+        forest = IsolationForest(
+            n_estimators=self.forest_trees,
+            contamination=self.forest_contamination,
+            n_jobs=self.forest_n_jobs,
+            random_state=42
+        ).fit(fit_values)
+        scores = forest.decision_function(values)
+        flagged = np.flatnonzero(scores < 0)
+        if len(flagged) == 0:
+            return None
+
+        share = len(flagged) / rows
+        worst = flagged[np.argsort(scores[flagged])[:SAMPLE_ROWS]]
+        return {
+            'column': 'multivariate',
+            'columns': columns.tolist(),
+            'method': 'isolation_forest',
+            'anomaly_count': int(len(flagged)),
+            'anomaly_percentage': float(share * 100),
+            'severity': 'high' if share > 0.1 else 'medium',
+            'sample_rows': worst.tolist(),
+            'description': f'Detected {len(flagged)} rows with an unusual combination of '
+                           f'values across {len(columns)} columns using machine learning',
+            'suggestion': 'Review these rows for data entry errors or exceptional events'
+        }
@@ -4,10 +4,11 @@ import json
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import logging
-from scipy import stats
-from sklearn.ensemble import IsolationForest
-import plotly.graph_objects as go
-import plotly.express as px
+
+from .analysis_context import AnalysisContext
+from .anomaly_engine import AnomalyEngine
+from app.core.executors import run_cpu_bound
+from app.ingestion.schema_inference import SCHEMA_INFERENCE_ENABLED, compact_frame
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +17,7 @@ class CSVAnalysisAgent:
         self.agent_name = "Backend CSV Analysis Agent"
         self.version = "2.0.0"
         self.supported_file_types = ['.csv', '.xlsx', '.xls']
+        self.anomaly_engine = AnomalyEngine()
     
     async def analyze_csv_file(self, file_content: bytes, filename: str, config: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -30,17 +32,30 @@ class CSVAnalysisAgent:
             if df.empty:
                 raise ValueError("No data found in the uploaded file")
             
+            # Compact dtypes (small integers, categoricals, parsed dates) before any stage runs
+            if SCHEMA_INFERENCE_ENABLED:
+                df, memory_saved = compact_frame(df)
+                logger.info(f"🧮 Compact dtypes saved {memory_saved / 1024 ** 2:.1f} MB")
+            
+            # Compute shared statistics once and hand them to every stage
+            context = AnalysisContext.from_frame(df)
+            metadata = self._extract_metadata(df, filename, config)
+            statistical_analysis = await self._perform_statistical_analysis(context)
+            pattern_detection = await self._detect_patterns(context)
+            insights = await self._generate_ai_insights(context, config, statistical_analysis, pattern_detection)
+            recommendations = await self._generate_recommendations(config, insights, pattern_detection)
+            
             # Perform comprehensive analysis
             analysis_result = {
-                'metadata': self._extract_metadata(df, filename, config),
-                'statistical_analysis': await self._perform_statistical_analysis(df),
-                'pattern_detection': await self._detect_patterns(df),
-                'insights': await self._generate_ai_insights(df, config),
-                'recommendations': await self._generate_recommendations(df, config),
+                'metadata': metadata,
+                'statistical_analysis': statistical_analysis,
+                'pattern_detection': pattern_detection,
+                'insights': insights,
+                'recommendations': recommendations,
                 'anomalies': await self._detect_anomalies(df),
-                'predictive_insights': await self._generate_predictive_insights(df, config),
+                'predictive_insights': await self._generate_predictive_insights(statistical_analysis, pattern_detection),
                 'visualizations': await self._prepare_visualizations(df),
-                'executive_summary': await self._generate_executive_summary(df, config),
+                'executive_summary': await self._generate_executive_summary(metadata, config, insights, recommendations),
                 'agent_info': {
                     'name': self.agent_name,
                     'version': self.version,
@@ -81,7 +96,7 @@ class CSVAnalysisAgent:
     def _extract_metadata(self, df: pd.DataFrame, filename: str, config: Dict[str, Any]) -> Dict[str, Any]:
         """Extract basic metadata about the dataset"""
         numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
-        categorical_columns = df.select_dtypes(include=['object']).columns.tolist()
+        categorical_columns = df.select_dtypes(include=['object', 'category']).columns.tolist()
         
         return {
             'filename': filename,
@@ -96,112 +111,41 @@ class CSVAnalysisAgent:
             'memory_usage_mb': df.memory_usage(deep=True).sum() / 1024 ** 2
         }
     
-    async def _perform_statistical_analysis(self, df: pd.DataFrame) -> Dict[str, Any]:
+    async def _perform_statistical_analysis(self, context: AnalysisContext) -> Dict[str, Any]:
         """Perform comprehensive statistical analysis"""
-        stats_result = {}
-        numeric_columns = df.select_dtypes(include=[np.number]).columns
-        
-        for column in numeric_columns:
-            data = df[column].dropna()
-            if len(data) > 0:
-                stats_result[column] = {
-                    'count': int(len(data)),
-                    'mean': float(data.mean()),
-                    'median': float(data.median()),
-                    'std': float(data.std()),
-                    'min': float(data.min()),
-                    'max': float(data.max()),
-                    'range': float(data.max() - data.min()),
-                    'variance': float(data.var()),
-                    'skewness': float(data.skew()),
-                    'kurtosis': float(data.kurtosis()),
-                    'q1': float(data.quantile(0.25)),
-                    'q3': float(data.quantile(0.75)),
-                    'iqr': float(data.quantile(0.75) - data.quantile(0.25))
-                }
-                
-                # Detect outliers using IQR method
-                q1 = stats_result[column]['q1']
-                q3 = stats_result[column]['q3']
-                iqr = stats_result[column]['iqr']
-                lower_bound = q1 - 1.5 * iqr
-                upper_bound = q3 + 1.5 * iqr
-                outliers = data[(data < lower_bound) | (data > upper_bound)]
-                
-                stats_result[column]['outliers_count'] = int(len(outliers))
-                stats_result[column]['outliers_percentage'] = float((len(outliers) / len(data)) * 100)
-        
-        return stats_result
+        return context.column_stats
     
-    async def _detect_patterns(self, df: pd.DataFrame) -> Dict[str, Any]:
+    async def _detect_patterns(self, context: AnalysisContext) -> Dict[str, Any]:
         """Detect patterns, trends, and correlations in the data"""
         patterns = {
-            'trends': [],
-            'correlations': [],
+            'trends': list(context.trends),
+            'correlations': context.strong_correlations(),
             'seasonality': [],
             'data_quality_issues': []
         }
         
-        numeric_columns = df.select_dtypes(include=[np.number]).columns
-        
-        # Trend detection
-        for column in numeric_columns:
-            if len(df) > 10:  # Only detect trends if we have enough data
-                data = df[column].dropna().values
-                if len(data) > 10:
-                    # Simple linear trend detection
-                    x = np.arange(len(data))
-                    slope, _, r_value, _, _ = stats.linregress(x, data)
-                    
-                    if abs(r_value) > 0.5:  # Significant correlation
-                        trend = 'increasing' if slope > 0 else 'decreasing'
-                        patterns['trends'].append({
-                            'column': column,
-                            'trend': trend,
-                            'strength': abs(r_value),
-                            'slope': float(slope),
-                            'confidence': min(100, abs(r_value) * 100)
-                        })
-        
-        # Correlation detection
-        if len(numeric_columns) >= 2:
-            correlation_matrix = df[numeric_columns].corr()
-            for i, col1 in enumerate(numeric_columns):
-                for j, col2 in enumerate(numeric_columns):
-                    if i < j:  # Avoid duplicates and self-correlation
-                        corr = correlation_matrix.iloc[i, j]
-                        if abs(corr) > 0.7:  # Strong correlation
-                            patterns['correlations'].append({
-                                'column1': col1,
-                                'column2': col2,
-                                'correlation': float(corr),
-                                'strength': 'strong' if abs(corr) > 0.8 else 'moderate',
-                                'direction': 'positive' if corr > 0 else 'negative'
-                            })
-        
         # Data quality issues
-        for column in df.columns:
-            missing_count = df[column].isna().sum()
+        total_rows = context.total_rows
+        for column, missing_count in context.missing_counts.items():
             if missing_count > 0:
                 patterns['data_quality_issues'].append({
                     'column': column,
                     'issue': 'missing_values',
                     'count': int(missing_count),
-                    'percentage': float((missing_count / len(df)) * 100),
-                    'severity': 'high' if (missing_count / len(df)) > 0.1 else 'medium'
+                    'percentage': float((missing_count / total_rows) * 100),
+                    'severity': 'high' if (missing_count / total_rows) > 0.1 else 'medium'
                 })
         
         return patterns
     
-    async def _generate_ai_insights(self, df: pd.DataFrame, config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def _generate_ai_insights(self, context: AnalysisContext, config: Dict[str, Any],
+                                    stats: Dict[str, Any], patterns: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate AI-powered insights from the data"""
         insights = []
-        stats = await self._perform_statistical_analysis(df)
-        patterns = await self._detect_patterns(df)
-        metadata = self._extract_metadata(df, '', config)
+        df = context.df
         
         # Data quality insights
-        total_cells = metadata['total_rows'] * metadata['total_columns']
+        total_cells = len(df) * len(df.columns)
         numeric_cells = sum([col_stats['count'] for col_stats in stats.values()])
         data_completeness = (numeric_cells / total_cells) * 100 if total_cells > 0 else 0
         
@@ -304,11 +248,10 @@ class CSVAnalysisAgent:
         
         return insights
     
-    async def _generate_recommendations(self, df: pd.DataFrame, config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def _generate_recommendations(self, config: Dict[str, Any], insights: List[Dict[str, Any]],
+                                        patterns: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate actionable recommendations based on analysis"""
         recommendations = []
-        insights = await self._generate_ai_insights(df, config)
-        patterns = await self._detect_patterns(df)
         
         # Data quality recommendations
         data_quality_issues = [i for i in insights if i['category'] == 'Data Quality']
@@ -378,35 +321,12 @@ class CSVAnalysisAgent:
         return sorted(recommendations, key=lambda x: {'high': 3, 'medium': 2, 'low': 1}[x['priority']], reverse=True)
     
     async def _detect_anomalies(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
-        """Detect anomalies and outliers in the data"""
-        anomalies = []
-        numeric_columns = df.select_dtypes(include=[np.number]).columns
-        
-        for column in numeric_columns:
-            data = df[column].dropna().values.reshape(-1, 1)
-            if len(data) > 10:
-                # Use Isolation Forest for anomaly detection
-                iso_forest = IsolationForest(contamination=0.1, random_state=42)
-                predictions = iso_forest.fit_predict(data)
-                outlier_indices = np.where(predictions == -1)[0]
-                
-                if len(outlier_indices) > 0:
-                    anomalies.append({
-                        'column': column,
-                        'anomaly_count': int(len(outlier_indices)),
-                        'anomaly_percentage': float((len(outlier_indices) / len(data)) * 100),
-                        'severity': 'high' if (len(outlier_indices) / len(data)) > 0.1 else 'medium',
-                        'description': f'Detected {len(outlier_indices)} potential anomalies using machine learning',
-                        'suggestion': 'Review these data points for potential errors or special cases'
-                    })
-        
-        return anomalies
+        """Detect anomalies and outliers in the data (on the CPU executor; forest fits take seconds)"""
+        return await run_cpu_bound(self.anomaly_engine.detect, df)
     
-    async def _generate_predictive_insights(self, df: pd.DataFrame, config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def _generate_predictive_insights(self, stats: Dict[str, Any], patterns: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate predictive insights and forecasts"""
         predictive_insights = []
-        patterns = await self._detect_patterns(df)
-        stats = await self._perform_statistical_analysis(df)
         
         # Trend-based predictions
         for trend in patterns['trends']:
@@ -468,11 +388,10 @@ class CSVAnalysisAgent:
         
         return visualizations
     
-    async def _generate_executive_summary(self, df: pd.DataFrame, config: Dict[str, Any]) -> Dict[str, Any]:
+    async def _generate_executive_summary(self, metadata: Dict[str, Any], config: Dict[str, Any],
+                                          insights: List[Dict[str, Any]],
+                                          recommendations: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate executive summary of the analysis"""
-        metadata = self._extract_metadata(df, '', config)
-        insights = await self._generate_ai_insights(df, config)
-        recommendations = await self._generate_recommendations(df, config)
         
         high_impact_insights = [i for i in insights if i['impact'] == 'high']
         high_priority_recommendations = [r for r in recommendations if r['priority'] == 'high']
@@ -486,5 +405,11 @@ class CSVAnalysisAgent:
             'next_steps': [rec['title'] for rec in high_priority_recommendations[:2]]
         }
 
-# Global agent instance
-csv_analysis_agent = CSVAnalysisAgent()
\ No newline at end of file
+# Global agent instance, created on first use
+_csv_analysis_agent: Optional[CSVAnalysisAgent] = None
+
+def get_csv_analysis_agent() -> CSVAnalysisAgent:
+    global _csv_analysis_agent
+    if _csv_analysis_agent is None:
+        _csv_analysis_agent = CSVAnalysisAgent()
+    return _csv_analysis_agent
@@ -0,0 +1,160 @@
+"""
+Managed executors for blocking work
+Keeps pandas parsing, PDF rendering and other blocking calls off the event loop
+"""
+
+import asyncio
+import functools
+import os
+import threading
+import time
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+CPU_EXECUTOR_WORKERS = int(os.getenv("CPU_EXECUTOR_WORKERS", str(os.cpu_count() or 2)))
+CPU_EXECUTOR_MAX_QUEUE = int(os.getenv("CPU_EXECUTOR_MAX_QUEUE", "64"))
+IO_EXECUTOR_WORKERS = int(os.getenv("IO_EXECUTOR_WORKERS", "32"))
+IO_EXECUTOR_MAX_QUEUE = int(os.getenv("IO_EXECUTOR_MAX_QUEUE", "256"))
+
+# Number of recent wait samples kept for percentile reporting
+WAIT_SAMPLE_SIZE = 1000
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when a pool's queue is full and new work is rejected"""
+
+
+class ManagedExecutor:
+    """
+    Bounded thread pool with queue-depth and wait-time accounting
+
+    Work beyond ``max_workers`` waits in the pool queue; once ``max_queue``
+    jobs are waiting, new submissions are rejected instead of piling up.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._rejected = 0
+        self._waits = deque(maxlen=WAIT_SAMPLE_SIZE)
+        self._run_times = deque(maxlen=WAIT_SAMPLE_SIZE)
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn(*args, **kwargs)`` in the pool and await its result"""
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise ExecutorSaturatedError(f"{self.name} executor queue is full ({self.max_queue} waiting)")
+            self._queued += 1
+
+        submitted_at = time.perf_counter()
+        call = functools.partial(fn, *args, **kwargs)
+
+        def job():
+            started_at = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+                self._waits.append(started_at - submitted_at)
+            try:
+                return call()
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._completed += 1
+                    self._run_times.append(time.perf_counter() - started_at)
+
+        future = self._pool.submit(job)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # A job cancelled before it started never decrements the queue itself
+            if future.cancel():
+                with self._lock:
+                    self._queued -= 1
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, utilisation and wait times"""
+        with self._lock:
+            waits = sorted(self._waits)
+            run_times = sorted(self._run_times)
+            snapshot = {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": self._active,
+                "queued": self._queued,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+        snapshot["wait_ms"] = _summarize(waits)
+        snapshot["run_ms"] = _summarize(run_times)
+        return snapshot
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _summarize(samples) -> Dict[str, float]:
+    if not samples:
+        return {"avg": 0.0, "p95": 0.0, "max": 0.0}
+    return {
+        "avg": round(sum(samples) / len(samples) * 1000, 2),
+        "p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 2),
+        "max": round(samples[-1] * 1000, 2),
+    }
+
+# ============================================================================
+# Shared pools
+# ============================================================================
+
+_cpu_executor = None
+_io_executor = None
+
+def get_cpu_executor() -> ManagedExecutor:
+    """Pool for CPU-bound work: CSV parsing, statistics, PDF rendering"""
+    global _cpu_executor
+    if _cpu_executor is None:
+        _cpu_executor = ManagedExecutor("cpu", CPU_EXECUTOR_WORKERS, CPU_EXECUTOR_MAX_QUEUE)
+    return _cpu_executor
+
+def get_io_executor() -> ManagedExecutor:
+    """Pool for blocking I/O: synchronous Mongo/disk stores and file writes"""
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ManagedExecutor("io", IO_EXECUTOR_WORKERS, IO_EXECUTOR_MAX_QUEUE)
+    return _io_executor
+
+async def run_cpu_bound(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    return await get_cpu_executor().run(fn, *args, **kwargs)
+
+async def run_blocking_io(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    return await get_io_executor().run(fn, *args, **kwargs)
+
+def executor_stats() -> Dict[str, Any]:
+    return {
+        "cpu": get_cpu_executor().stats(),
+        "io": get_io_executor().stats(),
+    }
+
+def shutdown_executors() -> None:
+    global _cpu_executor, _io_executor
+    for executor in (_cpu_executor, _io_executor):
+        if executor is not None:
+            executor.shutdown()
+    _cpu_executor = None
+    _io_executor = None
@@ -0,0 +1,108 @@
+"""
+HTTP validators and byte ranges
+Helpers for ETag / Last-Modified revalidation and single-range Range requests
+"""
+
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiableError(ValueError):
+    """Raised when a Range header lies entirely outside the resource"""
+
+
+def strong_etag(content_hash: str) -> str:
+    """Quoted strong ETag for a content hash"""
+    return f'"{content_hash}"'
+
+
+def http_date(value: datetime) -> str:
+    """RFC 7231 date for a naive-UTC or aware datetime"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def etag_matches(header: Optional[str], etag: Optional[str], weak: bool = True) -> bool:
+    """
+    Check an If-None-Match / If-Range style header against ``etag``
+
+    Args:
+        header: Raw header value (comma separated list or "*")
+        etag: Current quoted ETag
+        weak: Use weak comparison (If-None-Match); If-Range needs strong
+
+    Returns:
+        True if any listed tag matches
+    """
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified_since(header: Optional[str], last_modified: Optional[datetime]) -> bool:
+    """True if ``last_modified`` is not newer than an If-Modified-Since header"""
+    if not header or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def parse_range(header: Optional[str], length: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single ``bytes=`` range against a resource of ``length`` bytes
+
+    Multi-range and malformed headers return None, which callers treat as a
+    request for the full body (RFC 7233 allows ignoring Range).
+
+    Args:
+        header: Raw Range header value
+        length: Resource size in bytes
+
+    Returns:
+        Inclusive (start, end) offsets, or None to serve the whole resource
+
+    Raises:
+        RangeNotSatisfiableError: If the range starts beyond the resource
+    """
+    if not header:
+        return None
+    match = _RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        suffix = int(last)
+        if suffix == 0:
+            raise RangeNotSatisfiableError(header)
+        return max(length - suffix, 0), length - 1
+
+    start = int(first)
+    if start >= length:
+        raise RangeNotSatisfiableError(header)
+    end = int(last) if last else length - 1
+    if end < start:
+        return None
+    return start, min(end, length - 1)
@@ -0,0 +1,88 @@
+"""
+API middleware
+Pure-ASGI replacement for the exception and token-refresh ``@app.middleware("http")`` layers
+"""
+
+import json
+import logging
+import traceback
+from typing import Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+TOKEN_EXPIRED_CONTENT = {"detail": "Token expired", "code": "token_expired"}
+
+
+def _json_message(status: int, content: dict, extra_headers: Iterable[Tuple[bytes, bytes]] = ()):
+    body = json.dumps(content).encode("utf-8")
+    headers: List[Tuple[bytes, bytes]] = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode("latin-1")),
+        *extra_headers
+    ]
+    return (
+        {"type": "http.response.start", "status": status, "headers": headers},
+        {"type": "http.response.body", "body": body}
+    )
+
+
+def _is_token_expired(headers: Iterable[Tuple[bytes, bytes]]) -> bool:
+    for name, value in headers:
+        if name.lower() == b"www-authenticate" and b"token_expired" in value:
+            return True
+    return False
+
+
+class ApiMiddleware:
+    """
+    Error-to-JSON conversion and the token-expired signal in one ASGI layer
+
+    * Unhandled exceptions become ``500 {"detail", "error"}`` JSON responses
+      (unless the response already started streaming).
+    * 401 responses raised for an expired access token are rewritten to
+      ``{"detail": "Token expired", "code": "token_expired"}`` with an
+      ``X-Token-Expired: true`` header so the frontend knows to refresh. The
+      decision is made from the ``WWW-Authenticate`` header set by
+      ``decode_token``; the original body is dropped, never buffered.
+
+    Register it inside ``CORSMiddleware`` (add it first) so the responses it
+    produces get the same CORS headers as everything else.
+    """
+
+    def __init__(self, app, token_exempt_prefixes: Tuple[str, ...] = ("/api/auth/",)):
+        self.app = app
+        self.token_exempt_prefixes = token_exempt_prefixes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        check_token = (scope["method"] != "OPTIONS" and
+                       not scope["path"].startswith(self.token_exempt_prefixes))
+        response_started = False
+        drop_body = False
+
+        async def send_wrapper(message):
+            nonlocal response_started, drop_body
+            if message["type"] == "http.response.start":
+                response_started = True
+                if check_token and message["status"] == 401 and _is_token_expired(message.get("headers", ())):
+                    drop_body = True
+                    for replacement in _json_message(401, TOKEN_EXPIRED_CONTENT,
+                                                     [(b"x-token-expired", b"true")]):
+                        await send(replacement)
+                    return
+            elif message["type"] == "http.response.body" and drop_body:
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            if response_started:
+                raise
+            logger.error(f"Unhandled exception: {str(exc)}")
+            logger.error(traceback.format_exc())
+            for message in _json_message(500, {"detail": "Internal server error", "error": str(exc)}):
+                await send(message)
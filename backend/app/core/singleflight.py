@@ -0,0 +1,74 @@
+"""
+Single-flight request coalescing
+Concurrent callers asking for the same key share one in-flight computation
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def flight_key(*parts: Any) -> str:
+    """Stable key for JSON-serializable inputs (dict key order does not matter)"""
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one
+
+    The first caller for a key starts ``fn()`` as a task; callers arriving
+    while it runs await the same task and get the same result (or
+    exception). Nothing is kept once the task finishes, so this is not a
+    cache: the next call after completion runs ``fn()`` again. A caller
+    that is cancelled does not cancel the shared task.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._counters = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``fn()`` for ``key`` unless a run for it is already in flight
+
+        Args:
+            key: Identity of the computation (see ``flight_key``)
+            fn: Coroutine factory; only called by the first caller
+
+        Returns:
+            The shared result; callers must treat it as read-only
+        """
+        self._counters["calls"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self._counters["executions"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self._counters["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            # Retrieved here so a failure nobody awaited anymore isn't logged as unhandled
+            logger.debug(f"{self.name}: shared call failed: {task.exception()}")
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self._counters["calls"]
+        return {
+            **self._counters,
+            "in_flight": len(self._inflight),
+            "coalesced_ratio": round(self._counters["coalesced"] / calls, 4) if calls else 0.0,
+        }
@@ -0,0 +1,266 @@
+"""
+Authenticated user cache
+In-process TTL + LRU cache for get_current_user, optionally shared through Redis
+"""
+
+import asyncio
+import copy
+import json
+import os
+import time
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+# Set REDIS_URL (and install the ``redis`` package) to share entries and
+# invalidations between API workers
+REDIS_URL = os.getenv("REDIS_URL")
+USER_CACHE_REDIS_PREFIX = os.getenv("USER_CACHE_REDIS_PREFIX", "user_cache:")
+USER_CACHE_INVALIDATION_CHANNEL = f"{USER_CACHE_REDIS_PREFIX}invalidate"
+
+# Never cached: the password hash and the rotating refresh token
+UNCACHED_FIELDS = ("password", "refresh_token")
+
+UserLoader = Callable[[], Awaitable[Optional[Dict[str, Any]]]]
+
+
+def _encode(user: Dict[str, Any]) -> str:
+    def default(value):
+        if isinstance(value, datetime):
+            return {"__datetime__": value.isoformat()}
+        return str(value)
+    return json.dumps(user, default=default)
+
+
+def _decode(raw: str) -> Dict[str, Any]:
+    def hook(value):
+        if "__datetime__" in value:
+            return datetime.fromisoformat(value["__datetime__"])
+        return value
+    return json.loads(raw, object_hook=hook)
+
+
+class UserCache:
+    """
+    TTL + LRU cache of authenticated users keyed by user id
+
+    Lookups go local cache -> Redis (when configured) -> MongoDB loader.
+    ``invalidate`` drops the entry everywhere and, with Redis, tells every
+    other worker to drop its local copy through a pub/sub channel.
+    """
+
+    def __init__(self, ttl_seconds: float = USER_CACHE_TTL_SECONDS,
+                 max_entries: int = USER_CACHE_MAX_ENTRIES,
+                 redis_url: Optional[str] = REDIS_URL):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # Bumped on invalidation so a load that raced with it is not cached
+        self._versions: Dict[str, int] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+        self._started_at = time.monotonic()
+        self._counters = {
+            "hits": 0, "shared_hits": 0, "coalesced": 0, "misses": 0,
+            "invalidations": 0, "remote_invalidations": 0, "evictions": 0
+        }
+        # Per-second buckets over the last minute of lookups served without MongoDB
+        self._saved_seconds = [0] * 60
+        self._saved_counts = [0] * 60
+
+        if redis_url:
+            try:
+                import redis.asyncio as redis_asyncio
+                self._redis = redis_asyncio.from_url(redis_url, decode_responses=True)
+            except ImportError:
+                logger.warning("⚠️ REDIS_URL is set but the redis package is not installed; "
+                               "user cache stays process-local")
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self._redis is not None else "memory"
+
+    async def start(self) -> None:
+        """Subscribe to invalidations from other workers (no-op without Redis)"""
+        if self._redis is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen_for_invalidations())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._redis is not None:
+            await self._redis.close()
+
+    async def get_or_load(self, user_id: str, loader: UserLoader) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached user for ``user_id``, calling ``loader`` on a miss
+
+        Args:
+            user_id: User id from the access token
+            loader: Coroutine factory that reads the user from MongoDB
+
+        Returns:
+            A private copy of the user document, or None if the loader found nothing
+        """
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            expires_at, user = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self._counters["hits"] += 1
+                self._record_saved()
+                return copy.deepcopy(user)
+            del self._entries[user_id]
+
+        # Concurrent misses for the same user (one page load fires several calls) share one load
+        task = self._inflight.get(user_id)
+        if task is None:
+            task = asyncio.ensure_future(self._load(user_id, loader, self._versions.get(user_id, 0)))
+            self._inflight[user_id] = task
+            task.add_done_callback(lambda done: self._forget_inflight(user_id, done))
+        else:
+            self._counters["coalesced"] += 1
+            self._record_saved()
+
+        user = await asyncio.shield(task)
+        return copy.deepcopy(user) if user is not None else None
+
+    async def _load(self, user_id: str, loader: UserLoader, version: int) -> Optional[Dict[str, Any]]:
+        if self._redis is not None:
+            try:
+                raw = await self._redis.get(self._redis_key(user_id))
+            except Exception as redis_error:
+                logger.warning(f"⚠️ User cache Redis read failed: {redis_error}")
+                raw = None
+            if raw is not None:
+                user = _decode(raw)
+                self._store(user_id, user, version)
+                self._counters["shared_hits"] += 1
+                self._record_saved()
+                return user
+
+        self._counters["misses"] += 1
+        user = await loader()
+        if user is None:
+            return None
+
+        user = {key: value for key, value in user.items() if key not in UNCACHED_FIELDS}
+        if self._store(user_id, user, version) and self._redis is not None:
+            try:
+                await self._redis.set(self._redis_key(user_id), _encode(user),
+                                      ex=max(int(self.ttl_seconds), 1))
+            except Exception as redis_error:
+                logger.warning(f"⚠️ User cache Redis write failed: {redis_error}")
+        return user
+
+    def _forget_inflight(self, user_id: str, task: asyncio.Future) -> None:
+        if self._inflight.get(user_id) is task:
+            del self._inflight[user_id]
+
+    async def invalidate(self, user_id: str) -> None:
+        """Drop ``user_id`` from this worker, Redis and every other worker"""
+        self._evict_local(user_id)
+        self._counters["invalidations"] += 1
+        if self._redis is not None:
+            try:
+                await self._redis.delete(self._redis_key(user_id))
+                await self._redis.publish(USER_CACHE_INVALIDATION_CHANNEL, user_id)
+            except Exception as redis_error:
+                logger.warning(f"⚠️ User cache Redis invalidation failed: {redis_error}")
+
+    def clear(self) -> None:
+        for user_id in list(self._entries):
+            self._evict_local(user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        counters = self._counters
+        served = counters["hits"] + counters["shared_hits"] + counters["coalesced"]
+        lookups = served + counters["misses"]
+        uptime_minutes = max((time.monotonic() - self._started_at) / 60, 1 / 60)
+        return {
+            "backend": self.backend,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            **counters,
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+            "mongo_queries_saved": served,
+            "mongo_queries_saved_last_minute": self._saved_last_minute(),
+            "mongo_queries_saved_per_minute_avg": round(served / uptime_minutes, 1)
+        }
+
+    def _store(self, user_id: str, user: Dict[str, Any], version: int) -> bool:
+        if self._versions.get(user_id, 0) != version:
+            return False
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+        return True
+
+    def _evict_local(self, user_id: str) -> None:
+        self._entries.pop(user_id, None)
+        self._inflight.pop(user_id, None)
+        self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def _redis_key(self, user_id: str) -> str:
+        return f"{USER_CACHE_REDIS_PREFIX}{user_id}"
+
+    def _record_saved(self) -> None:
+        second = int(time.monotonic())
+        slot = second % 60
+        if self._saved_seconds[slot] != second:
+            self._saved_seconds[slot] = second
+            self._saved_counts[slot] = 0
+        self._saved_counts[slot] += 1
+
+    def _saved_last_minute(self) -> int:
+        now = int(time.monotonic())
+        return sum(count for second, count in zip(self._saved_seconds, self._saved_counts)
+                   if now - second < 60)
+
+    async def _listen_for_invalidations(self) -> None:
+        while True:
+            try:
+                pubsub = self._redis.pubsub()
+                await pubsub.subscribe(USER_CACHE_INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._evict_local(message["data"])
+                        self._counters["remote_invalidations"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as redis_error:
+                # Entries can be stale until the TTL while disconnected; drop them all
+                logger.warning(f"⚠️ User cache invalidation channel lost: {redis_error}")
+                self.clear()
+                await asyncio.sleep(5)
+
+
+# Global cache instance
+_user_cache: Optional[UserCache] = None
+
+
+def get_user_cache() -> UserCache:
+    """Get or create the process-wide user cache"""
+    global _user_cache
+    if _user_cache is None:
+        _user_cache = UserCache()
+        logger.info(f"✅ User cache ready ({_user_cache.backend}, ttl={USER_CACHE_TTL_SECONDS}s)")
+    return _user_cache
@@ -0,0 +1,260 @@
+"""
+Streaming CSV ingestion
+Reads uploaded files in fixed-size chunks and parses them incrementally into Arrow
+"""
+
+import codecs
+import io
+import os
+import logging
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+
+from app.ingestion.schema_inference import SCHEMA_INFERENCE_ENABLED, SCHEMA_SAMPLE_ROWS, infer_schema
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+UPLOAD_CHUNK_SIZE_BYTES = int(os.getenv("UPLOAD_CHUNK_SIZE_BYTES", str(1024 * 1024)))
+UPLOAD_ROWS_PER_CHUNK = int(os.getenv("UPLOAD_ROWS_PER_CHUNK", "100000"))
+UPLOAD_MAX_MEMORY_MB = float(os.getenv("UPLOAD_MAX_MEMORY_MB", "1024"))
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when a parsed upload grows past the configured memory ceiling"""
+
+
+@dataclass
+class IngestResult:
+    """
+    Parsed upload together with the ingestion bookkeeping
+
+    The data stays an Arrow table made of the parsed chunks; convert only
+    the columns or rows a stage needs with ``to_pandas`` or ``table.slice``.
+    """
+    table: pa.Table
+    bytes_read: int
+    chunks: int
+    memory_usage_mb: float
+    schema: Optional[Dict[str, Any]] = None
+
+    def to_pandas(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """The upload (or ``columns`` of it) as a DataFrame; copies the data"""
+        table = self.table if columns is None else self.table.select(list(columns))
+        return table.to_pandas()
+
+
+def frame_to_arrow(df: pd.DataFrame) -> pa.Table:
+    """Arrow table for ``df``; object columns with mixed types are stored as strings"""
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        mixed = {}
+        for column in df.columns:
+            if df[column].dtype != object:
+                continue
+            try:
+                pa.array(df[column], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                mixed[str(column)] = df[column].astype("string")
+        return pa.Table.from_pandas(df.rename(columns=str).assign(**mixed), preserve_index=False)
+
+
+def _common_type(types: List[pa.DataType]) -> pa.DataType:
+    """Type a column takes when chunks disagree, following ``pd.concat``"""
+    known = [kind for kind in types if not pa.types.is_null(kind)]
+    if len(set(known)) == 1:
+        return known[0]
+    if all(pa.types.is_signed_integer(kind) for kind in known):
+        # Downcast chunks that needed wider integers
+        return max(known, key=lambda kind: kind.bit_width)
+    if all(pa.types.is_integer(kind) or pa.types.is_boolean(kind) for kind in known):
+        return pa.int64()
+    if all(pa.types.is_dictionary(kind) for kind in known) and \
+            len({kind.value_type for kind in known}) == 1:
+        # Categoricals with more categories in some chunks get wider codes
+        return pa.dictionary(pa.int32(), known[0].value_type)
+    if all(pa.types.is_integer(kind) or pa.types.is_floating(kind) or pa.types.is_boolean(kind)
+           for kind in known):
+        return pa.float64()
+    return pa.string()
+
+
+def concat_chunks(tables: List[pa.Table]) -> pa.Table:
+    """
+    Stack per-chunk tables without copying their buffers
+
+    Each chunk's types are inferred on their own, so a column can come back
+    as integers in one chunk and floats or text in the next. Those columns
+    are cast to a common type first; all other columns are only referenced.
+    Categorical columns end up sharing one dictionary, which Arrow IPC
+    files require.
+    """
+    if not tables:
+        return pa.table({})
+    schema = tables[0].schema
+    if any(not table.schema.equals(schema) for table in tables[1:]):
+        names = schema.names
+        if any(table.schema.names != names for table in tables[1:]):
+            raise ValueError("CSV chunks disagree on their columns")
+        target = pa.schema([
+            pa.field(name, _common_type([table.schema.field(name).type for table in tables]))
+            for name in names
+        ])
+        tables = [table if table.schema.equals(target) else table.cast(target) for table in tables]
+    table = pa.concat_tables(tables)
+    if any(pa.types.is_dictionary(kind) for kind in table.schema.types):
+        table = table.unify_dictionaries()
+    return table
+
+
+class ChunkedTextReader(io.TextIOBase):
+    """
+    Read-only text stream over a binary source
+
+    Pulls at most ``chunk_size`` bytes from the source at a time and decodes
+    them incrementally, so multi-byte characters split across chunk
+    boundaries are handled without ever holding the full payload.
+    """
+
+    def __init__(self, source: BinaryIO, chunk_size: int = UPLOAD_CHUNK_SIZE_BYTES,
+                 encoding: str = "utf-8"):
+        self._source = source
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="strict")
+        self._buffer = ""
+        self._eof = False
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def _fill(self) -> None:
+        chunk = self._source.read(self._chunk_size)
+        if not chunk:
+            self._buffer += self._decoder.decode(b"", final=True)
+            self._eof = True
+            return
+        self.bytes_read += len(chunk)
+        self._buffer += self._decoder.decode(chunk)
+
+    def read(self, size: Optional[int] = -1) -> str:
+        if size is None or size < 0:
+            while not self._eof:
+                self._fill()
+            data, self._buffer = self._buffer, ""
+            return data
+
+        while len(self._buffer) < size and not self._eof:
+            self._fill()
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def readline(self, size: Optional[int] = -1) -> str:
+        while "\n" not in self._buffer and not self._eof:
+            self._fill()
+        end = self._buffer.find("\n") + 1 or len(self._buffer)
+        if size is not None and 0 <= size < end:
+            end = size
+        data, self._buffer = self._buffer[:end], self._buffer[end:]
+        return data
+
+
+def ingest_csv(source: BinaryIO,
+               chunk_size: int = UPLOAD_CHUNK_SIZE_BYTES,
+               rows_per_chunk: int = UPLOAD_ROWS_PER_CHUNK,
+               max_memory_mb: float = UPLOAD_MAX_MEMORY_MB,
+               compact: bool = SCHEMA_INFERENCE_ENABLED,
+               **read_csv_kwargs) -> IngestResult:
+    """
+    Parse a CSV from a binary file object without buffering the raw payload
+
+    Each parsed chunk is moved into Arrow and dropped, so the raw payload,
+    the chunk frames and a concatenated copy are never held together; the
+    result references the chunk buffers as they are. With ``compact`` the
+    leading rows are sampled first and every chunk is converted to the
+    inferred schema (small integers, categoricals, parsed dates) before it
+    is kept. If a later chunk has a value a date column's format doesn't
+    fit, the upload is read again with that column left as text, so no
+    column mixes parsed dates with raw strings.
+
+    Args:
+        source: Binary file object positioned at the start of the CSV
+        chunk_size: Bytes pulled from ``source`` per read
+        rows_per_chunk: Rows handed back by the chunked parser per batch
+        max_memory_mb: Ceiling for the parsed frame; 0 disables the check
+        compact: Infer compact dtypes from a sample (needs a seekable source)
+        **read_csv_kwargs: Extra options forwarded to ``pd.read_csv``
+
+    Returns:
+        IngestResult with the parsed table and ingestion statistics
+
+    Raises:
+        UploadTooLargeError: If the parsed data exceeds ``max_memory_mb``
+    """
+    schema = None
+    # SpooledTemporaryFile (FastAPI uploads) only gained seekable() in 3.11
+    if compact and getattr(source, "seekable", lambda: hasattr(source, "seek"))():
+        start = source.tell()
+        sample = pd.read_csv(ChunkedTextReader(source, chunk_size=chunk_size),
+                             nrows=SCHEMA_SAMPLE_ROWS, **read_csv_kwargs)
+        source.seek(start)
+        schema = infer_schema(sample)
+        del sample
+
+    ceiling_bytes = max_memory_mb * 1024 ** 2
+    while True:
+        reader = ChunkedTextReader(source, chunk_size=chunk_size)
+        tables: List[pa.Table] = []
+        memory_bytes = 0
+        saved_bytes = 0
+        reparse = False
+
+        with pd.read_csv(reader, chunksize=rows_per_chunk, **read_csv_kwargs) as parser:
+            for frame in parser:
+                if schema is not None:
+                    dates = len(schema.dates)
+                    frame, saved = schema.apply(frame)
+                    saved_bytes += saved
+                    # Earlier chunks hold parsed dates for a column that is text after all
+                    if len(schema.dates) < dates and tables:
+                        reparse = True
+                        break
+                table = frame_to_arrow(frame)
+                del frame
+                memory_bytes += table.nbytes
+                if ceiling_bytes and memory_bytes > ceiling_bytes:
+                    raise UploadTooLargeError(
+                        f"Upload exceeds the {max_memory_mb:.0f} MB memory limit "
+                        f"after {reader.bytes_read / 1024 ** 2:.1f} MB read"
+                    )
+                tables.append(table)
+
+        if not reparse:
+            break
+        logger.warning("⚠️ Date format changed mid-upload; parsing it again with the column as text")
+        del tables
+        source.seek(start)
+
+    table = concat_chunks(tables)
+    del tables
+
+    chunks = -(-reader.bytes_read // chunk_size)
+    logger.info(
+        f"📥 Ingested {reader.bytes_read} bytes in {chunks} chunks: "
+        f"{table.num_rows} rows, {memory_bytes / 1024 ** 2:.1f} MB in memory"
+        + (f" ({saved_bytes / 1024 ** 2:.1f} MB saved by compact dtypes)" if schema is not None else "")
+    )
+    return IngestResult(
+        table=table,
+        bytes_read=reader.bytes_read,
+        chunks=chunks,
+        memory_usage_mb=memory_bytes / 1024 ** 2,
+        schema=schema.describe() if schema is not None else None
+    )
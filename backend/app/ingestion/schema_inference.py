@@ -0,0 +1,195 @@
+"""
+Schema inference
+Samples uploaded data once and picks compact dtypes: small integers, categoricals and parsed dates
+"""
+
+import os
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SCHEMA_INFERENCE_ENABLED = os.getenv("SCHEMA_INFERENCE_ENABLED", "true").lower() == "true"
+SCHEMA_SAMPLE_ROWS = int(os.getenv("SCHEMA_SAMPLE_ROWS", "10000"))
+# Text columns become categoricals when the sample has at most this many
+# distinct values, and they make up at most this share of its rows
+SCHEMA_CATEGORY_MAX_UNIQUE = int(os.getenv("SCHEMA_CATEGORY_MAX_UNIQUE", "1000"))
+SCHEMA_CATEGORY_MAX_RATIO = float(os.getenv("SCHEMA_CATEGORY_MAX_RATIO", "0.5"))
+
+# Tried in order. A sample that fits a day/month layout either way round
+# (every day 12 or less) is ambiguous and stays text
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%d-%m-%Y",
+    "%d/%m/%Y",
+    "%d.%m.%Y",
+    "%m/%d/%Y",
+    "%Y/%m/%d",
+)
+
+INTEGER_DTYPES = ("int8", "int16", "int32", "int64")
+
+
+def _smallest_integer(low: int, high: int, floor: str = "int8") -> str:
+    """Narrowest signed integer dtype, no narrower than ``floor``, holding ``low..high``"""
+    for name in INTEGER_DTYPES[INTEGER_DTYPES.index(floor):]:
+        info = np.iinfo(name)
+        if info.min <= low and high <= info.max:
+            return name
+    return "int64"
+
+
+def _swap_day_month(date_format: str) -> Optional[str]:
+    """The same layout with day and month exchanged (None unless it leads with either)"""
+    if not date_format.startswith(("%d", "%m")):
+        return None
+    return date_format.replace("%d", "\0").replace("%m", "%d").replace("\0", "%m")
+
+
+def _date_format(values: pd.Series) -> Optional[str]:
+    """First of ``DATE_FORMATS`` that parses every sampled value, and only that way round"""
+    present = values.dropna()
+    if present.empty or not all(isinstance(value, str) for value in present.iloc[:100]):
+        return None
+    distinct = pd.Series(present.unique())
+
+    def parses(date_format: str) -> bool:
+        return pd.to_datetime(distinct, format=date_format, errors="coerce").notna().all()
+
+    for date_format in DATE_FORMATS:
+        if parses(date_format):
+            swapped = _swap_day_month(date_format)
+            if swapped and parses(swapped):
+                logger.info(f"🧮 Column {values.name} fits {date_format} and {swapped}; kept as text")
+                return None
+            return date_format
+    return None
+
+
+@dataclass
+class InferredSchema:
+    """
+    Target dtypes for an upload, chosen from a sample
+
+    ``apply`` converts each frame (a whole upload or one parsed chunk) to
+    these dtypes. Integer columns widen when a later chunk holds values
+    outside the sampled range, so the choice never truncates data. A date
+    column with a value its format doesn't fit is dropped from ``dates``;
+    chunks converted before that have to be parsed again.
+    """
+    integers: Dict[Any, str] = field(default_factory=dict)
+    categories: List[Any] = field(default_factory=list)
+    dates: Dict[Any, str] = field(default_factory=dict)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "integers": {str(column): dtype for column, dtype in self.integers.items()},
+            "categories": [str(column) for column in self.categories],
+            "dates": {str(column): date_format for column, date_format in self.dates.items()}
+        }
+
+    def apply(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+        """
+        Convert ``df`` to the inferred dtypes
+
+        Args:
+            df: Frame parsed with default dtypes
+
+        Returns:
+            Tuple of (converted frame, bytes saved per ``memory_usage(deep=True)``)
+        """
+        converted: Dict[Any, pd.Series] = {}
+        for column, dtype in list(self.integers.items()):
+            values = df.get(column)
+            if values is None or values.empty or not pd.api.types.is_integer_dtype(values):
+                continue
+            dtype = _smallest_integer(int(values.min()), int(values.max()), dtype)
+            self.integers[column] = dtype
+            converted[column] = values.astype(dtype)
+
+        for column in self.categories:
+            values = df.get(column)
+            if values is None:
+                continue
+            if values.isna().all():
+                # A chunk without values stays untyped rather than fixing the categories' type
+                converted[column] = pd.Series(None, index=values.index, dtype=object)
+            elif values.dtype == object:
+                converted[column] = values.astype("category")
+
+        for column, date_format in list(self.dates.items()):
+            values = df.get(column)
+            if values is None or not (values.dtype == object or values.isna().all()):
+                continue
+            parsed = pd.to_datetime(values, format=date_format, errors="coerce")
+            if parsed.isna().sum() > values.isna().sum():
+                # Keep the text rather than lose the values the format doesn't fit
+                logger.warning(f"⚠️ Column {column} does not match {date_format}; kept as text")
+                del self.dates[column]
+                continue
+            converted[column] = parsed
+
+        if not converted:
+            return df, 0
+        saved = 0
+        compact = df.copy(deep=False)
+        for column, values in converted.items():
+            saved += int(df[column].memory_usage(deep=True, index=False)
+                         - values.memory_usage(deep=True, index=False))
+            compact[column] = values
+        return compact, saved
+
+
+def infer_schema(sample: pd.DataFrame) -> InferredSchema:
+    """
+    Choose compact dtypes from the leading rows of an upload
+
+    Integer columns get the narrowest type holding the sampled range;
+    floats stay float64 so sums and means are unchanged. Text columns that
+    match one of ``DATE_FORMATS`` throughout are parsed with that format,
+    and low-cardinality text becomes categorical.
+
+    Args:
+        sample: Leading rows parsed with default dtypes
+
+    Returns:
+        InferredSchema to ``apply`` to the full upload or each of its chunks
+    """
+    schema = InferredSchema()
+    for column in sample.columns:
+        values = sample[column]
+        if pd.api.types.is_integer_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            if not values.empty:
+                schema.integers[column] = _smallest_integer(int(values.min()), int(values.max()))
+        elif values.dtype == object:
+            date_format = _date_format(values)
+            if date_format:
+                schema.dates[column] = date_format
+                continue
+            present = values.count()
+            distinct = values.nunique(dropna=True)
+            if present and distinct <= SCHEMA_CATEGORY_MAX_UNIQUE \
+                    and distinct <= SCHEMA_CATEGORY_MAX_RATIO * present:
+                schema.categories.append(column)
+    logger.info(f"🧮 Inferred schema from {len(sample)} rows: {schema.describe()}")
+    return schema
+
+
+def compact_frame(df: pd.DataFrame, sample_rows: int = SCHEMA_SAMPLE_ROWS) -> Tuple[pd.DataFrame, int]:
+    """
+    Infer a schema from the head of ``df`` and apply it to the whole frame
+
+    Returns:
+        Tuple of (converted frame, bytes saved)
+    """
+    return infer_schema(df.head(sample_rows)).apply(df)
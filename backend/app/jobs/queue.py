@@ -0,0 +1,267 @@
+"""
+Background job queue for report generation
+Jobs live in the MongoDB ``jobs`` collection and are claimed atomically by workers
+"""
+
+import asyncio
+import os
+import tempfile
+import uuid
+import logging
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, Optional
+
+from pymongo import ReturnDocument
+
+from app.storage.shared_files import SharedFiles
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# "local" runs workers inside the API process, "mongo" expects worker.py processes
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "local")
+JOB_LOCAL_WORKERS = int(os.getenv("JOB_LOCAL_WORKERS", "2"))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1.0"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "600"))
+# How often running jobs refresh heartbeat_at, and how often stale jobs are looked for
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "30"))
+JOB_STALE_CHECK_SECONDS = float(os.getenv("JOB_STALE_CHECK_SECONDS", "60"))
+# Pause after a queue operation fails (e.g. MongoDB unreachable) before trying again
+JOB_ERROR_BACKOFF_SECONDS = float(os.getenv("JOB_ERROR_BACKOFF_SECONDS", "5"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+UPLOAD_STAGING_BUCKET = os.getenv("UPLOAD_STAGING_BUCKET", "upload_staging")
+# Staged uploads fetched by a worker stay in memory up to this size, then spill to disk
+UPLOAD_SPOOL_MAX_BYTES = int(os.getenv("UPLOAD_SPOOL_MAX_BYTES", str(8 * 1024 * 1024)))
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    PARSING = "parsing"
+    ANALYZING = "analyzing"
+    RENDERING = "rendering"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+ACTIVE_STATUSES = [JobStatus.PARSING.value, JobStatus.ANALYZING.value, JobStatus.RENDERING.value]
+TERMINAL_STATUSES = [JobStatus.COMPLETED.value, JobStatus.FAILED.value]
+
+JobHandler = Callable[["JobQueue", Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+async def stage_upload(db, source: BinaryIO, filename: str) -> str:
+    """
+    Copy an uploaded file to the shared staging bucket
+
+    Workers may run on other hosts than the API, so staged uploads live in
+    MongoDB GridFS rather than on local disk.
+
+    Returns:
+        Staged upload id to put in the job payload
+    """
+    upload_id = str(uuid.uuid4())
+    source.seek(0)
+    size = await SharedFiles(db, UPLOAD_STAGING_BUCKET).upload(upload_id, source, os.path.basename(filename))
+    logger.info(f"📥 Staged upload {upload_id} ({size} bytes)")
+    return upload_id
+
+
+async def open_staged_upload(db, upload_id: str) -> BinaryIO:
+    """
+    Fetch a staged upload into a spooled temporary file, positioned at the start
+
+    Raises:
+        SharedFileNotFoundError: If the upload was never staged or already discarded
+    """
+    target = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_BYTES)
+    try:
+        await SharedFiles(db, UPLOAD_STAGING_BUCKET).download(upload_id, target)
+    except BaseException:
+        target.close()
+        raise
+    target.seek(0)
+    return target
+
+
+async def discard_staged_upload(db, upload_id: str) -> None:
+    """Remove a staged upload once its job no longer needs it"""
+    await SharedFiles(db, UPLOAD_STAGING_BUCKET).delete(upload_id)
+
+
+class JobQueue:
+    """
+    MongoDB-backed job queue
+
+    ``claim`` uses ``find_one_and_update`` so each queued job is handed to
+    exactly one worker, whether workers run in this process or in separate
+    ``worker.py`` processes.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db.jobs
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def enable_local_dispatch(self) -> None:
+        """Wake in-process workers immediately on enqueue instead of polling"""
+        self._wakeup = asyncio.Event()
+
+    async def enqueue(self, job_type: str, payload: Dict[str, Any],
+                      created_by: str, report_id: Optional[str] = None) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        job = {
+            "id": str(uuid.uuid4()),
+            "type": job_type,
+            "status": JobStatus.QUEUED.value,
+            "report_id": report_id,
+            "payload": payload,
+            "created_by": created_by,
+            "attempts": 0,
+            "error": None,
+            "result": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        await self.collection.insert_one(job)
+        job.pop("_id", None)
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+        logger.info(f"📬 Job queued: {job['id']} ({job_type})")
+        return job
+
+    async def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest queued job"""
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {"status": JobStatus.QUEUED.value},
+            {
+                "$set": {
+                    "status": JobStatus.PARSING.value,
+                    "worker_id": worker_id,
+                    "started_at": now,
+                    "heartbeat_at": now,
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def update(self, job_id: str, status: JobStatus, **fields) -> None:
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"id": job_id},
+            {"$set": {"status": status.value, "heartbeat_at": now, "updated_at": now, **fields}}
+        )
+
+    async def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        await self.update(job_id, JobStatus.COMPLETED, result=result, finished_at=datetime.utcnow())
+        logger.info(f"✅ Job completed: {job_id}")
+
+    async def fail(self, job_id: str, error: str) -> None:
+        await self.update(job_id, JobStatus.FAILED, error=error, finished_at=datetime.utcnow())
+        logger.error(f"❌ Job failed: {job_id}: {error}")
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"id": job_id})
+
+    async def requeue_stale(self, stale_after: float = JOB_STALE_SECONDS) -> None:
+        """Return jobs whose worker stopped heart-beating to the queue"""
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+        stale = await self.collection.find({
+            "status": {"$in": ACTIVE_STATUSES},
+            "heartbeat_at": {"$lt": cutoff}
+        }).to_list(length=100)
+
+        for job in stale:
+            if job.get("attempts", 0) >= JOB_MAX_ATTEMPTS:
+                await self.fail(job["id"], "Worker stopped responding")
+            else:
+                await self.update(job["id"], JobStatus.QUEUED)
+                logger.warning(f"♻️ Requeued stale job: {job['id']}")
+
+    async def heartbeat(self, job_id: str) -> None:
+        """Mark a running job as alive without changing its status"""
+        await self.collection.update_one(
+            {"id": job_id, "status": {"$in": ACTIVE_STATUSES}},
+            {"$set": {"heartbeat_at": datetime.utcnow()}}
+        )
+
+    async def run_worker(self, handler: JobHandler, worker_id: str, stop: asyncio.Event,
+                         error_backoff: float = JOB_ERROR_BACKOFF_SECONDS) -> None:
+        """
+        Claim and process jobs until ``stop`` is set
+
+        Queue errors (claiming, or recording the outcome) are logged and
+        retried after ``error_backoff`` seconds instead of ending the worker;
+        a job whose outcome could not be recorded is reclaimed by
+        ``requeue_stale`` once its heartbeat stops.
+        """
+        logger.info(f"👷 Worker {worker_id} started")
+        while not stop.is_set():
+            try:
+                job = await self.claim(worker_id)
+                if job is None:
+                    await self._wait_for_work(stop)
+                    continue
+                await self._process(handler, job)
+            except Exception as e:
+                logger.error(f"❌ Worker {worker_id} queue error, retrying in {error_backoff:.0f}s: {str(e)}")
+                await self._sleep(stop, error_backoff)
+        logger.info(f"👷 Worker {worker_id} stopped")
+
+    async def run_stale_recovery(self, stop: asyncio.Event,
+                                 interval: float = JOB_STALE_CHECK_SECONDS) -> None:
+        """Call ``requeue_stale`` every ``interval`` seconds until ``stop`` is set"""
+        while not stop.is_set():
+            try:
+                await self.requeue_stale()
+            except Exception as e:
+                logger.error(f"❌ Stale job check failed: {str(e)}")
+            await self._sleep(stop, interval)
+
+    async def _process(self, handler: JobHandler, job: Dict[str, Any]) -> None:
+        heartbeat = asyncio.create_task(self._keep_alive(job["id"]))
+        try:
+            result = await handler(self, job)
+        except Exception as e:
+            await self.fail(job["id"], str(e))
+        else:
+            await self.complete(job["id"], result)
+        finally:
+            heartbeat.cancel()
+
+    async def _keep_alive(self, job_id: str) -> None:
+        """Refresh the job's heartbeat while its handler runs"""
+        while True:
+            await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+            try:
+                await self.heartbeat(job_id)
+            except Exception as e:
+                logger.warning(f"⚠️ Heartbeat for job {job_id} failed: {str(e)}")
+
+    @staticmethod
+    async def _sleep(stop: asyncio.Event, seconds: float) -> None:
+        """Wait ``seconds``, returning early when ``stop`` is set"""
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _wait_for_work(self, stop: asyncio.Event) -> None:
+        waiters = [asyncio.ensure_future(stop.wait())]
+        if self._wakeup is not None:
+            waiters.append(asyncio.ensure_future(self._wakeup.wait()))
+        done, pending = await asyncio.wait(
+            waiters, timeout=JOB_POLL_INTERVAL_SECONDS, return_when=asyncio.FIRST_COMPLETED
+        )
+        for waiter in pending:
+            waiter.cancel()
+        if self._wakeup is not None:
+            self._wakeup.clear()
@@ -0,0 +1,426 @@
+"""
+KPI provider
+Serves department KPI payloads from precomputed, pre-serialized snapshots
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# "mock" serves the static figures below, "datasets" derives KPIs from uploads
+KPI_PROVIDER_BACKEND = os.getenv("KPI_PROVIDER_BACKEND", "mock")
+KPI_REFRESH_SECONDS = float(os.getenv("KPI_REFRESH_SECONDS", "300"))
+KPI_MAX_METRICS = 4
+KPI_CHART_MONTHS = 6
+
+DEPARTMENTS = ["finance", "hr", "sales", "operations", "compliance"]
+DEFAULT_DEPARTMENT = "finance"
+
+# Columns summed rather than averaged when turned into KPI cards
+ADDITIVE_COLUMN_PATTERN = re.compile(
+    r"sales|revenue|amount|total|count|qty|quantity|orders|deals|units|cost|expense|profit",
+    re.IGNORECASE
+)
+
+# ============================================================================
+# MOCK DATA
+# ============================================================================
+
+MOCK_KPI_DATA = {
+    "finance": {
+        "kpis": [
+            {"label": "Total Revenue", "value": "$2.4M", "change": "+12.5%", "positive": True},
+            {"label": "Expenses", "value": "$1.8M", "change": "+8.2%", "positive": False},
+            {"label": "Net Profit", "value": "$600K", "change": "+18.3%", "positive": True},
+            {"label": "Profit Margin", "value": "25%", "change": "+2.1%", "positive": True}
+        ],
+        "chart_data": [
+            {"month": "Jan", "revenue": 180, "expenses": 140},
+            {"month": "Feb", "revenue": 200, "expenses": 150},
+            {"month": "Mar", "revenue": 220, "expenses": 160},
+            {"month": "Apr", "revenue": 240, "expenses": 180},
+            {"month": "May", "revenue": 260, "expenses": 190},
+            {"month": "Jun", "revenue": 280, "expenses": 200}
+        ],
+        "summary": "Q2 revenue grew by 12.5% with controlled expense management. Profit margins improved across all divisions."
+    },
+    "hr": {
+        "kpis": [
+            {"label": "Total Employees", "value": "342", "change": "+5.2%", "positive": True},
+            {"label": "Attrition Rate", "value": "8.2%", "change": "-1.3%", "positive": True},
+            {"label": "New Hires", "value": "23", "change": "+15%", "positive": True},
+            {"label": "Satisfaction", "value": "87%", "change": "+3%", "positive": True}
+        ],
+        "chart_data": [
+            {"month": "Jan", "hires": 5, "exits": 3},
+            {"month": "Feb", "hires": 8, "exits": 2},
+            {"month": "Mar", "hires": 6, "exits": 4},
+            {"month": "Apr", "hires": 7, "exits": 3},
+            {"month": "May", "hires": 9, "exits": 5},
+            {"month": "Jun", "hires": 4, "exits": 3}
+        ],
+        "summary": "Workforce grew steadily with reduced attrition. Employee satisfaction improved through new wellness programs."
+    },
+    "sales": {
+        "kpis": [
+            {"label": "Total Deals", "value": "156", "change": "+22%", "positive": True},
+            {"label": "Conversion Rate", "value": "34%", "change": "+5%", "positive": True},
+            {"label": "Pipeline Value", "value": "$4.2M", "change": "+28%", "positive": True},
+            {"label": "Avg Deal Size", "value": "$27K", "change": "+8%", "positive": True}
+        ],
+        "chart_data": [
+            {"month": "Jan", "deals": 20, "value": 540},
+            {"month": "Feb", "deals": 25, "value": 675},
+            {"month": "Mar", "deals": 28, "value": 756},
+            {"month": "Apr", "deals": 22, "value": 594},
+            {"month": "May", "deals": 30, "value": 810},
+            {"month": "Jun", "deals": 31, "value": 837}
+        ],
+        "summary": "Outstanding sales performance with 22% growth in closed deals. Pipeline value reached all-time high."
+    },
+    "operations": {
+        "kpis": [
+            {"label": "Efficiency", "value": "94%", "change": "+2%", "positive": True},
+            {"label": "Downtime", "value": "2.3h", "change": "-15%", "positive": True},
+            {"label": "Orders", "value": "1,234", "change": "+18%", "positive": True},
+            {"label": "On-Time", "value": "96%", "change": "+3%", "positive": True}
+        ],
+        "chart_data": [
+            {"month": "Jan", "efficiency": 91, "downtime": 3.2},
+            {"month": "Feb", "efficiency": 92, "downtime": 2.8},
+            {"month": "Mar", "efficiency": 93, "downtime": 2.5},
+            {"month": "Apr", "efficiency": 94, "downtime": 2.3},
+            {"month": "May", "efficiency": 94, "downtime": 2.1},
+            {"month": "Jun", "efficiency": 95, "downtime": 1.9}
+        ],
+        "summary": "Operational efficiency improved with reduced equipment downtime. On-time delivery exceeds target."
+    },
+    "compliance": {
+        "kpis": [
+            {"label": "Audits", "value": "12", "change": "0%", "positive": True},
+            {"label": "Open Issues", "value": "3", "change": "-40%", "positive": True},
+            {"label": "Resolved", "value": "89%", "change": "+12%", "positive": True},
+            {"label": "Risk Level", "value": "Low", "change": "Stable", "positive": True}
+        ],
+        "chart_data": [
+            {"month": "Jan", "audits": 2, "issues": 5},
+            {"month": "Feb", "audits": 2, "issues": 4},
+            {"month": "Mar", "audits": 2, "issues": 6},
+            {"month": "Apr", "audits": 2, "issues": 5},
+            {"month": "May", "audits": 2, "issues": 4},
+            {"month": "Jun", "audits": 2, "issues": 3}
+        ],
+        "summary": "Compliance metrics remain strong with 89% issue resolution rate. All audits passed successfully."
+    }
+}
+
+
+def _department_key(department: Any) -> str:
+    key = getattr(department, "value", department)
+    return key if key in DEPARTMENTS else DEFAULT_DEPARTMENT
+
+
+@dataclass(frozen=True)
+class KPISnapshot:
+    """
+    One department's KPI payload, serialized once per refresh
+
+    ``data`` is shared by every caller and must be treated as read-only.
+    """
+    department: str
+    data: Dict[str, Any]
+    body: bytes
+    etag: str
+    last_updated: datetime
+    source: str
+
+    @classmethod
+    def build(cls, department: str, data: Dict[str, Any], source: str) -> "KPISnapshot":
+        last_updated = datetime.utcnow()
+        body = json.dumps({
+            "department": department,
+            "kpis": data["kpis"],
+            "chart_data": data["chart_data"],
+            "summary": data["summary"],
+            "last_updated": last_updated.isoformat()
+        }).encode("utf-8")
+        # The hash skips last_updated so an unchanged refresh keeps the same ETag
+        content_hash = hashlib.sha256(
+            json.dumps(data, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:32]
+        return cls(department, data, body, f'"{content_hash}"', last_updated, source)
+
+
+class MockKPIBackend:
+    """Static demo figures"""
+
+    name = "mock"
+
+    async def load(self, department: str) -> Optional[Dict[str, Any]]:
+        return MOCK_KPI_DATA.get(department)
+
+
+class DatasetKPIBackend:
+    """
+    KPIs derived from the most recent dataset uploaded for each department
+
+    Reads the ``kpi_summary`` that the report pipeline stores in
+    ``data_uploads``; departments without uploads fall back to ``fallback``.
+    """
+
+    name = "datasets"
+
+    def __init__(self, db, fallback: Optional[MockKPIBackend] = None):
+        self.db = db
+        self.fallback = fallback or MockKPIBackend()
+
+    async def load(self, department: str) -> Optional[Dict[str, Any]]:
+        query = {"department": department, "kpi_summary": {"$exists": True}}
+        latest = await self.db.data_uploads.find(query).sort("uploaded_at", -1).limit(1).to_list(1)
+        if not latest:
+            return await self.fallback.load(department)
+
+        upload = latest[0]
+        uploads = await self.db.data_uploads.count_documents(query)
+        return kpis_from_summary(upload["kpi_summary"], upload.get("filename", "dataset"), uploads)
+
+
+class KPIProvider:
+    """
+    Department KPI cache
+
+    ``refresh`` asks the backend for every department and stores each result
+    as a ``KPISnapshot``; requests only ever read snapshots. Snapshots start
+    out from the mock data so the first request never waits on the backend.
+    """
+
+    def __init__(self, backend=None, refresh_seconds: float = KPI_REFRESH_SECONDS):
+        self.backend = backend or MockKPIBackend()
+        self.refresh_seconds = refresh_seconds
+        self._snapshots: Dict[str, KPISnapshot] = {
+            department: KPISnapshot.build(department, data, MockKPIBackend.name)
+            for department, data in MOCK_KPI_DATA.items()
+        }
+        self.refreshed_at: Optional[datetime] = None
+        self.refresh_errors = 0
+
+    def get(self, department: Any) -> KPISnapshot:
+        """Snapshot for ``department`` (unknown departments get finance, as before)"""
+        return self._snapshots[_department_key(department)]
+
+    async def refresh(self) -> None:
+        """Rebuild every department snapshot from the backend"""
+        for department in DEPARTMENTS:
+            try:
+                data = await self.backend.load(department)
+            except Exception as backend_error:
+                self.refresh_errors += 1
+                logger.error(f"❌ KPI refresh failed for {department}: {backend_error}")
+                continue
+            if data is None:
+                continue
+            snapshot = KPISnapshot.build(department, data, self.backend.name)
+            if snapshot.etag != self._snapshots[department].etag:
+                self._snapshots[department] = snapshot
+        self.refreshed_at = datetime.utcnow()
+        logger.info(f"📊 KPI snapshots refreshed from {self.backend.name}")
+
+    async def run_refresh_loop(self, stop: asyncio.Event) -> None:
+        """Refresh immediately, then every ``refresh_seconds`` until ``stop`` is set"""
+        while not stop.is_set():
+            await self.refresh()
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.refresh_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend.name,
+            "refresh_seconds": self.refresh_seconds,
+            "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at else None,
+            "refresh_errors": self.refresh_errors,
+            "sources": {department: snapshot.source for department, snapshot in self._snapshots.items()}
+        }
+
+
+# ============================================================================
+# DATASET SUMMARIES
+# ============================================================================
+
+def _format_number(value: float) -> str:
+    magnitude = abs(value)
+    if magnitude >= 1e9:
+        return f"{value / 1e9:.1f}B"
+    if magnitude >= 1e6:
+        return f"{value / 1e6:.1f}M"
+    if magnitude >= 1e3:
+        return f"{value / 1e3:.1f}K"
+    return f"{value:,.2f}".rstrip("0").rstrip(".")
+
+
+def _kpi_columns(table: pa.Table) -> List[str]:
+    """Numeric columns worth a KPI card: skip ids and binary flags"""
+    import pyarrow.compute as pc
+
+    columns = []
+    for field in table.schema:
+        if not (pa.types.is_integer(field.type) or pa.types.is_floating(field.type)):
+            continue
+        name = field.name.lower()
+        if name == "id" or name.endswith("_id") or name in ("store", "index"):
+            continue
+        if pc.count_distinct(table[field.name], mode="only_valid").as_py() <= 2:
+            continue
+        columns.append(field.name)
+    return columns[:KPI_MAX_METRICS]
+
+
+def _month_keys(table: pa.Table) -> Optional[pa.ChunkedArray]:
+    """``year * 12 + month - 1`` per row from the first date-like column (null if unparsed)"""
+    import pyarrow.compute as pc
+
+    for name in table.column_names:
+        if "date" not in name.lower() and "month" not in name.lower():
+            continue
+        column = table[name]
+        if pa.types.is_timestamp(column.type) or pa.types.is_date(column.type):
+            return pc.add(pc.multiply(pc.year(column), 12), pc.subtract(pc.month(column), 1))
+        # Parse each distinct value once and map the result back onto the rows
+        if not pa.types.is_dictionary(column.type):
+            column = pc.dictionary_encode(column)
+        chunks = []
+        for chunk in column.chunks:
+            dates = pd.to_datetime(chunk.dictionary.to_pandas(), dayfirst=True, errors="coerce")
+            keys = pa.array(dates.dt.year * 12 + dates.dt.month - 1, type=pa.int64(), from_pandas=True)
+            chunks.append(keys.take(chunk.indices))
+        months = pa.chunked_array(chunks, type=pa.int64())
+        if months.null_count < 0.1 * len(months):
+            return months
+    return None
+
+
+def summarize_dataset(data: Union[pd.DataFrame, pa.Table]) -> Dict[str, Any]:
+    """
+    Compact KPI summary of an uploaded dataset (stored in ``data_uploads``)
+
+    Aggregates run on Arrow columns in place; only the date column is
+    converted, so an ingested upload is summarized without a pandas copy.
+
+    Args:
+        data: Parsed upload as an Arrow table or DataFrame
+
+    Returns:
+        Dict with row count, per-metric aggregate and a monthly series
+    """
+    import pyarrow.compute as pc
+
+    table = data if isinstance(data, pa.Table) else pa.Table.from_pandas(
+        data.rename(columns=str), preserve_index=False
+    )
+    # Like pandas: sums of nothing are 0, means of nothing are NaN
+    options = {"sum": pc.ScalarAggregateOptions(min_count=0), "mean": None}
+    as_float = lambda value: float("nan") if value is None else float(value)
+
+    columns = _kpi_columns(table)
+    metrics = []
+    for column in columns:
+        aggregation = "sum" if ADDITIVE_COLUMN_PATTERN.search(column) else "mean"
+        value = pc.call_function(aggregation, [table[column]], options[aggregation]).as_py()
+        metrics.append({"column": column, "aggregation": aggregation, "value": as_float(value)})
+
+    monthly = []
+    months = _month_keys(table) if columns else None
+    if months is not None:
+        grouped = (
+            pa.table({"__month": months, **{column: table[column] for column in columns}})
+            .group_by("__month")
+            .aggregate([(m["column"], m["aggregation"], options[m["aggregation"]]) for m in metrics])
+        )
+        # Rows without a parsed date form their own group; drop it after grouping
+        # rather than filtering (and copying) every column beforehand
+        grouped = grouped.filter(pc.is_valid(grouped["__month"])).sort_by("__month")
+        grouped = grouped.slice(max(grouped.num_rows - KPI_CHART_MONTHS, 0))
+        for row in grouped.to_pylist():
+            key = row["__month"]
+            monthly.append({
+                "month": datetime(key // 12, key % 12 + 1, 1).strftime("%b %Y"),
+                **{m["column"]: round(as_float(row[f"{m['column']}_{m['aggregation']}"]), 2) for m in metrics}
+            })
+
+    return {"rows": int(table.num_rows), "metrics": metrics, "monthly": monthly}
+
+
+def kpis_from_summary(summary: Dict[str, Any], filename: str, uploads: int) -> Dict[str, Any]:
+    """Turn a stored dataset summary into the dashboard KPI payload shape"""
+    monthly = summary.get("monthly", [])
+    kpis = []
+    for metric in summary.get("metrics", []):
+        column = metric["column"]
+        label = " ".join(word if word.isupper() else word.capitalize() for word in column.split("_"))
+        change, positive = "n/a", True
+        if len(monthly) >= 2 and monthly[-2].get(column):
+            delta = (monthly[-1][column] - monthly[-2][column]) / abs(monthly[-2][column]) * 100
+            change, positive = f"{delta:+.1f}%", delta >= 0
+        kpis.append({
+            "label": f"{'Total' if metric['aggregation'] == 'sum' else 'Avg'} {label}",
+            "value": _format_number(metric["value"]),
+            "change": change,
+            "positive": positive
+        })
+
+    chart_columns = [m["column"] for m in summary.get("metrics", [])][:2]
+    chart_data = [
+        {"month": point["month"], **{column.lower(): point.get(column) for column in chart_columns}}
+        for point in monthly
+    ]
+    return {
+        "kpis": kpis,
+        "chart_data": chart_data,
+        "summary": (f"Figures from {filename} ({summary.get('rows', 0):,} rows), "
+                    f"the latest of {uploads} uploaded dataset{'s' if uploads != 1 else ''}.")
+    }
+
+
+def create_kpi_backend(db, name: str = KPI_PROVIDER_BACKEND):
+    """Backend instance for ``KPI_PROVIDER_BACKEND``"""
+    if name == DatasetKPIBackend.name:
+        return DatasetKPIBackend(db)
+    if name != MockKPIBackend.name:
+        logger.warning(f"⚠️ Unknown KPI_PROVIDER_BACKEND '{name}', using mock data")
+    return MockKPIBackend()
+
+
+# Global provider instance
+_kpi_provider: Optional[KPIProvider] = None
+
+
+def get_kpi_provider() -> KPIProvider:
+    """Get or create the KPI provider (mock data until ``configure_kpi_provider``)"""
+    global _kpi_provider
+    if _kpi_provider is None:
+        _kpi_provider = KPIProvider()
+    return _kpi_provider
+
+
+def configure_kpi_provider(db) -> KPIProvider:
+    """Attach the configured backend; call once at startup"""
+    provider = get_kpi_provider()
+    provider.backend = create_kpi_backend(db)
+    return provider
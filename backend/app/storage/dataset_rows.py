@@ -0,0 +1,271 @@
+"""
+Dataset row queries
+Paginated, column-projected, filtered and sorted reads over stored datasets
+"""
+
+import base64
+import bisect
+import json
+import os
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DATASET_PAGE_DEFAULT_ROWS = int(os.getenv("DATASET_PAGE_DEFAULT_ROWS", "100"))
+DATASET_PAGE_MAX_ROWS = int(os.getenv("DATASET_PAGE_MAX_ROWS", "1000"))
+
+FILTER_OPERATORS = ("eq", "ne", "gt", "gte", "lt", "lte", "in", "contains")
+
+
+class DatasetQueryError(ValueError):
+    """Raised for row queries that name unknown columns or carry malformed parameters"""
+
+
+@dataclass
+class RowFilter:
+    """``column op value`` condition; ``in`` takes a comma-separated list"""
+    column: str
+    op: str
+    value: str
+
+
+@dataclass
+class RowQuery:
+    """One page request against a dataset"""
+    columns: Optional[List[str]] = None
+    filters: List[RowFilter] = field(default_factory=list)
+    # (column, "ascending" | "descending")
+    sort: List[Tuple[str, str]] = field(default_factory=list)
+    offset: int = 0
+    limit: int = DATASET_PAGE_DEFAULT_ROWS
+    cursor: Optional[str] = None
+
+
+def parse_filters(raw: Sequence[str]) -> List[RowFilter]:
+    """
+    Parse ``column:op:value`` filter parameters
+
+    Raises:
+        DatasetQueryError: On a malformed filter or unknown operator
+    """
+    filters = []
+    for item in raw:
+        parts = item.split(":", 2)
+        if len(parts) != 3 or not parts[0]:
+            raise DatasetQueryError(f"Filters look like column:op:value, got '{item}'")
+        column, op, value = parts
+        if op not in FILTER_OPERATORS:
+            raise DatasetQueryError(f"Unknown filter operator '{op}' (use one of {', '.join(FILTER_OPERATORS)})")
+        filters.append(RowFilter(column, op, value))
+    return filters
+
+
+def parse_sort(raw: Optional[str]) -> List[Tuple[str, str]]:
+    """Parse ``sort=col1,-col2`` (a leading ``-`` sorts descending)"""
+    keys = []
+    for item in (raw or "").split(","):
+        item = item.strip()
+        if item:
+            keys.append((item[1:], "descending") if item.startswith("-") else (item, "ascending"))
+    return keys
+
+
+def encode_cursor(position: Dict[str, int]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, int]:
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(position, dict) or not all(isinstance(v, int) and v >= 0 for v in position.values()):
+            raise ValueError(position)
+        return position
+    except ValueError:
+        raise DatasetQueryError("Invalid cursor")
+
+
+class RowGroupReader:
+    """
+    Row-group access to a memory-mapped Parquet or Arrow IPC file
+
+    Parquet row groups and Arrow record batches are both read one at a
+    time with only the requested columns decoded, so a page touches the
+    groups it overlaps rather than the whole file.
+    """
+
+    def __init__(self, path: str, file_format: str, group_rows: Optional[List[int]] = None):
+        self.file_format = file_format
+        if file_format == "parquet":
+            import pyarrow.parquet as pq
+            self._parquet = pq.ParquetFile(path, memory_map=True)
+            metadata = self._parquet.metadata
+            group_rows = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+            self.schema = self._parquet.schema_arrow
+        else:
+            self._ipc = pa.ipc.open_file(pa.memory_map(path, "r"))
+            if group_rows is None:
+                group_rows = [self._ipc.get_batch(i).num_rows for i in range(self._ipc.num_record_batches)]
+            self.schema = self._ipc.schema
+        self.group_rows = group_rows
+        self.starts = np.concatenate([[0], np.cumsum(group_rows)]).astype(np.int64).tolist()
+        self.num_rows = self.starts[-1]
+
+    def group_of(self, row: int) -> int:
+        """Index of the group holding absolute row ``row``"""
+        return bisect.bisect_right(self.starts, row) - 1
+
+    def read_group(self, index: int, columns: List[str]) -> pa.Table:
+        if self.file_format == "parquet":
+            return self._parquet.read_row_group(index, columns=columns)
+        return pa.Table.from_batches([self._ipc.get_batch(index)]).select(columns)
+
+    def read(self, columns: List[str]) -> pa.Table:
+        if self.file_format == "parquet":
+            return self._parquet.read(columns=columns)
+        return self._ipc.read_all().select(columns)
+
+
+def _filter_value(raw: str, kind: pa.DataType) -> pa.Scalar:
+    try:
+        return pa.scalar(raw).cast(kind)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+        raise DatasetQueryError(f"'{raw}' is not a valid {kind} value")
+
+
+def _filter_mask(table: pa.Table, filters: List[RowFilter]) -> pa.ChunkedArray:
+    """Rows of ``table`` matching every filter (nulls never match)"""
+    import pyarrow.compute as pc
+
+    comparisons = {"eq": pc.equal, "ne": pc.not_equal, "gt": pc.greater,
+                   "gte": pc.greater_equal, "lt": pc.less, "lte": pc.less_equal}
+    mask = None
+    for condition in filters:
+        column = table[condition.column]
+        kind = column.type.value_type if pa.types.is_dictionary(column.type) else column.type
+        if pa.types.is_dictionary(column.type):
+            column = column.cast(kind)
+        if condition.op == "contains":
+            if not (pa.types.is_string(kind) or pa.types.is_large_string(kind)):
+                raise DatasetQueryError(f"'contains' needs a text column, {condition.column} is {kind}")
+            matched = pc.match_substring(column, condition.value)
+        elif condition.op == "in":
+            values = pa.array([_filter_value(v, kind).as_py() for v in condition.value.split(",")], type=kind)
+            matched = pc.is_in(column, value_set=values)
+        else:
+            matched = comparisons[condition.op](column, _filter_value(condition.value, kind))
+        matched = pc.fill_null(matched, False)
+        mask = matched if mask is None else pc.and_(mask, matched)
+    return mask
+
+
+def query_rows(reader: RowGroupReader, query: RowQuery) -> Dict[str, Any]:
+    """
+    Run one page request (blocking)
+
+    Unsorted pages walk row groups from the requested position and stop as
+    soon as the page is full; the cursor records the absolute row to resume
+    from, so later pages never rescan earlier groups. Sorted pages read the
+    projected, sort and filter columns and select the top ``offset + limit``
+    rows, with the row number as a final tiebreaker so pages are stable.
+
+    Args:
+        reader: Open dataset file
+        query: Validated page request
+
+    Returns:
+        Dict with the projected ``columns``, ``rows`` (one dict per row),
+        ``next_cursor`` and, when known without a full scan, ``matched_rows``
+    """
+    names = reader.schema.names
+    columns = query.columns or names
+    referenced = list(dict.fromkeys(
+        list(columns) + [f.column for f in query.filters] + [key for key, _ in query.sort]
+    ))
+    unknown = [column for column in referenced if column not in names]
+    if unknown:
+        raise DatasetQueryError(f"Unknown columns: {', '.join(unknown)}")
+
+    position = decode_cursor(query.cursor) if query.cursor else {}
+    if query.sort:
+        return _sorted_page(reader, query, columns, referenced, position.get("offset", query.offset))
+
+    # Without filters an offset is a row number; with them, matches must be counted
+    start_row = position.get("row", query.offset if not query.filters else 0)
+    skip = query.offset if query.filters and "row" not in position else 0
+    needed = list(dict.fromkeys(list(columns) + [f.column for f in query.filters]))
+
+    parts: List[pa.Table] = []
+    collected = 0
+    next_row = None
+    for index in range(max(reader.group_of(start_row), 0), len(reader.group_rows)):
+        group = reader.read_group(index, needed)
+        local_start = max(start_row - reader.starts[index], 0)
+        if local_start:
+            group = group.slice(local_start)
+        if query.filters:
+            matches = np.flatnonzero(_filter_mask(group, query.filters).to_numpy(zero_copy_only=False))
+        else:
+            matches = np.arange(group.num_rows)
+        if skip:
+            dropped = min(skip, len(matches))
+            matches, skip = matches[dropped:], skip - dropped
+        matches = matches[:query.limit - collected]
+        if len(matches):
+            parts.append(group.select(columns).take(matches))
+            collected += len(matches)
+        if collected == query.limit:
+            next_row = reader.starts[index] + local_start + int(matches[-1]) + 1 if len(matches) \
+                else reader.starts[index] + local_start
+            break
+
+    page = pa.concat_tables(parts) if parts else reader.schema.empty_table().select(columns)
+    result = {
+        "columns": columns,
+        "rows": page.to_pylist(),
+        "next_cursor": encode_cursor({"row": next_row})
+        if next_row is not None and next_row < reader.num_rows else None
+    }
+    if not query.filters:
+        result["matched_rows"] = reader.num_rows
+    return result
+
+
+def _sorted_page(reader: RowGroupReader, query: RowQuery, columns: List[str],
+                 referenced: List[str], offset: int) -> Dict[str, Any]:
+    import pyarrow.compute as pc
+
+    table = reader.read(referenced)
+    table = table.append_column("__row", pa.array(np.arange(table.num_rows)))
+    if query.filters:
+        table = table.filter(_filter_mask(table, query.filters))
+
+    for key, _ in query.sort:
+        kind = table.schema.field(key).type
+        if pa.types.is_dictionary(kind):
+            # Arrow sorts plain values only; categorical columns are decoded
+            table = table.set_column(table.schema.get_field_index(key), key, table[key].cast(kind.value_type))
+    sort_keys = query.sort + [("__row", "ascending")]
+    k = min(offset + query.limit, table.num_rows)
+    if offset >= table.num_rows:
+        indices = pa.array([], type=pa.int64())
+    elif k < table.num_rows:
+        indices = pc.select_k_unstable(table, k=k, sort_keys=sort_keys)[offset:]
+    else:
+        indices = pc.sort_indices(table, sort_keys=sort_keys)[offset:k]
+
+    page = table.select(columns).take(indices)
+    return {
+        "columns": columns,
+        "rows": page.to_pylist(),
+        "next_cursor": encode_cursor({"offset": k}) if k < table.num_rows else None,
+        "matched_rows": table.num_rows
+    }
@@ -0,0 +1,311 @@
+"""
+Dataset store
+Keeps parsed uploads as columnar Parquet / Arrow IPC files in GridFS with a MongoDB catalog
+"""
+
+import os
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+import pyarrow as pa
+
+from app.core.executors import run_blocking_io, run_cpu_bound
+from app.ingestion.csv_stream import frame_to_arrow
+from app.storage.dataset_rows import RowGroupReader, RowQuery, query_rows
+from app.storage.shared_files import SharedFiles, SharedFileNotFoundError
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DATASET_STORE_ENABLED = os.getenv("DATASET_STORE_ENABLED", "true").lower() == "true"
+# Files are written here and read through memory maps; with DATASET_STORE_SHARED
+# the directory is only a cache, refilled from GridFS on hosts that lack a file
+DATASET_STORE_DIR = os.getenv("DATASET_STORE_DIR", os.path.join(os.getcwd(), "dataset_store"))
+DATASET_STORE_SHARED = os.getenv("DATASET_STORE_SHARED", "true").lower() == "true"
+DATASET_GRIDFS_BUCKET = os.getenv("DATASET_GRIDFS_BUCKET", "datasets")
+# "parquet" is the most compact; "arrow" (Arrow IPC / Feather v2) reads back
+# without decoding and, with DATASET_COMPRESSION=none, without copying
+DATASET_FORMAT = os.getenv("DATASET_FORMAT", "parquet").lower()
+# zstd, lz4 or none (Arrow IPC supports zstd and lz4 only)
+DATASET_COMPRESSION = os.getenv("DATASET_COMPRESSION", "zstd").lower()
+# Parquet row group / Arrow record batch length; the unit of partial reads
+DATASET_ROW_GROUP_ROWS = int(os.getenv("DATASET_ROW_GROUP_ROWS", "131072"))
+
+FILE_EXTENSIONS = {"parquet": "parquet", "arrow": "arrow"}
+
+
+class DatasetGoneError(LookupError):
+    """Raised when a cataloged dataset's file can no longer be found"""
+
+
+def _bson_value(value: Any) -> Any:
+    """Scalar that MongoDB can store (dates and times as ISO strings)"""
+    if isinstance(value, (date, datetime, pd.Timestamp)):
+        return value.isoformat()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def column_stats(table: pa.Table) -> List[Dict[str, Any]]:
+    """
+    Per-column catalog statistics
+
+    Args:
+        table: Dataset as written
+
+    Returns:
+        One dict per column with name, Arrow type and null count, plus
+        min/max (and mean for numbers) or the distinct count for strings
+    """
+    import pyarrow.compute as pc
+
+    stats = []
+    for field, column in zip(table.schema, table.columns):
+        entry = {"name": field.name, "type": str(field.type), "null_count": column.null_count}
+        kind = field.type
+        if pa.types.is_dictionary(kind):
+            kind = kind.value_type
+            column = column.cast(kind)
+        if pa.types.is_integer(kind) or pa.types.is_floating(kind) or pa.types.is_temporal(kind):
+            bounds = pc.min_max(column)
+            entry["min"] = _bson_value(bounds["min"].as_py())
+            entry["max"] = _bson_value(bounds["max"].as_py())
+            if not pa.types.is_temporal(kind):
+                entry["mean"] = _bson_value(pc.mean(column).as_py())
+        elif pa.types.is_string(kind) or pa.types.is_large_string(kind):
+            entry["distinct"] = pc.count_distinct(column).as_py()
+        stats.append(entry)
+    return stats
+
+
+def write_dataset(path: str, data: Union[pd.DataFrame, pa.Table], file_format: str = DATASET_FORMAT,
+                  compression: str = DATASET_COMPRESSION,
+                  row_group_rows: int = DATASET_ROW_GROUP_ROWS) -> Dict[str, Any]:
+    """
+    Write ``data`` to ``path`` (blocking; replaces any existing file atomically)
+
+    Arrow tables, such as ingested uploads, are written as they are;
+    DataFrames are converted first.
+
+    Returns:
+        Catalog fields: rows, schema with column statistics and file size
+    """
+    table = data if isinstance(data, pa.Table) else frame_to_arrow(data)
+    codec = None if compression == "none" else compression
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, tmp_path, compression=codec or "none", row_group_size=row_group_rows)
+        metadata = pq.read_metadata(tmp_path)
+        row_groups = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+    else:
+        options = pa.ipc.IpcWriteOptions(compression=codec)
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                writer.write_table(table, max_chunksize=row_group_rows)
+        # write_table splits exactly like to_batches (zero-copy slices)
+        row_groups = [batch.num_rows for batch in table.to_batches(max_chunksize=row_group_rows)]
+    os.replace(tmp_path, path)
+
+    return {
+        "rows": table.num_rows,
+        "columns": column_stats(table),
+        "row_groups": row_groups,
+        "size_bytes": os.path.getsize(path)
+    }
+
+
+def read_dataset(path: str, file_format: str, columns: Optional[Sequence[str]] = None,
+                 compression: str = DATASET_COMPRESSION) -> pa.Table:
+    """
+    Memory-map a stored dataset and read only ``columns`` (blocking)
+
+    Uncompressed Arrow IPC files are returned without copying: the table's
+    buffers point straight into the mapped file. Parquet and compressed
+    IPC columns are decoded from the mapping, skipping unrequested ones.
+    """
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(path, columns=list(columns) if columns is not None else None,
+                             memory_map=True)
+
+    source = pa.memory_map(path, "r")
+    reader = pa.ipc.open_file(source)
+    if columns is None:
+        return reader.read_all()
+    if compression == "none":
+        # Selecting from zero-copy views is free; included_fields would copy
+        return reader.read_all().select(list(columns))
+    options = pa.ipc.IpcReadOptions(
+        included_fields=[reader.schema.get_field_index(column) for column in columns]
+    )
+    # Fields come back in file order; match the requested order like Parquet does
+    return pa.ipc.open_file(source, options=options).read_all().select(list(columns))
+
+
+class DatasetStore:
+    """
+    Uploaded datasets, cataloged in ``datasets``
+
+    Each catalog document records where the file lives, its format and
+    codec, the row count and per-column schema and statistics, so callers
+    can pick columns (or skip reading altogether) before touching the file.
+
+    Shared datasets are also copied to GridFS, so API and worker hosts (and
+    restarts on an ephemeral disk) all see them; reads fetch missing files
+    into the local directory first.
+    """
+
+    def __init__(self, db, root: str = DATASET_STORE_DIR, file_format: str = DATASET_FORMAT,
+                 compression: str = DATASET_COMPRESSION, shared: bool = DATASET_STORE_SHARED):
+        if file_format not in FILE_EXTENSIONS:
+            raise ValueError(f"Unknown dataset format: {file_format}")
+        self.db = db
+        self.root = root
+        self.file_format = file_format
+        self.compression = compression
+        self.shared = shared
+        self.files = SharedFiles(db, DATASET_GRIDFS_BUCKET)
+
+    def path(self, dataset: Dict[str, Any]) -> str:
+        return os.path.join(self.root, dataset["file"])
+
+    async def local_path(self, dataset: Dict[str, Any]) -> str:
+        """
+        Path of the dataset's file on this host, fetching it from GridFS if needed
+
+        Raises:
+            DatasetGoneError: If the file is neither on disk nor in GridFS
+        """
+        path = self.path(dataset)
+        if os.path.exists(path):
+            return path
+        if dataset.get("shared"):
+            try:
+                await self.files.download_path(dataset["id"], path)
+                return path
+            except SharedFileNotFoundError:
+                pass
+        logger.error(f"❌ File of dataset {dataset['id']} is missing")
+        raise DatasetGoneError(dataset["id"])
+
+    async def save(self, dataset_id: str, data: Union[pd.DataFrame, pa.Table],
+                   **metadata) -> Dict[str, Any]:
+        """
+        Persist a parsed upload and catalog it
+
+        Args:
+            dataset_id: Identifier for the new dataset
+            data: Parsed upload as an Arrow table or DataFrame
+            **metadata: Extra catalog fields (report_id, filename, department, ...)
+
+        Returns:
+            The catalog document
+        """
+        safe_id = os.path.basename(dataset_id)
+        relative = os.path.join(safe_id[:2], f"{safe_id}.{FILE_EXTENSIONS[self.file_format]}")
+        path = os.path.join(self.root, relative)
+        written = await run_cpu_bound(write_dataset, path, data, self.file_format, self.compression)
+        if self.shared:
+            await self.files.upload_path(dataset_id, path)
+        dataset = {
+            "id": dataset_id,
+            **metadata,
+            "file": relative,
+            "format": self.file_format,
+            "compression": self.compression,
+            "shared": self.shared,
+            **written,
+            "created_at": datetime.utcnow()
+        }
+        await self.db.datasets.insert_one(dataset)
+        dataset.pop("_id", None)
+        logger.info(f"🗃️ Stored dataset {dataset_id}: {written['rows']} rows, "
+                    f"{written['size_bytes'] / 1024 ** 2:.1f} MB {self.file_format}/{self.compression}")
+        return dataset
+
+    async def describe(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        """Catalog document for ``dataset_id`` (None if unknown)"""
+        dataset = await self.db.datasets.find_one({"id": dataset_id})
+        if dataset:
+            dataset.pop("_id", None)
+        return dataset
+
+    async def read_table(self, dataset: Dict[str, Any],
+                         columns: Optional[Sequence[str]] = None) -> pa.Table:
+        """
+        Columns of a cataloged dataset as an Arrow table
+
+        Args:
+            dataset: Document returned by ``describe``
+            columns: Columns to load, None for all
+
+        Raises:
+            KeyError: If a requested column is not in the dataset
+            DatasetGoneError: If the dataset's file is missing
+        """
+        if columns is not None:
+            known = {column["name"] for column in dataset["columns"]}
+            missing = [column for column in columns if column not in known]
+            if missing:
+                raise KeyError(f"Unknown columns: {', '.join(missing)}")
+        path = await self.local_path(dataset)
+        try:
+            return await run_blocking_io(
+                read_dataset, path, dataset["format"], columns, dataset["compression"]
+            )
+        except FileNotFoundError:
+            raise DatasetGoneError(dataset["id"])
+
+    async def rows(self, dataset: Dict[str, Any], query: RowQuery) -> Dict[str, Any]:
+        """
+        One page of rows from a cataloged dataset
+
+        Raises:
+            DatasetQueryError: For unknown columns or malformed parameters
+            DatasetGoneError: If the dataset's file is missing
+        """
+        path = await self.local_path(dataset)
+
+        def run() -> Dict[str, Any]:
+            reader = RowGroupReader(path, dataset["format"], dataset.get("row_groups"))
+            return query_rows(reader, query)
+
+        # Decoding, filtering and sorting dominate the file reads
+        try:
+            return await run_cpu_bound(run)
+        except FileNotFoundError:
+            raise DatasetGoneError(dataset["id"])
+
+    async def load(self, dataset: Dict[str, Any],
+                   columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Columns of a cataloged dataset as a DataFrame"""
+        table = await self.read_table(dataset, columns)
+        return await run_cpu_bound(table.to_pandas)
+
+    async def delete(self, dataset_id: str) -> bool:
+        """
+        Remove a dataset's file (local copy and GridFS) and its catalog entry
+
+        Returns:
+            False if ``dataset_id`` was not cataloged
+        """
+        dataset = await self.describe(dataset_id)
+        if not dataset:
+            return False
+        try:
+            os.remove(self.path(dataset))
+        except FileNotFoundError:
+            pass
+        if dataset.get("shared"):
+            await self.files.delete(dataset_id)
+        await self.db.datasets.delete_one({"id": dataset_id})
+        logger.info(f"🗑️ Deleted dataset {dataset_id}")
+        return True
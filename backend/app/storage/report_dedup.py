@@ -0,0 +1,191 @@
+"""
+Report deduplication
+Fingerprints uploads by content and catalogs analyses that later identical uploads can reuse
+"""
+
+import hashlib
+import json
+import os
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Optional
+
+from app.ingestion.csv_stream import UPLOAD_CHUNK_SIZE_BYTES
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+REPORT_DEDUP_ENABLED = os.getenv("REPORT_DEDUP_ENABLED", "true").lower() == "true"
+# What a repeat upload gets for its PDF:
+#   "auto"     share the stored PDF when the cover (file name, uploader) is
+#              unchanged, otherwise re-render it from the stored analysis
+#   "reuse"    always share the stored PDF
+#   "rerender" always re-render from the stored analysis
+REPORT_DEDUP_COVER = os.getenv("REPORT_DEDUP_COVER", "auto").lower()
+# Bump when a pipeline change makes stored analyses stale
+REPORT_PIPELINE_VERSION = "1"
+
+# Rows of the upload kept with an artifact for re-rendering and API responses
+ARTIFACT_PREVIEW_ROWS = 10
+
+
+@dataclass
+class UploadFingerprint:
+    """Identity of an upload for deduplication"""
+    key: str
+    content_sha256: str
+    size: int
+
+
+def upload_fingerprint(source: BinaryIO, department: str, config: Dict[str, Any],
+                       chunk_size: int = UPLOAD_CHUNK_SIZE_BYTES) -> UploadFingerprint:
+    """
+    Hash an upload in fixed-size chunks and rewind it for parsing
+
+    Args:
+        source: Seekable binary file object positioned at the start
+        department: Department the report is generated for
+        config: Analysis settings that change the generated report
+
+    Returns:
+        UploadFingerprint whose ``key`` covers the bytes, department and config
+    """
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+        size += len(chunk)
+    source.seek(0)
+
+    content_sha256 = digest.hexdigest()
+    payload = json.dumps(
+        {"content": content_sha256, "department": department, "config": config},
+        sort_keys=True, separators=(",", ":"), default=str
+    )
+    key = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return UploadFingerprint(key=key, content_sha256=content_sha256, size=size)
+
+
+class ReportArtifacts:
+    """
+    Reusable report outputs in ``report_artifacts``
+
+    One document per fingerprint holds the analysis, the dataset summary and
+    a small preview, plus the blob key and cover metadata of the PDF rendered
+    for it. Reports built from an artifact link to it from their ``reports``
+    document and, when the cover matches, share its PDF blob.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def find(self, key: str) -> Optional[Dict[str, Any]]:
+        """Artifact for fingerprint ``key`` (None if this upload is new)"""
+        return await self.db.report_artifacts.find_one({"fingerprint": key})
+
+    async def record(self, fingerprint: UploadFingerprint, report_id: str, blob_key: str,
+                     filename: str, user_name: str, artifact: Dict[str, Any]) -> None:
+        """
+        Catalog the outputs of a freshly analyzed upload
+
+        Args:
+            fingerprint: Fingerprint of the upload
+            report_id: Report the outputs were generated for
+            blob_key: Blob holding the rendered PDF
+            filename: File name printed on the PDF cover
+            user_name: Uploader printed on the PDF cover
+            artifact: Analysis, preview rows, columns, row count and KPI summary
+        """
+        now = datetime.utcnow()
+        await self.db.report_artifacts.update_one(
+            {"fingerprint": fingerprint.key},
+            {
+                "$set": {
+                    **artifact,
+                    "content_sha256": fingerprint.content_sha256,
+                    "size": fingerprint.size,
+                    "report_id": report_id,
+                    "blob_key": blob_key,
+                    "cover": {"filename": filename, "user_name": user_name},
+                    "updated_at": now
+                },
+                "$setOnInsert": {"created_at": now, "hits": 0}
+            },
+            upsert=True
+        )
+        logger.info(f"🧬 Recorded report artifact {fingerprint.key[:12]} from report {report_id}")
+
+    async def relink(self, key: str, report_id: str, blob_key: str,
+                     filename: str, user_name: str) -> None:
+        """Point an artifact at a newly rendered PDF (its old blob is gone)"""
+        await self.db.report_artifacts.update_one(
+            {"fingerprint": key},
+            {"$set": {
+                "report_id": report_id,
+                "blob_key": blob_key,
+                "cover": {"filename": filename, "user_name": user_name},
+                "updated_at": datetime.utcnow()
+            }}
+        )
+
+    async def touch(self, key: str) -> None:
+        """Count a reuse of the artifact"""
+        await self.db.report_artifacts.update_one(
+            {"fingerprint": key},
+            {"$inc": {"hits": 1}, "$set": {"last_hit_at": datetime.utcnow()}}
+        )
+
+
+class DedupStats:
+    """Process-wide counters for report deduplication"""
+
+    def __init__(self):
+        self._counters = {
+            "lookups": 0,
+            "hits": 0,
+            "misses": 0,
+            "pdfs_shared": 0,
+            "pdfs_rerendered": 0,
+            "artifacts_recorded": 0,
+            "bytes_deduplicated": 0
+        }
+
+    def miss(self) -> None:
+        self._counters["lookups"] += 1
+        self._counters["misses"] += 1
+
+    def hit(self, size: int, shared_pdf: bool) -> None:
+        self._counters["lookups"] += 1
+        self._counters["hits"] += 1
+        self._counters["bytes_deduplicated"] += size
+        self._counters["pdfs_shared" if shared_pdf else "pdfs_rerendered"] += 1
+
+    def recorded(self) -> None:
+        self._counters["artifacts_recorded"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._counters["lookups"]
+        return {
+            "enabled": REPORT_DEDUP_ENABLED,
+            "cover_mode": REPORT_DEDUP_COVER,
+            **self._counters,
+            "hit_ratio": round(self._counters["hits"] / lookups, 4) if lookups else 0.0
+        }
+
+
+_dedup_stats: Optional[DedupStats] = None
+
+
+def get_dedup_stats() -> DedupStats:
+    """Get or create the process-wide deduplication counters"""
+    global _dedup_stats
+    if _dedup_stats is None:
+        _dedup_stats = DedupStats()
+    return _dedup_stats
@@ -0,0 +1,322 @@
+"""
+Report blob store
+Keeps generated PDFs as raw bytes in MongoDB (BSON Binary / GridFS) or on local disk
+"""
+
+import base64
+import binascii
+import hashlib
+import os
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiofiles
+from bson import Binary
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# "mongo" stores blobs in MongoDB, "local" writes them under REPORT_STORE_DIR
+REPORT_STORE_BACKEND = os.getenv("REPORT_STORE_BACKEND", "mongo")
+REPORT_STORE_DIR = os.getenv("REPORT_STORE_DIR", os.path.join(os.getcwd(), "report_store"))
+# Blobs up to this size go into a single BSON Binary document, larger ones into GridFS.
+# Inline blobs are loaded whole on every read, GridFS ones stream chunk by chunk.
+REPORT_INLINE_MAX_BYTES = int(os.getenv("REPORT_INLINE_MAX_BYTES", str(1024 * 1024)))
+REPORT_STREAM_CHUNK_BYTES = int(os.getenv("REPORT_STREAM_CHUNK_BYTES", str(256 * 1024)))
+REPORT_GRIDFS_BUCKET = os.getenv("REPORT_GRIDFS_BUCKET", "report_pdfs")
+
+# Storage kinds recorded on report_files documents
+STORAGE_BINARY = "binary"
+STORAGE_GRIDFS = "gridfs"
+STORAGE_FILE = "file"
+STORAGE_LEGACY_BASE64 = "base64"
+
+
+class BlobNotFoundError(LookupError):
+    """Raised when a report_files entry points at a blob that no longer exists"""
+
+
+def _slice_bounds(length: int, start: int, end: Optional[int]) -> tuple:
+    """Clamp an inclusive byte range to ``length``"""
+    last = length - 1 if end is None else min(end, length - 1)
+    return max(start, 0), last
+
+
+class MongoBlobBackend:
+    """
+    Blobs in MongoDB
+
+    Small PDFs are stored as one BSON Binary field in ``report_blobs``; anything
+    above ``REPORT_INLINE_MAX_BYTES`` goes to a GridFS bucket so reports are no
+    longer bounded by the 16 MB document limit.
+    """
+
+    name = "mongo"
+
+    def __init__(self, db, inline_max_bytes: int = REPORT_INLINE_MAX_BYTES):
+        self.db = db
+        self.inline_max_bytes = inline_max_bytes
+        self._bucket = None
+
+    @property
+    def bucket(self):
+        if self._bucket is None:
+            from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+            self._bucket = AsyncIOMotorGridFSBucket(self.db, bucket_name=REPORT_GRIDFS_BUCKET)
+        return self._bucket
+
+    async def put(self, key: str, data: bytes) -> str:
+        if len(data) <= self.inline_max_bytes:
+            await self.db.report_blobs.update_one(
+                {"_id": key},
+                {"$set": {"data": Binary(data), "length": len(data)}},
+                upsert=True
+            )
+            return STORAGE_BINARY
+
+        await self._delete_gridfs(key)
+        await self.bucket.upload_from_stream_with_id(
+            key, f"{key}.pdf", data, metadata={"content_type": "application/pdf"}
+        )
+        return STORAGE_GRIDFS
+
+    async def open(self, key: str, storage: str, start: int = 0, end: Optional[int] = None,
+                   chunk_size: int = REPORT_STREAM_CHUNK_BYTES) -> AsyncIterator[bytes]:
+        if storage == STORAGE_BINARY:
+            blob = await self.db.report_blobs.find_one({"_id": key})
+            if not blob:
+                raise BlobNotFoundError(key)
+            data = memoryview(blob["data"])
+            first, last = _slice_bounds(len(data), start, end)
+            for offset in range(first, last + 1, chunk_size):
+                yield bytes(data[offset:min(offset + chunk_size, last + 1)])
+            return
+
+        from gridfs.errors import NoFile
+        try:
+            grid_out = await self.bucket.open_download_stream(key)
+        except NoFile:
+            raise BlobNotFoundError(key)
+        first, last = _slice_bounds(grid_out.length, start, end)
+        grid_out.seek(first)
+        remaining = last - first + 1
+        while remaining > 0:
+            chunk = await grid_out.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+    async def delete(self, key: str, storage: str) -> None:
+        if storage == STORAGE_BINARY:
+            await self.db.report_blobs.delete_one({"_id": key})
+        else:
+            await self._delete_gridfs(key)
+
+    async def _delete_gridfs(self, key: str) -> None:
+        from gridfs.errors import NoFile
+        try:
+            await self.bucket.delete(key)
+        except NoFile:
+            pass
+
+
+class LocalBlobBackend:
+    """Blobs as plain files under ``REPORT_STORE_DIR``"""
+
+    name = "local"
+
+    def __init__(self, root: str = REPORT_STORE_DIR):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        safe_key = os.path.basename(key)
+        return os.path.join(self.root, safe_key[:2], f"{safe_key}.pdf")
+
+    async def put(self, key: str, data: bytes) -> str:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        async with aiofiles.open(tmp_path, "wb") as handle:
+            await handle.write(data)
+        os.replace(tmp_path, path)
+        return STORAGE_FILE
+
+    async def open(self, key: str, storage: str, start: int = 0, end: Optional[int] = None,
+                   chunk_size: int = REPORT_STREAM_CHUNK_BYTES) -> AsyncIterator[bytes]:
+        path = self._path(key)
+        try:
+            length = os.path.getsize(path)
+        except OSError:
+            raise BlobNotFoundError(key)
+        first, last = _slice_bounds(length, start, end)
+        async with aiofiles.open(path, "rb") as handle:
+            await handle.seek(first)
+            remaining = last - first + 1
+            while remaining > 0:
+                chunk = await handle.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    async def delete(self, key: str, storage: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+def _legacy_length(encoded: str) -> int:
+    """Decoded size of a base64 string without decoding it"""
+    padding = encoded[-2:].count("=") if encoded else 0
+    return len(encoded) // 4 * 3 - padding
+
+
+async def _stream_legacy(encoded: str, start: int = 0, end: Optional[int] = None,
+                         chunk_size: int = REPORT_STREAM_CHUNK_BYTES) -> AsyncIterator[bytes]:
+    """
+    Decode a legacy base64 ``pdf_content`` string one slice at a time
+
+    Every 4 base64 characters map to exactly 3 bytes, so aligned slices can be
+    decoded independently and only the requested range is ever materialized.
+    """
+    first, last = _slice_bounds(_legacy_length(encoded), start, end)
+    step = max(chunk_size // 3, 1) * 3
+    offset = first - first % 3
+    while offset <= last:
+        block = offset // 3 * 4
+        try:
+            decoded = base64.b64decode(encoded[block:block + step // 3 * 4], validate=True)
+        except binascii.Error as decode_error:
+            raise BlobNotFoundError(f"corrupted legacy PDF: {decode_error}")
+        skip = max(first - offset, 0)
+        yield decoded[skip:last - offset + 1]
+        offset += step
+
+
+class ReportStore:
+    """
+    Report PDF storage
+
+    ``report_files`` keeps one small catalog document per report (blob key,
+    backend, storage kind, length, sha256); the bytes live in the configured
+    backend. Deduplicated reports share a blob through ``link``. Documents written before the blob store existed still carry a
+    base64 ``pdf_content`` string and are served through the compatibility
+    reader until ``migrate_report_files.py`` converts them.
+    """
+
+    def __init__(self, db, backend: Optional[str] = None):
+        self.db = db
+        backend = backend or REPORT_STORE_BACKEND
+        self._backends = {
+            MongoBlobBackend.name: MongoBlobBackend(db),
+            LocalBlobBackend.name: LocalBlobBackend()
+        }
+        if backend not in self._backends:
+            raise ValueError(f"Unknown report store backend: {backend}")
+        self.backend = self._backends[backend]
+
+    async def save(self, report_id: str, data: bytes) -> Dict[str, Any]:
+        """
+        Store ``data`` as the PDF for ``report_id``
+
+        Args:
+            report_id: Report the PDF belongs to
+            data: Raw PDF bytes
+
+        Returns:
+            The report_files catalog document
+        """
+        blob_key = report_id
+        storage = await self.backend.put(blob_key, data)
+        file_doc = {
+            "report_id": report_id,
+            "blob_key": blob_key,
+            "backend": self.backend.name,
+            "storage": storage,
+            "length": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "content_type": "application/pdf",
+            "created_at": datetime.utcnow()
+        }
+        await self.db.report_files.update_one(
+            {"report_id": report_id},
+            {"$set": file_doc, "$unset": {"pdf_content": ""}},
+            upsert=True
+        )
+        logger.info(f"💾 Stored report {report_id}: {len(data)} bytes via {self.backend.name}/{storage}")
+        return file_doc
+
+    async def link(self, report_id: str, blob_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Serve ``report_id`` from an already stored blob instead of writing a copy
+
+        Args:
+            report_id: Report that should get the PDF
+            blob_key: Blob another report's catalog document points at
+
+        Returns:
+            The new catalog document, or None if no report references the blob any more
+        """
+        source = await self.db.report_files.find_one({"blob_key": blob_key})
+        if not source:
+            return None
+        file_doc = {
+            key: source[key]
+            for key in ("blob_key", "backend", "storage", "length", "sha256", "content_type", "created_at")
+            if key in source
+        }
+        file_doc["report_id"] = report_id
+        await self.db.report_files.update_one(
+            {"report_id": report_id},
+            {"$set": file_doc, "$unset": {"pdf_content": ""}},
+            upsert=True
+        )
+        logger.info(f"🔗 Linked report {report_id} to stored blob {blob_key}")
+        return file_doc
+
+    async def describe(self, report_id: str) -> Optional[Dict[str, Any]]:
+        """Catalog document for ``report_id`` (None if no PDF was stored)"""
+        file_doc = await self.db.report_files.find_one({"report_id": report_id})
+        if file_doc and "storage" not in file_doc and "pdf_content" in file_doc:
+            file_doc["storage"] = STORAGE_LEGACY_BASE64
+            file_doc["length"] = _legacy_length(file_doc["pdf_content"])
+        return file_doc
+
+    def stream(self, file_doc: Dict[str, Any], start: int = 0, end: Optional[int] = None,
+               chunk_size: int = REPORT_STREAM_CHUNK_BYTES) -> AsyncIterator[bytes]:
+        """
+        Iterate over the stored PDF (or the inclusive byte range ``start``-``end``)
+
+        Args:
+            file_doc: Document returned by ``describe``
+            start: First byte offset
+            end: Last byte offset, None for the end of the blob
+            chunk_size: Bytes per yielded chunk
+
+        Returns:
+            Async iterator of byte chunks
+        """
+        if file_doc["storage"] == STORAGE_LEGACY_BASE64:
+            return _stream_legacy(file_doc["pdf_content"], start, end, chunk_size)
+        backend = self._backends[file_doc["backend"]]
+        return backend.open(file_doc["blob_key"], file_doc["storage"], start, end, chunk_size)
+
+    async def read(self, file_doc: Dict[str, Any]) -> bytes:
+        """Whole PDF as bytes"""
+        return b"".join([chunk async for chunk in self.stream(file_doc)])
+
+    async def delete(self, report_id: str) -> None:
+        """Remove the catalog document, and its blob once no other report links to it"""
+        file_doc = await self.describe(report_id)
+        if not file_doc:
+            return
+        if (file_doc["storage"] != STORAGE_LEGACY_BASE64 and
+                await self.db.report_files.count_documents({"blob_key": file_doc["blob_key"]}) <= 1):
+            await self._backends[file_doc["backend"]].delete(file_doc["blob_key"], file_doc["storage"])
+        await self.db.report_files.delete_one({"report_id": report_id})
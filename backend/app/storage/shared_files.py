@@ -0,0 +1,120 @@
+"""
+Shared files
+Copies files between local disk and a MongoDB GridFS bucket so every API and worker host sees them
+"""
+
+import os
+import uuid
+import logging
+from typing import BinaryIO
+
+from app.core.executors import run_blocking_io
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SHARED_FILE_CHUNK_BYTES = int(os.getenv("SHARED_FILE_CHUNK_BYTES", str(1024 * 1024)))
+
+
+class SharedFileNotFoundError(LookupError):
+    """Raised when a shared file is not (or no longer) in its bucket"""
+
+
+class SharedFiles:
+    """
+    Files in one GridFS bucket, keyed by caller-chosen ids
+
+    Data moves in ``SHARED_FILE_CHUNK_BYTES`` pieces with local reads and
+    writes on the blocking-I/O executor, so large files never sit in memory
+    whole and the event loop never waits on disk.
+    """
+
+    def __init__(self, db, bucket_name: str, chunk_size: int = SHARED_FILE_CHUNK_BYTES):
+        self.db = db
+        self.bucket_name = bucket_name
+        self.chunk_size = chunk_size
+        self._bucket = None
+
+    @property
+    def bucket(self):
+        if self._bucket is None:
+            from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+            self._bucket = AsyncIOMotorGridFSBucket(self.db, bucket_name=self.bucket_name)
+        return self._bucket
+
+    async def upload(self, file_id: str, source: BinaryIO, filename: str) -> int:
+        """
+        Copy ``source`` from its current position into the bucket
+
+        Returns:
+            Bytes stored
+        """
+        grid_in = self.bucket.open_upload_stream_with_id(file_id, filename)
+        size = 0
+        try:
+            while True:
+                chunk = await run_blocking_io(source.read, self.chunk_size)
+                if not chunk:
+                    break
+                await grid_in.write(chunk)
+                size += len(chunk)
+        except BaseException:
+            await grid_in.abort()
+            raise
+        await grid_in.close()
+        return size
+
+    async def upload_path(self, file_id: str, path: str) -> int:
+        """Copy the local file at ``path`` into the bucket"""
+        source = await run_blocking_io(open, path, "rb")
+        try:
+            return await self.upload(file_id, source, os.path.basename(path))
+        finally:
+            source.close()
+
+    async def download(self, file_id: str, target: BinaryIO) -> int:
+        """
+        Copy a stored file into ``target``
+
+        Raises:
+            SharedFileNotFoundError: If ``file_id`` is not in the bucket
+        """
+        from gridfs.errors import NoFile
+        try:
+            grid_out = await self.bucket.open_download_stream(file_id)
+        except NoFile:
+            raise SharedFileNotFoundError(f"{self.bucket_name}/{file_id}")
+        size = 0
+        while True:
+            chunk = await grid_out.read(self.chunk_size)
+            if not chunk:
+                return size
+            await run_blocking_io(target.write, chunk)
+            size += len(chunk)
+
+    async def download_path(self, file_id: str, path: str) -> int:
+        """Copy a stored file to ``path`` (replaced atomically, so readers never see part of it)"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.download"
+        target = await run_blocking_io(open, tmp_path, "wb")
+        try:
+            size = await self.download(file_id, target)
+        except BaseException:
+            target.close()
+            os.remove(tmp_path)
+            raise
+        target.close()
+        os.replace(tmp_path, path)
+        logger.info(f"📦 Fetched {self.bucket_name}/{file_id} ({size} bytes) to {path}")
+        return size
+
+    async def delete(self, file_id: str) -> None:
+        """Remove a stored file (missing files are ignored)"""
+        from gridfs.errors import NoFile
+        try:
+            await self.bucket.delete(file_id)
+        except NoFile:
+            pass
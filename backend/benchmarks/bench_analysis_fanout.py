@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sequential vs. concurrent LLM fan-out in AnalysisAgent
+
+Runs analyze_department_performance and its async variant against a local
+fake Groq server with a fixed per-call latency. The async variant should
+take roughly one call's latency instead of four. A second run with a short
+deadline shows partial results when calls time out.
+
+Usage:
+    python benchmarks/bench_analysis_fanout.py --latency 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_groq import FakeGroqServer
+
+# Measure the fan-out itself, not the client-side Groq quota or cache hits
+os.environ.setdefault("GROQ_REQUESTS_PER_MINUTE", "0")
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+KPIS = [
+    {"label": "Total Deals", "value": "156", "change": "+22%", "positive": True},
+    {"label": "Conversion Rate", "value": "34%", "change": "+5%", "positive": True},
+]
+CHART_DATA = [
+    {"month": "Jan", "deals": 20, "value": 540},
+    {"month": "Feb", "deals": 25, "value": 675},
+    {"month": "Mar", "deals": 28, "value": 756},
+]
+
+
+async def timed(coro):
+    # Timed inside the loop so event loop setup and teardown are excluded
+    start = time.perf_counter()
+    result = await coro
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.5,
+                        help="Seconds the fake server waits before each completion")
+    args = parser.parse_args()
+
+    with FakeGroqServer(latency=args.latency) as server:
+        os.environ["GROQ_BASE_URL"] = server.base_url
+        os.environ.setdefault("GROQ_API_KEY", "fake-key")
+
+        from ai_models.analysis_agent import AnalysisAgent
+        agent = AnalysisAgent()
+
+        start = time.perf_counter()
+        agent.analyze_department_performance("sales", KPIS, CHART_DATA)
+        sequential = time.perf_counter() - start
+
+        _, concurrent = asyncio.run(timed(
+            agent.analyze_department_performance_async("sales", KPIS, CHART_DATA)
+        ))
+        partial, deadline_hit = asyncio.run(timed(
+            agent.analyze_department_performance_async(
+                "sales", KPIS, CHART_DATA, deadline=args.latency / 2
+            )
+        ))
+
+    print(f"Per-call latency: {args.latency:.2f}s, upstream requests: {server.request_count}")
+    print(f"  sequential         : {sequential:6.2f}s")
+    print(f"  concurrent         : {concurrent:6.2f}s  ({sequential / concurrent:.1f}x faster)")
+    print(f"  deadline {args.latency / 2:.2f}s     : {deadline_hit:6.2f}s  "
+          f"partial={partial.get('partial', False)} timed_out={partial.get('timed_out', [])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: anomaly detection on a wide synthetic frame
+
+Compares, on the same frame:
+
+  per-column  one IsolationForest fitted and scored per numeric column, as
+              CSVAnalysisAgent._detect_anomalies did
+  mad / iqr   AnomalyEngine's vectorized univariate pass
+  mad+forest  univariate pass plus one multivariate IsolationForest
+
+``--legacy-columns`` limits the per-column baseline to the first N columns
+and extrapolates linearly to the full width (it is by far the slowest).
+
+Usage:
+    python benchmarks/bench_anomalies.py --rows 1000000 --columns 40
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from harness import BACKEND_DIR  # noqa: F401  (puts the backend on sys.path)
+from app.ai_agents.anomaly_engine import AnomalyEngine
+
+
+def synthetic_frame(rows: int, columns: int) -> pd.DataFrame:
+    """Gaussian columns with 0.5% injected spikes and 1% missing values"""
+    rng = np.random.default_rng(7)
+    values = rng.normal(100, 15, size=(rows, columns))
+    spikes = rng.random((rows, columns)) < 0.005
+    values[spikes] *= rng.choice([-4, 6], size=int(spikes.sum()))
+    values[rng.random((rows, columns)) < 0.01] = np.nan
+    return pd.DataFrame(values, columns=[f"metric_{i}" for i in range(columns)])
+
+
+def per_column_forest(df: pd.DataFrame) -> int:
+    from sklearn.ensemble import IsolationForest
+
+    found = 0
+    for column in df.select_dtypes(include=[np.number]).columns:
+        data = df[column].dropna().values.reshape(-1, 1)
+        if len(data) > 10:
+            predictions = IsolationForest(contamination=0.1, random_state=42).fit_predict(data)
+            found += int((predictions == -1).sum())
+    return found
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--columns", type=int, default=40)
+    parser.add_argument("--legacy-columns", type=int, default=None,
+                        help="Run the per-column baseline on this many columns and extrapolate")
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows, args.columns)
+    import sklearn.ensemble  # noqa: F401  (keep the import out of the timings)
+    print(f"{args.rows} rows x {args.columns} columns ({df.memory_usage().sum() / 1024 ** 2:.0f} MB)")
+
+    legacy_columns = min(args.legacy_columns or args.columns, args.columns)
+    _, elapsed = timed(lambda: per_column_forest(df.iloc[:, :legacy_columns]))
+    baseline = elapsed * args.columns / legacy_columns
+    note = f"  (measured on {legacy_columns} columns, extrapolated)" if legacy_columns < args.columns else ""
+    print(f"  {'per-column':11} {baseline:8.2f}s{note}")
+
+    for name, engine in (("mad", AnomalyEngine(method="mad", multivariate=False)),
+                         ("iqr", AnomalyEngine(method="iqr", multivariate=False)),
+                         ("mad+forest", AnomalyEngine(method="mad", multivariate=True))):
+        findings, elapsed = timed(lambda: engine.detect(df))
+        flagged = sum(f["anomaly_count"] for f in findings if f["column"] != "multivariate")
+        rows = next((f["anomaly_count"] for f in findings if f["column"] == "multivariate"), 0)
+        extra = f", {rows} rows by the forest" if engine.multivariate else ""
+        print(f"  {name:11} {elapsed:8.2f}s  ({baseline / elapsed:5.1f}x)  "
+              f"{flagged} values in {len(findings) - bool(rows)} columns{extra}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: single-pass AnalysisContext vs. per-stage recomputation
+
+Before the shared context, one analyze_csv_file call recomputed column
+statistics 6 times and pattern detection (trends, correlations, missing
+counts) 8 times as stages called one another. This benchmark times the
+statistics work at those legacy multiplicities against the single pass,
+plus the end-to-end agent run on Walmart_Sales.csv.
+
+Usage:
+    python benchmarks/bench_csv_analysis.py --scale 10
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_CSV = os.path.join(BACKEND_DIR, "..", "Walmart_Sales.csv")
+
+sys.path.insert(0, BACKEND_DIR)
+
+import pandas as pd
+
+from app.ai_agents.analysis_context import AnalysisContext
+from app.ai_agents.csv_analysis_agent import CSVAnalysisAgent
+
+LEGACY_STATS_PASSES = 6
+LEGACY_PATTERN_PASSES = 8
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def legacy_equivalent(df: pd.DataFrame) -> None:
+    context = AnalysisContext(
+        df=df,
+        numeric_columns=df.select_dtypes(include="number").columns.tolist(),
+        categorical_columns=[]
+    )
+    numeric = df[context.numeric_columns]
+    for _ in range(LEGACY_STATS_PASSES):
+        context._compute_column_stats(numeric)
+    for _ in range(LEGACY_PATTERN_PASSES):
+        context._compute_missing_counts(df)
+        context._compute_correlations(numeric)
+        context._compute_trends(numeric)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=10,
+                        help="Number of copies of Walmart_Sales.csv to concatenate")
+    args = parser.parse_args()
+
+    base = pd.read_csv(SAMPLE_CSV)
+    df = pd.concat([base] * args.scale, ignore_index=True)
+    payload = df.to_csv(index=False).encode("utf-8")
+    print(f"Frame: {len(df)} rows x {len(df.columns)} columns")
+
+    single = timed(lambda: AnalysisContext.from_frame(df))
+    legacy = timed(lambda: legacy_equivalent(df))
+    print(f"  statistics, legacy multiplicity : {legacy * 1000:8.1f} ms")
+    print(f"  statistics, single pass         : {single * 1000:8.1f} ms  ({legacy / single:.1f}x faster)")
+
+    agent = CSVAnalysisAgent()
+    config = {"department": "sales"}
+    end_to_end = timed(lambda: asyncio.run(
+        agent.analyze_csv_file(payload, "Walmart_Sales.csv", config)
+    ), repeat=1)
+    print(f"  analyze_csv_file end to end     : {end_to_end * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark: streaming CSV ingestion vs. whole-payload parsing
+
+Builds a scaled-up copy of Walmart_Sales.csv and uploads it through both the
+legacy path (read -> decode -> StringIO -> read_csv) and the chunked
+ingestion path, each in a fresh process so peak RSS is measured cleanly.
+
+Usage:
+    python benchmarks/bench_csv_ingest.py --scale 200
+"""
+
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_CSV = os.path.join(BACKEND_DIR, "..", "Walmart_Sales.csv")
+
+sys.path.insert(0, BACKEND_DIR)
+
+
+def build_scaled_csv(scale: int) -> str:
+    """Write Walmart_Sales.csv repeated ``scale`` times to a temp file"""
+    with open(SAMPLE_CSV, "rb") as f:
+        header = f.readline()
+        body = f.read()
+    if not body.endswith(b"\n"):
+        body += b"\n"
+
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    with os.fdopen(fd, "wb") as out:
+        out.write(header)
+        for _ in range(scale):
+            out.write(body)
+    return path
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode: str, path: str) -> dict:
+    import pandas as pd
+    from app.ingestion.csv_stream import ingest_csv
+
+    baseline_rss = peak_rss_mb()
+    size_mb = os.path.getsize(path) / 1024 ** 2
+    start = time.perf_counter()
+
+    with open(path, "rb") as upload:
+        if mode == "legacy":
+            content = upload.read()
+            df = pd.read_csv(io.StringIO(content.decode("utf-8")))
+        else:
+            df = ingest_csv(upload, max_memory_mb=0).to_pandas()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "rows": len(df),
+        "file_mb": round(size_mb, 1),
+        "seconds": round(elapsed, 2),
+        "throughput_mb_s": round(size_mb / elapsed, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "rss_growth_mb": round(peak_rss_mb() - baseline_rss, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=200,
+                        help="Number of copies of Walmart_Sales.csv to concatenate")
+    parser.add_argument("--mode", choices=["legacy", "streaming"], help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.path)))
+        return
+
+    path = build_scaled_csv(args.scale)
+    try:
+        print(f"Scaled CSV: {os.path.getsize(path) / 1024 ** 2:.1f} MB ({args.scale}x)")
+        for mode in ("legacy", "streaming"):
+            output = subprocess.check_output(
+                [sys.executable, __file__, "--mode", mode, "--path", path]
+            )
+            result = json.loads(output.decode().strip().splitlines()[-1])
+            print(
+                f"  {result['mode']:10} {result['seconds']:6.2f}s  "
+                f"{result['throughput_mb_s']:7.1f} MB/s  "
+                f"peak RSS {result['peak_rss_mb']:8.1f} MB  "
+                f"(+{result['rss_growth_mb']:.1f} MB)"
+            )
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
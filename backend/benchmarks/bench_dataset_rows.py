@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: dataset row pages vs. converting the whole frame to records
+
+The upload path used to run ``df.to_dict('records')`` on the full frame to
+show five rows. This compares that conversion with single pages served
+from the stored dataset: the first page, a deep offset, a cursor page, a
+filtered page and a sorted page, for each file size.
+
+Usage:
+    python benchmarks/bench_dataset_rows.py --scales 20 200 --format parquet
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from harness import scaled_csv_bytes
+from app.storage.dataset_rows import RowGroupReader, RowQuery, parse_filters, parse_sort, query_rows
+from app.storage.dataset_store import write_dataset
+
+
+def best_of(fn, repeat: int = 3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scales", type=int, nargs="+", default=[20, 200],
+                        help="Copies of Walmart_Sales.csv per dataset")
+    parser.add_argument("--format", default="parquet", choices=["parquet", "arrow"])
+    parser.add_argument("--compression", default="zstd")
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        for scale in args.scales:
+            df = pd.read_csv(io.BytesIO(scaled_csv_bytes(scale)))
+            path = os.path.join(root, f"walmart_{scale}.{args.format}")
+            written = write_dataset(path, df, args.format, args.compression)
+            _, records_time = best_of(lambda: df.to_dict("records"), repeat=1)
+            print(f"{len(df)} rows ({args.format}/{args.compression}, {len(written['row_groups'])} row groups): "
+                  f"full to_dict('records') {records_time * 1000:8.1f} ms")
+
+            reader = RowGroupReader(path, args.format, written["row_groups"])
+            first = query_rows(reader, RowQuery(limit=args.limit))
+            pages = {
+                "first page": RowQuery(limit=args.limit),
+                "offset 90%": RowQuery(offset=int(len(df) * 0.9), limit=args.limit),
+                "cursor page": RowQuery(cursor=first["next_cursor"], limit=args.limit),
+                "projected": RowQuery(columns=["Store", "Weekly_Sales"], offset=len(df) // 2,
+                                      limit=args.limit),
+                "filtered": RowQuery(filters=parse_filters(["Store:eq:45", "Holiday_Flag:eq:1"]),
+                                     limit=args.limit),
+                "sorted": RowQuery(sort=parse_sort("-Weekly_Sales"), columns=["Store", "Weekly_Sales"],
+                                   limit=args.limit),
+            }
+            for name, query in pages.items():
+                page, elapsed = best_of(lambda: query_rows(
+                    RowGroupReader(path, args.format, written["row_groups"]), query
+                ))
+                print(f"  {name:12} {len(page['rows']):4} rows  {elapsed * 1000:8.1f} ms  "
+                      f"({records_time / elapsed:6.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
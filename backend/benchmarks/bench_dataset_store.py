@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: dataset store formats
+
+Writes a scaled Walmart_Sales.csv frame in each supported format/codec and
+times memory-mapped reads of two columns and of the whole table, next to
+re-parsing the CSV (what any re-analysis cost before uploads were kept).
+
+Usage:
+    python benchmarks/bench_dataset_store.py --scale 200
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from harness import scaled_csv_bytes
+from app.storage.dataset_store import read_dataset, write_dataset
+
+CONFIGURATIONS = (("parquet", "zstd"), ("parquet", "none"), ("arrow", "zstd"),
+                  ("arrow", "lz4"), ("arrow", "none"))
+COLUMNS = ["Store", "Weekly_Sales"]
+
+
+def best_of(fn, repeat: int = 3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=200, help="Copies of Walmart_Sales.csv")
+    args = parser.parse_args()
+
+    payload = scaled_csv_bytes(args.scale)
+    df, parse_time = best_of(lambda: pd.read_csv(io.BytesIO(payload)), repeat=1)
+    print(f"{len(df)} rows: CSV {len(payload) / 1024 ** 2:.1f} MB, "
+          f"{df.memory_usage(deep=True).sum() / 1024 ** 2:.1f} MB in memory, "
+          f"re-parse {parse_time * 1000:.0f} ms")
+
+    with tempfile.TemporaryDirectory() as root:
+        for file_format, compression in CONFIGURATIONS:
+            path = os.path.join(root, f"dataset.{file_format}.{compression}")
+            written, write_time = best_of(lambda: write_dataset(path, df, file_format, compression), 1)
+            _, columns_time = best_of(lambda: read_dataset(path, file_format, COLUMNS, compression))
+            _, full_time = best_of(lambda: read_dataset(path, file_format, compression=compression))
+            print(f"  {file_format:7} {compression:4}  {written['size_bytes'] / 1024 ** 2:7.1f} MB  "
+                  f"write {write_time * 1000:6.0f} ms  {len(COLUMNS)} columns {columns_time * 1000:6.1f} ms  "
+                  f"all {full_time * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
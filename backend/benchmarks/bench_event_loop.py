@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Load test: dashboard latency while large uploads are in progress
+
+Fires ten concurrent uploads of a scaled Walmart_Sales.csv (LLM calls go to a
+local fake Groq server) and keeps polling /api/dashboard/stats meanwhile.
+With the managed executors the stats p99 should stay close to the idle p99;
+``--inline`` runs the blocking work on the event loop, as the handlers did
+before, for comparison.
+
+Usage:
+    python benchmarks/bench_event_loop.py --scale 50 --uploads 10
+"""
+
+import argparse
+import asyncio
+import time
+
+from harness import load_app, make_client, scaled_csv_bytes, percentiles
+from fake_groq import FakeGroqServer
+
+
+async def poll_stats(client, stop: asyncio.Event, samples: list) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get("/api/dashboard/stats")
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+
+async def upload(client, payload: bytes) -> float:
+    start = time.perf_counter()
+    response = await client.post(
+        "/api/reports/upload-csv",
+        files={"file": ("Walmart_Sales.csv", payload, "text/csv")},
+        data={"department": "sales"},
+    )
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def run(args) -> None:
+    main, _ = load_app()
+    if args.inline:
+        async def inline(fn, *a, **kw):
+            return fn(*a, **kw)
+        main.run_cpu_bound = inline
+        main.run_blocking_io = inline
+
+    payload = scaled_csv_bytes(args.scale)
+    print(f"Upload size: {len(payload) / 1024 ** 2:.1f} MB x {args.uploads} "
+          f"({'inline' if args.inline else 'executors'})")
+
+    async with make_client(main.app, timeout=None) as client:
+        idle = []
+        stop = asyncio.Event()
+        poller = asyncio.create_task(poll_stats(client, stop, idle))
+        await asyncio.sleep(2)
+        stop.set()
+        await poller
+
+        busy = []
+        stop = asyncio.Event()
+        poller = asyncio.create_task(poll_stats(client, stop, busy))
+        upload_times = await asyncio.gather(*(upload(client, payload) for _ in range(args.uploads)))
+        stop.set()
+        await poller
+
+    for label, samples in (("idle", idle), ("during uploads", busy)):
+        p = percentiles(samples)
+        print(f"  /api/dashboard/stats {label:15} n={len(samples):4}  "
+              f"p50 {p['p50']:7.1f} ms  p99 {p['p99']:7.1f} ms  max {p['max']:7.1f} ms")
+    print(f"  uploads finished in {max(upload_times):.1f}s")
+    print(f"  executors: {main.executor_stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=50)
+    parser.add_argument("--uploads", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.5,
+                        help="Fake Groq latency per call in seconds")
+    parser.add_argument("--inline", action="store_true",
+                        help="Run blocking work on the event loop (pre-executor behaviour)")
+    args = parser.parse_args()
+
+    import os
+    with FakeGroqServer(latency=args.latency) as server:
+        os.environ["GROQ_BASE_URL"] = server.base_url
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pooled Groq client vs. one connection per call, with injected 429s
+
+Sends the same batch of completions to a local fake Groq server that
+rate-limits the first ``--429s`` requests:
+
+  per-call  a new HTTP client (and TCP connection) per completion, no retry
+  pooled    GroqClient: shared keep-alive pool, Retry-After aware retries
+
+Usage:
+    python benchmarks/bench_groq_client.py --calls 200 --concurrency 8 --429s 20
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from harness import percentiles
+from fake_groq import FakeGroqServer
+from ai_models.groq_client import GroqClient
+
+MESSAGES = [{"role": "user", "content": "How are sales?"}]
+PAYLOAD = {"model": "fake-llama", "messages": MESSAGES, "temperature": 0.0, "max_tokens": 50}
+
+
+async def per_call(server) -> bool:
+    async with httpx.AsyncClient(base_url=server.base_url) as http:
+        response = await http.post("/openai/v1/chat/completions", json=PAYLOAD)
+        return response.status_code == 200
+
+
+async def pooled(client) -> bool:
+    await client.chat(MESSAGES, model="fake-llama", temperature=0.0, max_tokens=50)
+    return True
+
+
+async def run(call, calls: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                ok = await call()
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            failures += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return latencies, failures, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--429s", dest="rate_limited", type=int, default=20)
+    parser.add_argument("--retry-after", type=float, default=0.1)
+    args = parser.parse_args()
+
+    print(f"{args.calls} calls, {args.concurrency} in flight, {args.latency * 1000:.0f} ms latency, "
+          f"first {args.rate_limited} answered 429 (Retry-After {args.retry_after:g}s)")
+    for name in ("per-call", "pooled"):
+        with FakeGroqServer(latency=args.latency, inject_429s=args.rate_limited,
+                            retry_after=args.retry_after) as server:
+            if name == "per-call":
+                call = lambda: per_call(server)
+            else:
+                client = GroqClient(api_key="fake-key", base_url=server.base_url, requests_per_minute=0)
+                call = lambda: pooled(client)
+            latencies, failures, elapsed = asyncio.run(run(call, args.calls, args.concurrency))
+        p = percentiles(latencies)
+        print(f"  {name:9} p50 {p['p50']:6.1f} ms  p99 {p['p99']:6.1f} ms  "
+              f"failed {failures:3}/{args.calls}  connections {server.connection_count:4}  "
+              f"wall {elapsed:5.2f}s")
+
+
+if __name__ == "__main__":
+    main()
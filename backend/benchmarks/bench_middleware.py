@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: middleware overhead on cheap endpoints
+
+Measures requests/sec for GET / and GET /api/auth/me (real JWT decoding and
+the user cache) through two middleware stacks on the same app:
+
+  legacy  the former catch_exceptions / token_refresh ``@app.middleware("http")``
+          layers (BaseHTTPMiddleware) outside CORSMiddleware
+  asgi    the current stack: CORSMiddleware around the pure-ASGI ApiMiddleware
+
+Requests are driven straight through ASGI so client overhead is excluded.
+
+Usage:
+    python benchmarks/bench_middleware.py --requests 5000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from harness import load_app, asgi_request
+
+ORIGIN = "http://localhost:5173"
+
+
+def legacy_middleware(main):
+    """The two BaseHTTPMiddleware layers as they were before ApiMiddleware"""
+    cors_origins = main.cors_origins
+
+    async def token_refresh_middleware(request: Request, call_next):
+        if request.url.path.startswith("/api/auth/") or request.method == "OPTIONS":
+            return await call_next(request)
+        response = await call_next(request)
+        if response.status_code == 401:
+            try:
+                response_body = b""
+                async for chunk in response.body_iterator:
+                    response_body += chunk
+                response_body_str = response_body.decode()
+                if "token_expired" in response_body_str.lower() or "expired" in response_body_str.lower():
+                    return JSONResponse(
+                        status_code=401,
+                        content={"detail": "Token expired", "code": "token_expired"},
+                        headers={"X-Token-Expired": "true"}
+                    )
+            except Exception:
+                pass
+        return response
+
+    async def catch_exceptions_middleware(request: Request, call_next):
+        try:
+            response = await call_next(request)
+            origin = request.headers.get('origin')
+            if origin and origin in cors_origins:
+                response.headers["Access-Control-Allow-Origin"] = origin
+            elif "*" in cors_origins:
+                response.headers["Access-Control-Allow-Origin"] = "*"
+            response.headers["Access-Control-Allow-Credentials"] = "true"
+            response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS, PATCH"
+            response.headers["Access-Control-Allow-Headers"] = "*"
+            return response
+        except Exception as exc:
+            return JSONResponse(
+                status_code=500,
+                content={"detail": "Internal server error", "error": str(exc)}
+            )
+
+    cors = [m for m in main.app.user_middleware if m.cls is main.CORSMiddleware]
+    return [
+        Middleware(BaseHTTPMiddleware, dispatch=catch_exceptions_middleware),
+        Middleware(BaseHTTPMiddleware, dispatch=token_refresh_middleware),
+        *cors,
+    ]
+
+
+async def measure(app, path: str, headers: dict, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            status, _ = await asgi_request(app, "GET", path, headers)
+            assert status == 200, f"{path} returned {status}"
+
+    await one()  # warm up
+    start = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(total)])
+    return total / (time.perf_counter() - start)
+
+
+async def run(args) -> None:
+    main, db = load_app(override_auth=False)
+    user_id = str(uuid.uuid4())
+    await db.users.insert_one({
+        "id": user_id, "email": "bench@company.com", "name": "Bench", "role": "admin",
+        "departments": ["sales"], "created_at": datetime.utcnow(),
+    })
+    token = main.create_access_token({"sub": user_id})
+
+    stacks = {
+        "legacy": legacy_middleware(main),
+        "asgi": list(main.app.user_middleware),
+    }
+    targets = {
+        "GET /": ("/", {"origin": ORIGIN}),
+        "GET /api/auth/me": ("/api/auth/me", {"origin": ORIGIN, "authorization": f"Bearer {token}"}),
+    }
+
+    print(f"{args.requests} requests per run, {args.concurrency} in flight")
+    results = {}
+    for name, middleware in stacks.items():
+        main.app.user_middleware = middleware
+        main.app.middleware_stack = main.app.build_middleware_stack()
+        for label, (path, headers) in targets.items():
+            results[(name, label)] = await measure(main.app, path, headers, args.requests, args.concurrency)
+
+    for label in targets:
+        legacy, asgi = results[("legacy", label)], results[("asgi", label)]
+        print(f"  {label:18} legacy {legacy:8.0f} req/s   asgi {asgi:8.0f} req/s   ({asgi / legacy:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
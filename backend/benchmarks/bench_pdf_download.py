@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Load test: concurrent PDF downloads
+
+Stores one 5 MB report and fires 200 concurrent downloads at
+/api/reports/download/{id}, then repeats with If-None-Match (expects 304)
+and with a 1 MB Range (expects 206). Each storage layout runs in its own
+process so peak RSS is comparable:
+
+  legacy  base64 ``pdf_content`` string, served through the compatibility reader
+  binary  BSON Binary blob (mongo backend, inline threshold raised because the
+          in-memory fake database has no GridFS)
+  local   file on disk (local backend)
+
+Usage:
+    python benchmarks/bench_pdf_download.py --size-mb 5 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from harness import load_app, make_client, percentiles, asgi_request
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def store_report(main, db, layout: str, size_mb: float) -> str:
+    report_id = "bench-report"
+    pdf_bytes = b"%PDF-1.4\n" + os.urandom(int(size_mb * 1024 * 1024)) + b"\n%%EOF"
+    await db.reports.insert_one({
+        "id": report_id,
+        "title": "Benchmark Report",
+        "department": "sales",
+        "status": "completed",
+    })
+    if layout == "legacy":
+        await db.report_files.insert_one({
+            "report_id": report_id,
+            "pdf_content": base64.b64encode(pdf_bytes).decode("utf-8"),
+        })
+    else:
+        await main.ReportStore(db, backend="local" if layout == "local" else "mongo").save(
+            report_id, pdf_bytes
+        )
+    return report_id
+
+
+async def fire(app, url: str, concurrency: int, headers=None):
+    async def one():
+        start = time.perf_counter()
+        status, size = await asgi_request(app, "GET", url, headers or {})
+        return status, size, time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[one() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+    statuses = sorted({status for status, _, _ in results})
+    total_bytes = sum(size for _, size, _ in results)
+    return {
+        "statuses": statuses,
+        "seconds": round(elapsed, 2),
+        "requests_per_s": round(concurrency / elapsed, 1),
+        "throughput_mb_s": round(total_bytes / 1024 ** 2 / elapsed, 1),
+        "latency_ms": {k: round(v, 1) for k, v in percentiles([r[2] for r in results]).items()},
+    }
+
+
+async def run_layout(layout: str, size_mb: float, concurrency: int) -> dict:
+    main, db = load_app()
+    report_id = await store_report(main, db, layout, size_mb)
+    url = f"/api/reports/download/{report_id}"
+    baseline_rss = peak_rss_mb()
+
+    async with make_client(main.app) as client:
+        etag = (await client.get(url, headers={"Range": "bytes=0-0"})).headers.get("etag")
+
+    full = await fire(main.app, url, concurrency)
+    conditional = await fire(main.app, url, concurrency, {"If-None-Match": etag} if etag else None)
+    ranged = await fire(main.app, url, concurrency, {"Range": "bytes=-1048576"})
+
+    return {
+        "layout": layout,
+        "full": full,
+        "if_none_match": conditional,
+        "range_1mb": ranged,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "rss_growth_mb": round(peak_rss_mb() - baseline_rss, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=float, default=5, help="PDF size in MB")
+    parser.add_argument("--concurrency", type=int, default=200, help="Concurrent downloads")
+    parser.add_argument("--layout", choices=["legacy", "binary", "local"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.layout:
+        store_dir = tempfile.mkdtemp(prefix="bench_reports_")
+        os.environ["REPORT_STORE_DIR"] = store_dir
+        if args.layout == "binary":
+            os.environ["REPORT_INLINE_MAX_BYTES"] = str(int((args.size_mb + 1) * 1024 * 1024))
+        try:
+            result = asyncio.run(run_layout(args.layout, args.size_mb, args.concurrency))
+        finally:
+            shutil.rmtree(store_dir, ignore_errors=True)
+        print(json.dumps(result))
+        return
+
+    print(f"{args.concurrency} concurrent downloads of a {args.size_mb:g} MB report")
+    for layout in ("legacy", "binary", "local"):
+        output = subprocess.check_output(
+            [sys.executable, __file__, "--layout", layout,
+             "--size-mb", str(args.size_mb), "--concurrency", str(args.concurrency)],
+            stderr=subprocess.DEVNULL
+        )
+        result = json.loads(output.decode().strip().splitlines()[-1])
+        print(f"  {layout:7} peak RSS {result['peak_rss_mb']:7.1f} MB (+{result['rss_growth_mb']:.1f} MB)")
+        for name in ("full", "if_none_match", "range_1mb"):
+            run = result[name]
+            print(
+                f"    {name:14} {run['statuses']}  {run['seconds']:6.2f}s  "
+                f"{run['requests_per_s']:7.1f} req/s  {run['throughput_mb_s']:7.1f} MB/s  "
+                f"p50 {run['latency_ms']['p50']:.0f} ms  p99 {run['latency_ms']['p99']:.0f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
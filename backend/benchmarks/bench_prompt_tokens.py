@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: prompt size of LlamaAgent data blocks
+
+Compares the estimated tokens of the former ``json.dumps(indent=2)``
+embedding with the PromptBuilder rendering for the contexts the API
+actually sends: /api/query with department KPIs, and the upload analysis
+(summary, trends, anomalies, recommendations) over Walmart_Sales.csv rows.
+
+Usage:
+    python benchmarks/bench_prompt_tokens.py --rows 10 1000
+"""
+
+import argparse
+import json
+import time
+
+import pandas as pd
+
+from harness import SAMPLE_CSV
+from ai_models.prompt_builder import PromptBuilder, estimate_tokens
+from app.services.kpi_provider import MOCK_KPI_DATA
+
+
+def scenarios(records_by_size):
+    sales = MOCK_KPI_DATA["sales"]
+    yield "process_query", "/api/query sales", {
+        "department": "sales", "user_role": "admin", "query_context": {},
+        "kpis": sales["kpis"], "chart_data": sales["chart_data"],
+    }
+    for rows, records in records_by_size.items():
+        kpis = [{"label": col, "value": "Analyzing...", "change": "0%", "positive": True}
+                for col in list(records[0])[:4]]
+        context = {"department": "sales", "kpis": kpis, "chart_data": records,
+                   "analysis_type": "comprehensive_performance_review"}
+        yield "generate_report_summary", f"summary ({rows} rows)", context
+        yield "analyze_trends", f"trends ({rows} rows)", records
+        yield "detect_anomalies", f"anomalies ({rows} rows)", records
+        yield "generate_recommendations", f"recommendations ({rows} rows)", context
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 1000])
+    args = parser.parse_args()
+
+    df = pd.read_csv(SAMPLE_CSV)
+    records_by_size = {rows: df.head(rows).to_dict("records") for rows in args.rows}
+    builder = PromptBuilder()
+
+    print(f"{'prompt data':32} {'json tokens':>12} {'built tokens':>13} {'saved':>7} {'render ms':>10}")
+    for method, label, value in scenarios(records_by_size):
+        before = estimate_tokens(json.dumps(value, indent=2, default=str))
+        start = time.perf_counter()
+        text = builder.render(method, value)
+        elapsed = (time.perf_counter() - start) * 1000
+        after = estimate_tokens(text)
+        print(f"{label:32} {before:12d} {after:13d} {1 - after / before:7.0%} {elapsed:10.2f}")
+    print(f"budgets: {builder.budgets}")
+
+
+if __name__ == "__main__":
+    main()
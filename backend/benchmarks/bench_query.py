@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /api/query latency with structured vs free-text completions
+
+Posts distinct questions to /api/query against a local fake Groq server
+with a fixed per-call latency, with the LLM cache disabled:
+
+  structured  the model returns the JSON object process_query asks for, so
+              one completion carries answer, insights and recommendations
+  free-text   the model ignores the format; process_query falls back to
+              parsing prose plus a second recommendations call (the former
+              behaviour of every query)
+
+Usage:
+    python benchmarks/bench_query.py --latency 0.3 --queries 20
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+from fake_groq import FakeGroqServer, default_responder
+from harness import load_app, make_client, percentiles
+
+
+def free_text_responder(payload):
+    if "Respond with only a JSON object" in payload["messages"][0]["content"]:
+        return ("Sales are on track this quarter.\n"
+                "- Revenue grew in each of the last six months\n"
+                "- Conversion improved by five points")
+    return default_responder(payload)
+
+
+async def run_queries(main, server, queries: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async with make_client(main.app, timeout=60) as client:
+        async def one(i):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/api/query", json={
+                    "query": f"How did sales perform in period {i}?", "department": "sales"
+                })
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+                assert response.json()["recommendations"]
+
+        before = server.request_count
+        await asyncio.gather(*[one(i) for i in range(queries)])
+        return latencies, (server.request_count - before) / queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.3,
+                        help="Seconds the fake server waits before each completion")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    with FakeGroqServer(latency=args.latency) as server:
+        os.environ["GROQ_BASE_URL"] = server.base_url
+        main_module, _ = load_app()
+
+        results = {}
+        for name, responder in (("free-text", free_text_responder), ("structured", default_responder)):
+            server.responder = responder
+            results[name] = asyncio.run(run_queries(main_module, server, args.queries, args.concurrency))
+
+    print(f"Per-call latency: {args.latency:.2f}s, {args.queries} queries, {args.concurrency} in flight")
+    for name, (latencies, calls) in results.items():
+        stats = percentiles(latencies)
+        print(f"  {name:10}  p50 {stats['p50']:7.0f} ms   p99 {stats['p99']:7.0f} ms   "
+              f"Groq calls/query {calls:.1f}")
+    speedup = percentiles(results["free-text"][0])["p50"] / percentiles(results["structured"][0])["p50"]
+    print(f"  structured p50 is {speedup:.2f}x faster")
+
+
+if __name__ == "__main__":
+    main()
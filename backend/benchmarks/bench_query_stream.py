@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time-to-first-byte of /api/query/stream vs /api/query
+
+Runs distinct questions against a local fake Groq server that waits
+``--latency`` before the first token and ``--token-latency`` between
+tokens, with the LLM cache disabled. For the streaming endpoint TTFB is
+the arrival of the first ``token`` event; for /api/query the whole JSON
+body arrives at once, so TTFB equals total latency.
+
+Usage:
+    python benchmarks/bench_query_stream.py --latency 0.3 --token-latency 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+from fake_groq import FakeGroqServer
+from harness import load_app, asgi_request, percentiles
+
+
+async def measure(app, path: str, queries: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    first_bytes, totals = [], []
+
+    async def one(i):
+        async with semaphore:
+            body = json.dumps({"query": f"How did sales perform in period {i}?",
+                               "department": "sales"}).encode()
+            start = time.perf_counter()
+            first = None
+
+            def on_body(chunk):
+                nonlocal first
+                if first is None and chunk and (not path.endswith("/stream") or b"event: token" in chunk):
+                    first = time.perf_counter() - start
+
+            status, _ = await asgi_request(app, "POST", path,
+                                           {"content-type": "application/json"}, body, on_body)
+            assert status == 200, f"{path} returned {status}"
+            totals.append(time.perf_counter() - start)
+            first_bytes.append(first)
+
+    await asyncio.gather(*[one(i) for i in range(queries)])
+    return percentiles(first_bytes), percentiles(totals)
+
+
+async def run(args):
+    main, _ = load_app()
+    results = {}
+    for path in ("/api/query", "/api/query/stream"):
+        results[path] = await measure(main.app, path, args.queries, args.concurrency)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.3,
+                        help="Seconds before the fake server sends the first token")
+    parser.add_argument("--token-latency", type=float, default=0.02,
+                        help="Seconds between streamed tokens")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    with FakeGroqServer(latency=args.latency, token_latency=args.token_latency) as server:
+        os.environ["GROQ_BASE_URL"] = server.base_url
+        results = asyncio.run(run(args))
+
+    print(f"First-token latency {args.latency:.2f}s, {args.token_latency * 1000:.0f} ms/token, "
+          f"{args.queries} queries, {args.concurrency} in flight")
+    for path, (ttfb, total) in results.items():
+        print(f"  {path:18}  TTFB p50 {ttfb['p50']:7.0f} ms  p99 {ttfb['p99']:7.0f} ms   "
+              f"total p50 {total['p50']:7.0f} ms  p99 {total['p99']:7.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
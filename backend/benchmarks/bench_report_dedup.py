@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: repeat CSV uploads with and without report deduplication
+
+Uploads the same file ``--uploads`` times through /api/reports/upload-csv
+against a fake Groq server with a fixed per-call latency:
+
+  no dedup     every upload is parsed, analyzed (4 LLM calls) and rendered
+  same cover   repeats share the first upload's PDF
+  new cover    repeats use a new file name, so the PDF is re-rendered from
+               the stored analysis
+
+Usage:
+    python benchmarks/bench_report_dedup.py --scale 20 --uploads 10 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from harness import load_app, make_client, percentiles, scaled_csv_bytes
+from fake_groq import FakeGroqServer
+
+# Time the pipeline, not LLM cache hits
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+
+async def upload(client, payload: bytes, filename: str) -> float:
+    start = time.perf_counter()
+    response = await client.post(
+        "/api/reports/upload-csv",
+        files={"file": (filename, payload, "text/csv")},
+        data={"department": "sales"},
+    )
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def run(main, payload: bytes, uploads: int, rename: bool):
+    async with make_client(main.app, timeout=None) as client:
+        first = await upload(client, payload, "weekly.csv")
+        repeats = [await upload(client, payload, f"weekly_{i}.csv" if rename else "weekly.csv")
+                   for i in range(uploads - 1)]
+    return first, repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=20, help="Copies of Walmart_Sales.csv per upload")
+    parser.add_argument("--uploads", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.5,
+                        help="Seconds the fake server waits before each completion")
+    args = parser.parse_args()
+
+    payload = scaled_csv_bytes(args.scale)
+    print(f"{args.uploads} uploads of {len(payload) / 1024 ** 2:.1f} MB, "
+          f"{args.latency:.2f}s per LLM call")
+
+    with FakeGroqServer(latency=args.latency) as server:
+        os.environ["GROQ_BASE_URL"] = server.base_url
+        for name, enabled, rename in (("no dedup", False, False),
+                                      ("same cover", True, False),
+                                      ("new cover", True, True)):
+            app_main, _ = load_app()
+            app_main.REPORT_DEDUP_ENABLED = enabled
+            calls = server.request_count
+            first, repeats = asyncio.run(run(app_main, payload, args.uploads, rename))
+            p = percentiles(repeats)
+            print(f"  {name:10}  first {first * 1000:7.0f} ms   repeats p50 {p['p50']:7.0f} ms  "
+                  f"max {p['max']:7.0f} ms   LLM calls {server.request_count - calls:3}")
+        print(f"  dedup: {app_main.get_dedup_stats().stats()}")
+
+
+if __name__ == "__main__":
+    main()
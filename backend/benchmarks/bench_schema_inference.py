@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: default read_csv dtypes vs. the inferred compact schema
+
+Ingests a scaled Walmart_Sales.csv with and without schema inference and
+reports ingest time, the in-memory size of each column and the time to
+summarize the KPIs (which reads the Date column either as text or as
+already-parsed timestamps).
+
+Usage:
+    python benchmarks/bench_schema_inference.py --scale 200
+"""
+
+import argparse
+import io
+import time
+import warnings
+
+from harness import scaled_csv_bytes
+from app.ingestion.csv_stream import ingest_csv
+from app.services.kpi_provider import summarize_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=200, help="Copies of Walmart_Sales.csv")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    payload = scaled_csv_bytes(args.scale)
+    print(f"{args.scale}x Walmart_Sales.csv: {len(payload) / 1024 ** 2:.1f} MB")
+    results = {}
+    for compact in (False, True):
+        start = time.perf_counter()
+        ingest = ingest_csv(io.BytesIO(payload), max_memory_mb=0, compact=compact)
+        ingest_time = time.perf_counter() - start
+        start = time.perf_counter()
+        summarize_dataset(ingest.table)
+        summary_time = time.perf_counter() - start
+
+        label = "compact" if compact else "default"
+        results[label] = ingest
+        print(f"  {label:8} ingest {ingest_time:6.2f}s  summary {summary_time * 1000:7.1f} ms  "
+              f"{ingest.memory_usage_mb:7.1f} MB held")
+    print(f"  saved {results['default'].memory_usage_mb - results['compact'].memory_usage_mb:.1f} MB "
+          f"against pandas defaults")
+
+    print("  column          default      compact")
+    for name in results["default"].table.column_names:
+        default, compact = results["default"].table[name], results["compact"].table[name]
+        print(f"  {name:14} {default.nbytes / 1024 ** 2:7.1f} MB  {compact.nbytes / 1024 ** 2:7.1f} MB  "
+              f"{compact.type}")
+
+
+if __name__ == "__main__":
+    main()
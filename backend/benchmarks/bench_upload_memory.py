@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak memory of the upload pipeline vs. file size
+
+Runs the data stages of a CSV upload (parse, KPI summary, dataset write,
+preview rows) for several file sizes, each in a fresh process so peak RSS
+is measured cleanly, in three variants:
+
+    records  pandas chunks concatenated into one frame, full to_dict('records')
+    frame    the same frame, converting only the preview rows
+    arrow    the current path: chunks kept as one Arrow table end to end
+
+Usage:
+    python benchmarks/bench_upload_memory.py --scales 50 200 800
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+from harness import SAMPLE_CSV
+
+MODES = ("records", "frame", "arrow")
+
+
+def write_scaled_csv(scale: int) -> str:
+    """
+    Write Walmart_Sales.csv repeated ``scale`` times without holding the copies
+
+    Children inherit this process's peak RSS across fork/exec, so the
+    parent must stay small for their measurements to mean anything.
+    """
+    with open(SAMPLE_CSV, "rb") as f:
+        header = f.readline()
+        body = f.read()
+    if not body.endswith(b"\n"):
+        body += b"\n"
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    with os.fdopen(fd, "wb") as out:
+        out.write(header)
+        for _ in range(scale):
+            out.write(body)
+    return path
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode: str, path: str) -> dict:
+    import pandas as pd
+    from app.ingestion.csv_stream import ChunkedTextReader, ingest_csv
+    from app.services.kpi_provider import summarize_dataset
+    from app.storage.dataset_store import write_dataset
+
+    warnings.simplefilter("ignore")
+    baseline_rss = peak_rss_mb()
+    start = time.perf_counter()
+
+    with open(path, "rb") as upload, tempfile.TemporaryDirectory() as root:
+        target = os.path.join(root, "dataset.parquet")
+        if mode == "arrow":
+            table = ingest_csv(upload, max_memory_mb=0).table
+            summarize_dataset(table)
+            write_dataset(target, table)
+            preview = table.slice(0, 10).to_pandas().to_dict("records")
+            rows = table.num_rows
+        else:
+            with pd.read_csv(ChunkedTextReader(upload), chunksize=100000) as parser:
+                df = pd.concat(list(parser), ignore_index=True, copy=False)
+            summarize_dataset(df)
+            write_dataset(target, df)
+            preview = (df if mode == "records" else df.head(10)).to_dict("records")[:10]
+            rows = len(df)
+
+    return {
+        "mode": mode,
+        "rows": rows,
+        "preview_rows": len(preview),
+        "seconds": round(time.perf_counter() - start, 2),
+        "rss_growth_mb": round(peak_rss_mb() - baseline_rss, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scales", type=int, nargs="+", default=[50, 200, 800],
+                        help="Copies of Walmart_Sales.csv per file")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.path)))
+        return
+
+    for scale in args.scales:
+        path = write_scaled_csv(scale)
+        try:
+            file_mb = os.path.getsize(path) / 1024 ** 2
+            print(f"{scale}x Walmart_Sales.csv: {file_mb:.1f} MB")
+            for mode in args.modes:
+                output = subprocess.check_output(
+                    [sys.executable, __file__, "--mode", mode, "--path", path]
+                )
+                result = json.loads(output.decode().strip().splitlines()[-1])
+                print(f"  {mode:8} {result['rows']:9} rows  {result['seconds']:6.2f}s  "
+                      f"peak RSS +{result['rss_growth_mb']:8.1f} MB  "
+                      f"({result['rss_growth_mb'] / file_mb:4.1f}x file size)")
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Load test: dashboard page loads through the real get_current_user
+
+Each simulated page load fires the dashboard's authenticated calls
+concurrently with a bearer token. The users collection adds a configurable
+round-trip delay so the saved MongoDB queries show up in latency, and the
+run is repeated with the user cache bypassed for comparison.
+
+Usage:
+    python benchmarks/bench_user_cache.py --users 20 --page-loads 200
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime
+
+from harness import load_app, make_client, percentiles
+
+PAGE_CALLS = [
+    "/api/auth/me",
+    "/api/dashboard/stats",
+    "/api/dashboard/kpis/sales",
+    "/api/dashboard/kpis/finance",
+    "/api/dashboard/activity",
+    "/api/reports",
+]
+
+
+def add_round_trip(collection, latency: float) -> None:
+    find_one = collection.find_one
+
+    async def slow_find_one(*args, **kwargs):
+        await asyncio.sleep(latency)
+        return await find_one(*args, **kwargs)
+
+    collection.find_one = slow_find_one
+
+
+async def run_mode(cached: bool, args) -> dict:
+    main, db = load_app(override_auth=False)
+    cache = main.get_user_cache()
+    cache.clear()
+    if not cached:
+        # Previous behaviour: every call reads the user from MongoDB
+        cache.get_or_load = lambda user_id, loader: loader()
+    add_round_trip(db.users, args.mongo_latency_ms / 1000)
+
+    tokens = []
+    for i in range(args.users):
+        user_id = str(uuid.uuid4())
+        await db.users.insert_one({
+            "id": user_id,
+            "email": f"user{i}@company.com",
+            "name": f"User {i}",
+            "role": "admin",
+            "departments": ["finance", "hr", "sales", "operations", "compliance"],
+            "created_at": datetime.utcnow(),
+        })
+        tokens.append(main.create_access_token({"sub": user_id}))
+
+    before = cache.stats()
+    users_queries_before = next(db.users.calls)
+    latencies = []
+
+    async with make_client(main.app, timeout=None) as client:
+        async def page_load(token: str) -> None:
+            start = time.perf_counter()
+            headers = {"Authorization": f"Bearer {token}"}
+            responses = await asyncio.gather(*[client.get(url, headers=headers) for url in PAGE_CALLS])
+            for response in responses:
+                response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for batch_start in range(0, args.page_loads, args.concurrency):
+            batch = range(batch_start, min(batch_start + args.concurrency, args.page_loads))
+            await asyncio.gather(*[page_load(tokens[i % len(tokens)]) for i in batch])
+        elapsed = time.perf_counter() - start
+
+    after = cache.stats()
+    served = after["mongo_queries_saved"] - before["mongo_queries_saved"]
+    lookups = served + after["misses"] - before["misses"]
+    return {
+        "mode": "cached" if cached else "uncached",
+        "seconds": elapsed,
+        "calls": args.page_loads * len(PAGE_CALLS),
+        "users_queries": next(db.users.calls) - users_queries_before - 1,
+        "hit_ratio": served / lookups if lookups else 0.0,
+        "saved_per_minute": served / elapsed * 60,
+        "latency": percentiles(latencies),
+    }
+
+
+async def run(args) -> None:
+    print(f"{args.page_loads} page loads x {len(PAGE_CALLS)} calls, {args.users} users, "
+          f"{args.mongo_latency_ms:g} ms users round trip")
+    for cached in (True, False):
+        result = await run_mode(cached, args)
+        print(
+            f"  {result['mode']:9} {result['seconds']:6.2f}s  "
+            f"users queries {result['users_queries']:5d} / {result['calls']} calls  "
+            f"hit ratio {result['hit_ratio']:.1%}  "
+            f"saved {result['saved_per_minute']:,.0f}/min  "
+            f"page p50 {result['latency']['p50']:.0f} ms  p99 {result['latency']['p99']:.0f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--page-loads", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4, help="Page loads in flight")
+    parser.add_argument("--mongo-latency-ms", type=float, default=20.0,
+                        help="Simulated round trip for users lookups")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Local fake Groq server for benchmarks and tests
+Speaks the OpenAI-compatible chat completions API with configurable latency
+"""
+
+import json
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+
+TREND_RESPONSE = json.dumps({
+    "trend": "increasing",
+    "pattern": "Steady month-over-month growth",
+    "prediction": "Growth continues next period",
+    "confidence": "high",
+    "reasoning": "Consistent positive slope"
+})
+
+QUERY_RESPONSE = json.dumps({
+    "answer": "Performance is on track. Revenue grew steadily across the period.",
+    "insights": ["Revenue grew every month", "Conversion improved by 5 points"],
+    "recommendations": ["Expand the highest performing channels",
+                        "Review pricing for low-margin products"]
+})
+
+STREAM_QUERY_RESPONSE = "\n".join([
+    "Performance is on track. Revenue grew steadily across the period.",
+    "###JSON",
+    json.dumps({k: v for k, v in json.loads(QUERY_RESPONSE).items() if k != "answer"}),
+])
+
+RECOMMENDATIONS_RESPONSE = "\n".join([
+    "1. Expand the highest performing channels",
+    "2. Reduce spend on underperforming segments",
+    "3. Review pricing for low-margin products",
+])
+
+
+def _tokens(content: str):
+    """Words with their trailing whitespace: the fake tokenization"""
+    return re.findall(r"\S+\s*|\s+", content) or [""]
+
+
+def default_responder(payload: Dict) -> str:
+    """Pick a plausible completion based on the prompt text"""
+    if "Respond with only a JSON object" in payload["messages"][0]["content"]:
+        return QUERY_RESPONSE
+    if "###JSON" in payload["messages"][0]["content"]:
+        return STREAM_QUERY_RESPONSE
+    prompt = payload["messages"][-1]["content"]
+    if "Return as JSON array" in prompt:
+        return "[]"
+    if "Format as JSON" in prompt:
+        return TREND_RESPONSE
+    if "recommendations" in prompt:
+        return RECOMMENDATIONS_RESPONSE
+    return "Performance is on track. Revenue grew steadily across the period."
+
+
+class FakeGroqServer:
+    """
+    Threaded HTTP server emulating ``POST /openai/v1/chat/completions``
+
+    ``latency`` delays the first byte; streamed (``"stream": true``)
+    completions then send one word per chunk, ``token_latency`` apart.
+    Non-streamed completions wait for the same generation time and send
+    the whole message at once. The first ``inject_429s`` requests are
+    answered with 429 (and ``Retry-After`` when ``retry_after`` is set).
+
+    Usage:
+        with FakeGroqServer(latency=0.5) as server:
+            os.environ["GROQ_BASE_URL"] = server.base_url
+    """
+
+    def __init__(self, latency: float = 0.0,
+                 responder: Optional[Callable[[Dict], str]] = None,
+                 token_latency: float = 0.0,
+                 inject_429s: int = 0,
+                 retry_after: Optional[float] = None):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.responder = responder or default_responder
+        self.inject_429s = inject_429s
+        self.retry_after = retry_after
+        self.request_count = 0
+        self.rate_limited_count = 0
+        self.connection_count = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connection_count += 1
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with server._lock:
+                    server.request_count += 1
+                    limited = server.rate_limited_count < server.inject_429s
+                    if limited:
+                        server.rate_limited_count += 1
+                time.sleep(server.latency)
+                if limited:
+                    server._send_rate_limited(self)
+                    return
+                if payload.get("stream"):
+                    server._send_stream(self, payload)
+                else:
+                    server._send_completion(self, payload)
+
+        return Handler
+
+    def _send_completion(self, handler: BaseHTTPRequestHandler, payload: Dict) -> None:
+        content = self.responder(payload)
+        if self.token_latency:
+            time.sleep(self.token_latency * (len(_tokens(content)) - 1))
+        body = json.dumps({
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "fake-llama"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        }).encode("utf-8")
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _send_rate_limited(self, handler: BaseHTTPRequestHandler) -> None:
+        body = json.dumps({"error": {"message": "Rate limit reached", "type": "requests",
+                                     "code": "rate_limit_exceeded"}}).encode("utf-8")
+        handler.send_response(429)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        if self.retry_after is not None:
+            handler.send_header("Retry-After", f"{self.retry_after:g}")
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _send_stream(self, handler: BaseHTTPRequestHandler, payload: Dict) -> None:
+        content = self.responder(payload)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        def send_chunk(data: str) -> None:
+            event = f"data: {data}\n\n".encode("utf-8")
+            handler.wfile.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+            handler.wfile.flush()
+
+        for i, token in enumerate(_tokens(content)):
+            if i and self.token_latency:
+                time.sleep(self.token_latency)
+            send_chunk(json.dumps({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": payload.get("model", "fake-llama"),
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+            }))
+        send_chunk("[DONE]")
+        handler.wfile.write(b"0\r\n\r\n")
+
+    def __enter__(self) -> "FakeGroqServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@contextmanager
+def fake_llama(agent, **server_kwargs):
+    """
+    Point a LlamaAgent at a FakeGroqServer with its LLM cache disabled
+
+    The agent's client and cache are restored on exit. Close the client
+    (``await agent.client.aclose()``) inside the event loop that used it.
+
+    Usage:
+        with fake_llama(main.get_llama_agent()) as server:
+            ...
+    """
+    from ai_models.groq_client import GroqClient
+    from ai_models.llm_cache import LLMCache
+
+    saved_client, saved_cache = agent.__dict__.get("client"), agent.cache
+    with FakeGroqServer(**server_kwargs) as server:
+        agent.client = GroqClient(api_key="fake-key", base_url=server.base_url, requests_per_minute=0)
+        agent.cache = LLMCache(store=None, enabled=False)
+        try:
+            yield server
+        finally:
+            agent.cache = saved_cache
+            if saved_client is None:
+                del agent.client
+            else:
+                agent.client = saved_client
@@ -0,0 +1,246 @@
+"""
+In-memory stand-in for the Motor database used by benchmarks
+Implements only the collection methods the API endpoints call
+"""
+
+import copy
+import io
+import itertools
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+from bson import ObjectId
+
+
+def _matches(doc: Dict, query: Dict) -> bool:
+    for key, condition in query.items():
+        value = doc.get(key)
+        if isinstance(condition, dict):
+            for op, operand in condition.items():
+                if op == "$in":
+                    values = value if isinstance(value, list) else [value]
+                    if not any(v in operand for v in values):
+                        return False
+                elif op == "$lt" and not (value is not None and value < operand):
+                    return False
+                elif op == "$lte" and not (value is not None and value <= operand):
+                    return False
+                elif op == "$exists" and (key in doc) != operand:
+                    return False
+        elif isinstance(value, list) and not isinstance(condition, list):
+            if condition not in value:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def _apply_update(doc: Dict, update: Dict) -> None:
+    for key, value in update.get("$set", {}).items():
+        doc[key] = value
+    for key, value in update.get("$inc", {}).items():
+        doc[key] = doc.get(key, 0) + value
+    for key in update.get("$unset", {}):
+        doc.pop(key, None)
+
+
+class FakeUpdateResult:
+    def __init__(self, matched_count: int, upserted_id: Any = None):
+        self.matched_count = matched_count
+        self.modified_count = matched_count
+        self.upserted_id = upserted_id
+
+
+class FakeCursor:
+    def __init__(self, docs: List[Dict]):
+        self._docs = docs
+
+    def sort(self, key, direction: int = 1) -> "FakeCursor":
+        self._docs.sort(key=lambda d: (d.get(key) is None, d.get(key)), reverse=direction < 0)
+        return self
+
+    def skip(self, n: int) -> "FakeCursor":
+        self._docs = self._docs[n:]
+        return self
+
+    def batch_size(self, n: int) -> "FakeCursor":
+        return self
+
+    def limit(self, n: int) -> "FakeCursor":
+        if n:
+            self._docs = self._docs[:n]
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict]:
+        return [copy.deepcopy(d) for d in self._docs[:length]]
+
+    def __aiter__(self):
+        self._iter = iter(self.to_list_sync())
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    def to_list_sync(self) -> List[Dict]:
+        return [copy.deepcopy(d) for d in self._docs]
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs: List[Dict] = []
+        self.calls = itertools.count()
+
+    def _track(self) -> None:
+        next(self.calls)
+
+    async def create_index(self, *args, **kwargs) -> str:
+        return "fake_index"
+
+    async def insert_one(self, doc: Dict) -> Any:
+        self._track()
+        doc.setdefault("_id", ObjectId())
+        self.docs.append(copy.deepcopy(doc))
+        return doc["_id"]
+
+    async def insert_many(self, docs: List[Dict]) -> None:
+        for doc in docs:
+            await self.insert_one(doc)
+
+    async def find_one(self, query: Optional[Dict] = None, *args, **kwargs) -> Optional[Dict]:
+        self._track()
+        for doc in self.docs:
+            if _matches(doc, query or {}):
+                return copy.deepcopy(doc)
+        return None
+
+    def find(self, query: Optional[Dict] = None, *args, **kwargs) -> FakeCursor:
+        self._track()
+        return FakeCursor([d for d in self.docs if _matches(d, query or {})])
+
+    async def count_documents(self, query: Dict) -> int:
+        self._track()
+        return sum(1 for d in self.docs if _matches(d, query))
+
+    async def update_one(self, query: Dict, update: Dict, upsert: bool = False) -> FakeUpdateResult:
+        self._track()
+        for doc in self.docs:
+            if _matches(doc, query):
+                _apply_update(doc, update)
+                return FakeUpdateResult(1)
+        if upsert:
+            doc = {k: v for k, v in query.items() if not isinstance(v, dict)}
+            _apply_update(doc, update)
+            doc.update(update.get("$setOnInsert", {}))
+            return FakeUpdateResult(0, await self.insert_one(doc))
+        return FakeUpdateResult(0)
+
+    async def update_many(self, query: Dict, update: Dict) -> FakeUpdateResult:
+        self._track()
+        matched = 0
+        for doc in self.docs:
+            if _matches(doc, query):
+                _apply_update(doc, update)
+                matched += 1
+        return FakeUpdateResult(matched)
+
+    async def find_one_and_update(self, query: Dict, update: Dict, sort=None,
+                                  return_document=None, **kwargs) -> Optional[Dict]:
+        self._track()
+        candidates = [d for d in self.docs if _matches(d, query)]
+        if sort:
+            key, direction = sort[0]
+            candidates.sort(key=lambda d: d.get(key), reverse=direction < 0)
+        if not candidates:
+            return None
+        _apply_update(candidates[0], update)
+        return copy.deepcopy(candidates[0])
+
+    async def delete_one(self, query: Dict) -> None:
+        self._track()
+        for i, doc in enumerate(self.docs):
+            if _matches(doc, query):
+                del self.docs[i]
+                return
+
+    async def delete_many(self, query: Dict) -> None:
+        self._track()
+        self.docs = [d for d in self.docs if not _matches(d, query)]
+
+
+class FakeGridIn:
+    def __init__(self, files: Dict[Any, bytes], file_id: Any):
+        self._files = files
+        self._file_id = file_id
+        self._buffer = io.BytesIO()
+
+    async def write(self, data: bytes) -> None:
+        self._buffer.write(data)
+
+    async def close(self) -> None:
+        self._files[self._file_id] = self._buffer.getvalue()
+
+    async def abort(self) -> None:
+        self._buffer = io.BytesIO()
+
+
+class FakeGridOut(io.BytesIO):
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.length = len(data)
+
+    async def read(self, size: int = -1) -> bytes:
+        return super().read(size)
+
+
+class FakeGridFSBucket:
+    """Stand-in for ``AsyncIOMotorGridFSBucket`` keeping files on the fake database"""
+
+    def __init__(self, db: "FakeDatabase", bucket_name: str = "fs"):
+        self.files: Dict[Any, bytes] = db._buckets.setdefault(bucket_name, {})
+
+    def open_upload_stream_with_id(self, file_id: Any, filename: str, **kwargs) -> FakeGridIn:
+        return FakeGridIn(self.files, file_id)
+
+    async def upload_from_stream_with_id(self, file_id: Any, filename: str, source, **kwargs) -> None:
+        self.files[file_id] = source if isinstance(source, bytes) else source.read()
+
+    async def open_download_stream(self, file_id: Any) -> FakeGridOut:
+        from gridfs.errors import NoFile
+        if file_id not in self.files:
+            raise NoFile(file_id)
+        return FakeGridOut(self.files[file_id])
+
+    async def delete(self, file_id: Any) -> None:
+        from gridfs.errors import NoFile
+        if self.files.pop(file_id, None) is None:
+            raise NoFile(file_id)
+
+
+# Makes GridFS buckets opened on a FakeDatabase use ``FakeGridFSBucket``;
+# use as a context manager or ``start()`` it for the whole process
+FAKE_GRIDFS = mock.patch("motor.motor_asyncio.AsyncIOMotorGridFSBucket", FakeGridFSBucket)
+
+
+@contextmanager
+def fake_gridfs():
+    """Use ``FakeGridFSBucket`` for GridFS buckets within the block"""
+    with mock.patch("motor.motor_asyncio.AsyncIOMotorGridFSBucket", FakeGridFSBucket):
+        yield
+
+
+class FakeDatabase:
+    def __init__(self):
+        self._collections: Dict[str, FakeCollection] = {}
+        self._buckets: Dict[str, Dict[Any, bytes]] = {}
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self._collections.setdefault(name, FakeCollection())
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        return getattr(self, name)
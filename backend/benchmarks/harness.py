@@ -0,0 +1,136 @@
+"""
+Shared setup for API benchmarks
+Imports main.app with the database and auth dependencies overridden
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_CSV = os.path.join(BACKEND_DIR, "..", "Walmart_Sales.csv")
+
+for path in (BACKEND_DIR, BENCHMARK_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+os.environ.setdefault("GROQ_API_KEY", "fake-key")
+# The fake server has no quota; don't let the client-side limiter skew timings
+os.environ.setdefault("GROQ_REQUESTS_PER_MINUTE", "0")
+# Uploaded datasets go to a scratch directory, not the working tree
+os.environ.setdefault("DATASET_STORE_DIR", tempfile.mkdtemp(prefix="bench_datasets_"))
+
+from fake_mongo import FakeDatabase, FAKE_GRIDFS
+
+# GridFS buckets (staged uploads, datasets) opened on the fake database keep their files in memory
+FAKE_GRIDFS.start()
+
+BENCH_USER = {
+    "id": "bench-user",
+    "email": "bench@company.com",
+    "name": "Benchmark User",
+    "role": "admin",
+    "departments": ["finance", "hr", "sales", "operations", "compliance"],
+    "created_at": datetime.utcnow(),
+}
+
+
+def load_app(db: Optional[FakeDatabase] = None, override_auth: bool = True):
+    """
+    Import the FastAPI app wired to an in-memory database
+
+    Returns:
+        Tuple of (main module, fake database)
+    """
+    import main
+
+    db = db or FakeDatabase()
+    main.app.mongodb = db
+    main.app.job_queue = main.JobQueue(db)
+    main.app.dependency_overrides[main.get_database] = lambda: db
+    if override_auth:
+        main.app.dependency_overrides[main.get_current_user] = lambda: dict(BENCH_USER)
+    return main, db
+
+
+def make_client(app, **kwargs):
+    """httpx client that calls the ASGI app in-process"""
+    import httpx
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                             base_url="http://bench", **kwargs)
+
+
+async def asgi_request(app, method: str, path: str, headers: Optional[Dict[str, str]] = None,
+                       body: bytes = b"", on_body: Optional[Callable[[bytes], None]] = None):
+    """
+    Drive one request straight through the ASGI app
+
+    Body bytes are counted as they arrive instead of being collected, so
+    neither httpx's buffering (ASGITransport keeps whole responses) nor its
+    per-request overhead shows up in server-side measurements. ``on_body``
+    is called with every body chunk as it is sent (e.g. to time SSE events).
+
+    Returns:
+        Tuple of (status code, body bytes received)
+    """
+    status = None
+    received = 0
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "server": ("bench", 80), "client": ("127.0.0.1", 1),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+    }
+
+    request_sent = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # StreamingResponse listens for a disconnect while it sends
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status, received
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+            if on_body is not None:
+                on_body(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    return status, received
+
+
+def scaled_csv_bytes(scale: int) -> bytes:
+    """Walmart_Sales.csv repeated ``scale`` times"""
+    with open(SAMPLE_CSV, "rb") as f:
+        header = f.readline()
+        body = f.read()
+    if not body.endswith(b"\n"):
+        body += b"\n"
+    return header + body * scale
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p99/max in milliseconds"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"p50": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "p50": statistics.median(ordered) * 1000,
+        "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+        "max": ordered[-1] * 1000,
+    }
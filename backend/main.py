@@ -3726,8 +3726,10 @@
 # ============================================================================
 
 import os
-from typing import Optional, List, Dict, Any
-from fastapi import FastAPI, HTTPException, Depends, status, File, UploadFile, BackgroundTasks, Request, Form
+import asyncio
+import time
+from typing import Optional, List, Dict, Any, Callable, Awaitable, Tuple
+from fastapi import FastAPI, HTTPException, Depends, status, File, UploadFile, BackgroundTasks, Request, Form, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, EmailStr, Field
@@ -3754,12 +3756,57 @@ import logging
 # AI Agents
 from ai_models.llama_agent import get_llama_agent
 from ai_models.analysis_agent import get_analysis_agent
+from ai_models.llm_cache import get_llm_cache
+from ai_models.prompt_builder import get_prompt_builder
+from ai_models.conversation_memory import get_conversation_memory, session_key
+from ai_models.groq_client import get_groq_client
+
+# Ingestion
+from app.ingestion.csv_stream import ingest_csv, UploadTooLargeError
+
+# Executors for blocking work
+from app.core.executors import (
+    run_cpu_bound, run_blocking_io, executor_stats, shutdown_executors,
+    ExecutorSaturatedError
+)
+
+# Authenticated user cache
+from app.core.user_cache import get_user_cache
+
+# Error handling and token-expiry signalling
+from app.core.middleware import ApiMiddleware
+
+# Department KPIs
+from app.services.kpi_provider import (
+    get_kpi_provider, configure_kpi_provider, summarize_dataset, DatasetKPIBackend, KPI_PROVIDER_BACKEND
+)
+
+# Background jobs
+from app.jobs.queue import (
+    JobQueue, JobStatus, stage_upload, open_staged_upload, discard_staged_upload,
+    JOB_QUEUE_BACKEND, JOB_LOCAL_WORKERS, TERMINAL_STATUSES
+)
+
+# Report storage
+from app.storage.report_store import ReportStore, BlobNotFoundError
+from app.storage.report_dedup import (
+    ReportArtifacts, upload_fingerprint, get_dedup_stats, ARTIFACT_PREVIEW_ROWS,
+    REPORT_DEDUP_ENABLED, REPORT_DEDUP_COVER, REPORT_PIPELINE_VERSION
+)
+from app.storage.dataset_store import DatasetStore, DatasetGoneError, DATASET_STORE_ENABLED
+from app.storage.dataset_rows import (
+    RowQuery, DatasetQueryError, parse_filters, parse_sort,
+    DATASET_PAGE_DEFAULT_ROWS, DATASET_PAGE_MAX_ROWS
+)
+from app.core.http_cache import (
+    strong_etag, http_date, etag_matches, not_modified_since, parse_range, RangeNotSatisfiableError
+)
 
 # MongoDB
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
 from pymongo import ReturnDocument
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 
 # ============================================================================
 # LOGGING CONFIGURATION
@@ -3789,6 +3836,31 @@ async def lifespan(app: FastAPI):
     # Create indexes
     await create_indexes(app.mongodb)
     
+    # Background job queue; "local" runs report workers inside this process
+    app.job_queue = JobQueue(app.mongodb)
+    app.job_workers_stop = asyncio.Event()
+    app.job_workers = []
+    if JOB_QUEUE_BACKEND == "local":
+        app.job_queue.enable_local_dispatch()
+        app.job_workers = [
+            asyncio.create_task(app.job_queue.run_worker(
+                process_report_job, f"api-{os.getpid()}-{i}", app.job_workers_stop
+            ))
+            for i in range(JOB_LOCAL_WORKERS)
+        ]
+        # Jobs orphaned by a crashed process go back to the queue, now and periodically
+        app.job_workers.append(asyncio.create_task(
+            app.job_queue.run_stale_recovery(app.job_workers_stop)
+        ))
+    
+    # User cache invalidations from other workers (when shared through Redis)
+    await get_user_cache().start()
+    
+    # KPI snapshots; the datasets backend recomputes them on a schedule
+    kpi_provider = configure_kpi_provider(app.mongodb)
+    app.kpi_refresh_stop = asyncio.Event()
+    app.kpi_refresh_task = asyncio.create_task(kpi_provider.run_refresh_loop(app.kpi_refresh_stop))
+    
     # Create default admin user if not exists
     admin_user = await app.mongodb.users.find_one({"email": "admin@company.com"})
     if not admin_user:
@@ -3832,6 +3904,13 @@ async def lifespan(app: FastAPI):
     
     # Cleanup: Close MongoDB connection
     print("Shutting down...")
+    app.job_workers_stop.set()
+    await asyncio.gather(*app.job_workers, return_exceptions=True)
+    app.kpi_refresh_stop.set()
+    await asyncio.gather(app.kpi_refresh_task, return_exceptions=True)
+    shutdown_executors()
+    await get_groq_client().aclose()
+    await get_user_cache().close()
     app.mongodb_client.close()
 
 # Initialize FastAPI with lifespan
@@ -3856,6 +3935,9 @@ cors_origins = [
     "http://127.0.0.1:8080",
 ]
 
+# Added before CORSMiddleware so the JSON errors it produces also get CORS headers
+app.add_middleware(ApiMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=cors_origins,
@@ -3938,6 +4020,10 @@ class Token(BaseModel):
 class TokenRefresh(BaseModel):
     refresh_token: str
 
+class UserAccessUpdate(BaseModel):
+    role: Optional[UserRole] = None
+    departments: Optional[List[Department]] = None
+
 class User(BaseModel):
     id: str
     email: EmailStr
@@ -3969,6 +4055,8 @@ class NLPQuery(BaseModel):
     query: str
     department: Optional[Department] = None
     context: Optional[Dict[str, Any]] = None
+    # Follow-up questions with the same session id share conversation history
+    session_id: Optional[str] = Field(None, max_length=64)
 
 class QueryResponse(BaseModel):
     query: str
@@ -4052,11 +4140,25 @@ async def create_indexes(db):
     # New indexes for report files
     await db.report_files.create_index("report_id", unique=True)
     await db.report_files.create_index("created_at")
+    await db.report_files.create_index("blob_key")
+    
+    # Reusable analyses of previously seen uploads
+    await db.report_artifacts.create_index("fingerprint", unique=True)
+    
+    # Columnar dataset catalog
+    await db.datasets.create_index("id", unique=True)
+    await db.datasets.create_index([("department", 1), ("created_at", -1)])
+    
+    # Background jobs collection indexes
+    await db.jobs.create_index("id", unique=True)
+    await db.jobs.create_index([("status", 1), ("created_at", 1)])
+    await db.jobs.create_index("created_by")
     
     # New collection for data uploads
     await db.data_uploads.create_index("uploaded_by")
     await db.data_uploads.create_index("department")
     await db.data_uploads.create_index("uploaded_at")
+    await db.data_uploads.create_index([("department", 1), ("uploaded_at", -1)])
     
     print("✅ Database indexes created")
 
@@ -4071,6 +4173,10 @@ async def get_database():
     """Dependency to get database instance"""
     return app.mongodb
 
+async def get_job_queue():
+    """Dependency to get the background job queue"""
+    return app.job_queue
+
 # ============================================================================
 # AUTHENTICATION UTILITIES
 # ============================================================================
@@ -4130,11 +4236,16 @@ async def get_current_user(
         raise HTTPException(status_code=401, detail="Invalid token type")
     
     user_id = payload.get("sub")
-    user = await db.users.find_one({"id": user_id})
+    
+    async def load_user():
+        user = await db.users.find_one({"id": user_id})
+        return serialize_doc(user) if user else None
+    
+    user = await get_user_cache().get_or_load(user_id, load_user)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return serialize_doc(user)
+    return user
 
 def check_role(required_roles: List[UserRole]):
     async def role_checker(current_user: dict = Depends(get_current_user)):
@@ -4143,85 +4254,14 @@ def check_role(required_roles: List[UserRole]):
         return current_user
     return role_checker
 
-# ============================================================================
-# TOKEN REFRESH MIDDLEWARE
-# ============================================================================
-
-@app.middleware("http")
-async def token_refresh_middleware(request: Request, call_next):
-    # Skip for auth endpoints and OPTIONS requests
-    if request.url.path.startswith("/api/auth/") or request.method == "OPTIONS":
-        return await call_next(request)
-    
-    response = await call_next(request)
-    
-    # Check if response is 401 due to token expiry
-    if response.status_code == 401:
-        try:
-            # Check if it's a token expiry error
-            response_body = b""
-            async for chunk in response.body_iterator:
-                response_body += chunk
-            
-            response_body_str = response_body.decode()
-            if "token_expired" in response_body_str.lower() or "expired" in response_body_str.lower():
-                # Create a new response with token expired header
-                from fastapi.responses import JSONResponse
-                return JSONResponse(
-                    status_code=401,
-                    content={"detail": "Token expired", "code": "token_expired"},
-                    headers={"X-Token-Expired": "true"}
-                )
-        except:
-            pass
-    
-    return response
-
-# ============================================================================
-# CORS EXCEPTION HANDLING MIDDLEWARE
-# ============================================================================
-
-@app.middleware("http")
-async def catch_exceptions_middleware(request: Request, call_next):
-    try:
-        response = await call_next(request)
-        
-        # Ensure CORS headers are added to all responses
-        origin = request.headers.get('origin')
-        if origin and origin in cors_origins:
-            response.headers["Access-Control-Allow-Origin"] = origin
-        elif "*" in cors_origins:
-            response.headers["Access-Control-Allow-Origin"] = "*"
-            
-        response.headers["Access-Control-Allow-Credentials"] = "true"
-        response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS, PATCH"
-        response.headers["Access-Control-Allow-Headers"] = "*"
-        
-        return response
-        
-    except Exception as exc:
-        # Handle exceptions and still add CORS headers
-        import traceback
-        logger.error(f"Unhandled exception: {str(exc)}")
-        logger.error(traceback.format_exc())
-        
-        # Use JSONResponse instead of Response
-        response = JSONResponse(
-            status_code=500,
-            content={"detail": "Internal server error", "error": str(exc)}
-        )
-        
-        origin = request.headers.get('origin')
-        if origin and origin in cors_origins:
-            response.headers["Access-Control-Allow-Origin"] = origin
-        elif "*" in cors_origins:
-            response.headers["Access-Control-Allow-Origin"] = "*"
-            
-        response.headers["Access-Control-Allow-Credentials"] = "true"
-        response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS, PATCH"
-        response.headers["Access-Control-Allow-Headers"] = "*"
-        
-        return response
+@app.exception_handler(ExecutorSaturatedError)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturatedError):
+    """Shed load with 503 instead of queueing unbounded blocking work"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server busy, please retry shortly", "error": str(exc)},
+        headers={"Retry-After": "5"}
+    )
 
 # ============================================================================
 # AI INTEGRATION FUNCTIONS
@@ -4335,103 +4375,20 @@ def process_nlp_query(query: str, department: Optional[Department]) -> Dict[str,
 # MOCK DATA GENERATOR
 # ============================================================================
 
-def generate_mock_kpi_data(department: Department):
-    kpi_mapping = {
-        Department.FINANCE: {
-            "kpis": [
-                {"label": "Total Revenue", "value": "$2.4M", "change": "+12.5%", "positive": True},
-                {"label": "Expenses", "value": "$1.8M", "change": "+8.2%", "positive": False},
-                {"label": "Net Profit", "value": "$600K", "change": "+18.3%", "positive": True},
-                {"label": "Profit Margin", "value": "25%", "change": "+2.1%", "positive": True}
-            ],
-            "chart_data": [
-                {"month": "Jan", "revenue": 180, "expenses": 140},
-                {"month": "Feb", "revenue": 200, "expenses": 150},
-                {"month": "Mar", "revenue": 220, "expenses": 160},
-                {"month": "Apr", "revenue": 240, "expenses": 180},
-                {"month": "May", "revenue": 260, "expenses": 190},
-                {"month": "Jun", "revenue": 280, "expenses": 200}
-            ],
-            "summary": "Q2 revenue grew by 12.5% with controlled expense management. Profit margins improved across all divisions."
-        },
-        Department.HR: {
-            "kpis": [
-                {"label": "Total Employees", "value": "342", "change": "+5.2%", "positive": True},
-                {"label": "Attrition Rate", "value": "8.2%", "change": "-1.3%", "positive": True},
-                {"label": "New Hires", "value": "23", "change": "+15%", "positive": True},
-                {"label": "Satisfaction", "value": "87%", "change": "+3%", "positive": True}
-            ],
-            "chart_data": [
-                {"month": "Jan", "hires": 5, "exits": 3},
-                {"month": "Feb", "hires": 8, "exits": 2},
-                {"month": "Mar", "hires": 6, "exits": 4},
-                {"month": "Apr", "hires": 7, "exits": 3},
-                {"month": "May", "hires": 9, "exits": 5},
-                {"month": "Jun", "hires": 4, "exits": 3}
-            ],
-            "summary": "Workforce grew steadily with reduced attrition. Employee satisfaction improved through new wellness programs."
-        },
-        Department.SALES: {
-            "kpis": [
-                {"label": "Total Deals", "value": "156", "change": "+22%", "positive": True},
-                {"label": "Conversion Rate", "value": "34%", "change": "+5%", "positive": True},
-                {"label": "Pipeline Value", "value": "$4.2M", "change": "+28%", "positive": True},
-                {"label": "Avg Deal Size", "value": "$27K", "change": "+8%", "positive": True}
-            ],
-            "chart_data": [
-                {"month": "Jan", "deals": 20, "value": 540},
-                {"month": "Feb", "deals": 25, "value": 675},
-                {"month": "Mar", "deals": 28, "value": 756},
-                {"month": "Apr", "deals": 22, "value": 594},
-                {"month": "May", "deals": 30, "value": 810},
-                {"month": "Jun", "deals": 31, "value": 837}
-            ],
-            "summary": "Outstanding sales performance with 22% growth in closed deals. Pipeline value reached all-time high."
-        },
-        Department.OPERATIONS: {
-            "kpis": [
-                {"label": "Efficiency", "value": "94%", "change": "+2%", "positive": True},
-                {"label": "Downtime", "value": "2.3h", "change": "-15%", "positive": True},
-                {"label": "Orders", "value": "1,234", "change": "+18%", "positive": True},
-                {"label": "On-Time", "value": "96%", "change": "+3%", "positive": True}
-            ],
-            "chart_data": [
-                {"month": "Jan", "efficiency": 91, "downtime": 3.2},
-                {"month": "Feb", "efficiency": 92, "downtime": 2.8},
-                {"month": "Mar", "efficiency": 93, "downtime": 2.5},
-                {"month": "Apr", "efficiency": 94, "downtime": 2.3},
-                {"month": "May", "efficiency": 94, "downtime": 2.1},
-                {"month": "Jun", "efficiency": 95, "downtime": 1.9}
-            ],
-            "summary": "Operational efficiency improved with reduced equipment downtime. On-time delivery exceeds target."
-        },
-        Department.COMPLIANCE: {
-            "kpis": [
-                {"label": "Audits", "value": "12", "change": "0%", "positive": True},
-                {"label": "Open Issues", "value": "3", "change": "-40%", "positive": True},
-                {"label": "Resolved", "value": "89%", "change": "+12%", "positive": True},
-                {"label": "Risk Level", "value": "Low", "change": "Stable", "positive": True}
-            ],
-            "chart_data": [
-                {"month": "Jan", "audits": 2, "issues": 5},
-                {"month": "Feb", "audits": 2, "issues": 4},
-                {"month": "Mar", "audits": 2, "issues": 6},
-                {"month": "Apr", "audits": 2, "issues": 5},
-                {"month": "May", "audits": 2, "issues": 4},
-                {"month": "Jun", "audits": 2, "issues": 3}
-            ],
-            "summary": "Compliance metrics remain strong with 89% issue resolution rate. All audits passed successfully."
-        }
-    }
-    return kpi_mapping.get(department, kpi_mapping[Department.FINANCE])
-
 # ============================================================================
 # PDF GENERATION FUNCTIONS
 # ============================================================================
 
 async def generate_pdf_report(department: str, filename: str, data_preview: List[Dict], 
                             analysis_result: Dict, user_name: str) -> bytes:
-    """Generate PDF report from AI analysis"""
+    """Generate PDF report from AI analysis on the CPU executor"""
+    return await run_cpu_bound(
+        build_pdf_report, department, filename, data_preview, analysis_result, user_name
+    )
+
+def build_pdf_report(department: str, filename: str, data_preview: List[Dict], 
+                     analysis_result: Dict, user_name: str) -> bytes:
+    """Build PDF report from AI analysis (blocking)"""
     try:
         # Create a buffer for PDF
         buffer = io.BytesIO()
@@ -4711,6 +4668,373 @@ def generate_error_pdf(error_message: str) -> bytes:
     buffer.close()
     return pdf_bytes
 
+# ============================================================================
+# REPORT GENERATION PIPELINE
+# ============================================================================
+
+class ReportPipelineError(Exception):
+    """Report pipeline failure carrying the HTTP status for the client"""
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+async def _no_status_update(status: JobStatus) -> None:
+    return None
+
+async def run_report_pipeline(
+    db,
+    report_id: str,
+    source,
+    filename: str,
+    department: str,
+    user: Dict[str, Any],
+    on_status: Callable[[JobStatus], Awaitable[None]] = _no_status_update
+) -> Dict[str, Any]:
+    """
+    Parse, analyze and render one uploaded CSV into a stored PDF report
+    
+    Shared by the synchronous upload endpoint and background job workers.
+    ``on_status`` is awaited as the pipeline moves between stages. Uploads
+    whose fingerprint (bytes, department, analysis settings) matches an
+    earlier report reuse its analysis and PDF instead of being re-analyzed.
+    """
+    # Get AI agents
+    try:
+        llama_agent = get_llama_agent()
+        analysis_agent = get_analysis_agent()
+        logger.info("AI agents initialized successfully")
+    except Exception as agent_error:
+        raise ReportPipelineError(500, f"AI service unavailable: {str(agent_error)}")
+    
+    # Fingerprint the upload before parsing so repeats skip all the work
+    await on_status(JobStatus.PARSING)
+    fingerprint = None
+    artifact = None
+    artifacts = ReportArtifacts(db)
+    if REPORT_DEDUP_ENABLED:
+        config = {"pipeline": REPORT_PIPELINE_VERSION, **llama_agent.generation_settings()}
+        fingerprint = await run_blocking_io(upload_fingerprint, source, department, config)
+        artifact = await artifacts.find(fingerprint.key)
+    
+    if artifact:
+        link = await reuse_report_artifact(
+            db, report_id, artifact, filename, department, user, on_status
+        )
+        get_dedup_stats().hit(fingerprint.size, shared_pdf=link["pdf"] == "shared")
+    else:
+        if fingerprint:
+            get_dedup_stats().miss()
+        artifact, reusable = await analyze_upload(
+            db, report_id, source, filename, department, user, analysis_agent, on_status
+        )
+        link = {"source_report_id": report_id, "pdf": "rendered", "reused": False}
+        if fingerprint and reusable:
+            await artifacts.record(fingerprint, report_id, report_id, filename, user["name"], artifact)
+            get_dedup_stats().recorded()
+    
+    upload_size = fingerprint.size if fingerprint else artifact["upload_size"]
+    if fingerprint:
+        link.update(fingerprint=fingerprint.key, content_sha256=fingerprint.content_sha256)
+    
+    # Store report in database (queued jobs already have a placeholder record)
+    report_data = new_report_record(report_id, filename, department, user, JobStatus.COMPLETED)
+    report_data.update({
+        "size": f"{(upload_size / 1024 / 1024):.1f} MB",
+        "analysis_data": artifact["analysis_data"],
+        "artifact": link,
+        "dataset_id": artifact.get("dataset_id"),
+        "updated_at": datetime.utcnow()
+    })
+    report_data.pop("created_at")
+    await db.reports.update_one(
+        {"id": report_id},
+        {"$set": report_data, "$setOnInsert": {"created_at": datetime.utcnow()}},
+        upsert=True
+    )
+    await on_status(JobStatus.COMPLETED)
+    
+    # Record the dataset for KPI refreshes
+    upload = {
+        "id": str(uuid.uuid4()),
+        "report_id": report_id,
+        "filename": filename,
+        "department": department,
+        "uploaded_by": user["id"],
+        "uploaded_at": datetime.utcnow(),
+        "rows": artifact["total_rows"],
+        "columns": artifact["columns"],
+        "dataset_id": artifact.get("dataset_id")
+    }
+    if artifact.get("kpi_summary") is not None:
+        upload["kpi_summary"] = artifact["kpi_summary"]
+    await db.data_uploads.insert_one(upload)
+    
+    # Log activity
+    activity = {
+        "id": str(uuid.uuid4()),
+        "action": f"CSV Analysis Report Generated: {filename}",
+        "user_id": user["id"],
+        "user_name": user["name"],
+        "timestamp": datetime.utcnow(),
+        "type": "csv_analysis",
+        "department": department
+    }
+    await db.activities.insert_one(activity)
+    
+    return {
+        "message": "CSV analyzed and report generated successfully",
+        "report_id": report_id,
+        "analysis": artifact["analysis_data"],
+        "deduplicated": link["reused"],
+        "dataset_id": artifact.get("dataset_id"),
+        "rows_url": f"/api/datasets/{artifact['dataset_id']}/rows" if artifact.get("dataset_id") else None,
+        "data_preview": {
+            "columns": artifact["columns"],
+            "first_five_rows": artifact["data_preview"][:5],
+            "total_rows": artifact["total_rows"]
+        }
+    }
+
+async def analyze_upload(
+    db,
+    report_id: str,
+    source,
+    filename: str,
+    department: str,
+    user: Dict[str, Any],
+    analysis_agent,
+    on_status: Callable[[JobStatus], Awaitable[None]]
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    Parse, analyze and render an upload seen for the first time
+    
+    Returns:
+        Tuple of (artifact fields, whether they may be reused); fallback
+        analyses and error PDFs are never reused
+    """
+    # Stream and parse CSV in bounded chunks; the upload stays an Arrow table
+    # and each stage below converts only the rows or columns it needs
+    try:
+        ingest = await run_cpu_bound(ingest_csv, source)
+        table = ingest.table
+        upload_size = ingest.bytes_read
+        logger.info(f"File size: {upload_size} bytes")
+        logger.info(f"CSV parsed successfully: {table.num_rows} rows, {table.num_columns} columns")
+    except UploadTooLargeError as size_error:
+        raise ReportPipelineError(413, str(size_error))
+    except ExecutorSaturatedError:
+        raise
+    except Exception as csv_error:
+        raise ReportPipelineError(400, f"Invalid CSV file: {str(csv_error)}")
+    
+    # Basic data validation
+    if table.num_rows == 0:
+        raise ReportPipelineError(400, "CSV file is empty")
+    
+    if table.num_columns == 0:
+        raise ReportPipelineError(400, "CSV file has no columns")
+    
+    # Dataset KPIs, only needed when the dashboard reads them (datasets backend)
+    kpi_summary = None
+    if KPI_PROVIDER_BACKEND == DatasetKPIBackend.name:
+        kpi_summary = await run_cpu_bound(summarize_dataset, table)
+    
+    # Keep a columnar copy for previews and later analyses
+    dataset = None
+    if DATASET_STORE_ENABLED:
+        try:
+            dataset = await DatasetStore(db).save(
+                str(uuid.uuid4()), table,
+                report_id=report_id,
+                filename=filename,
+                department=department,
+                uploaded_by=user["id"],
+                memory_usage_mb=round(ingest.memory_usage_mb, 3)
+            )
+        except ExecutorSaturatedError:
+            raise
+        except Exception as store_error:
+            logger.error(f"Dataset store failed: {str(store_error)}")
+    
+    # Only the leading rows are needed as dicts (prompts, PDF table, response);
+    # everything else is paged from the stored dataset
+    data_records = table.slice(0, ARTIFACT_PREVIEW_ROWS).to_pylist()
+    columns = table.column_names
+    total_rows = table.num_rows
+    # Don't hold the upload through the LLM calls and PDF rendering
+    del ingest, table
+    
+    await on_status(JobStatus.ANALYZING)
+    
+    # Generate AI analysis with error handling
+    try:
+        analysis_result = await analysis_agent.analyze_department_performance_async(
+            department=department,
+            kpis=[{"label": col, "value": "Analyzing...", "change": "0%", "positive": True} for col in columns[:4]],
+            chart_data=data_records[:10]  # Use first 10 records for chart data
+        )
+        logger.info("AI analysis completed successfully")
+        # Analyses missing timed-out parts are served once, not reused
+        reusable = not analysis_result.get("partial")
+    except Exception as analysis_error:
+        logger.error(f"AI analysis failed: {str(analysis_error)}")
+        reusable = False
+        # Provide fallback analysis
+        analysis_result = {
+            "summary": f"Basic analysis of {total_rows} records from {filename} in {department} department",
+            "insights": [
+                f"Data loaded successfully with {total_rows} rows and {len(columns)} columns",
+                "AI analysis encountered issues but data is ready for review"
+            ],
+            "recommendations": [
+                "Review data quality and structure",
+                "Consider manual analysis for specific insights"
+            ],
+            "trends": {
+                "trend": "unknown", 
+                "pattern": "Analysis limited due to technical issues",
+                "prediction": "Further analysis required",
+                "confidence": "low",
+                "reasoning": "AI analysis encountered technical difficulties"
+            },
+            "anomalies": []
+        }
+    
+    # Generate PDF report
+    await on_status(JobStatus.RENDERING)
+    try:
+        pdf_report = await generate_pdf_report(
+            department=department,
+            filename=filename,
+            data_preview=data_records[:10],
+            analysis_result=analysis_result,
+            user_name=user["name"]
+        )
+        logger.info("PDF report generated successfully")
+    except ExecutorSaturatedError:
+        raise
+    except Exception as pdf_error:
+        logger.error(f"PDF generation failed: {str(pdf_error)}")
+        reusable = False
+        # Generate a simple error PDF instead of failing completely
+        pdf_report = generate_error_pdf(f"PDF generation issue: {str(pdf_error)}")
+    
+    # Store PDF file
+    await ReportStore(db).save(report_id, pdf_report)
+    
+    artifact = {
+        "analysis_data": analysis_result,
+        "data_preview": data_records,
+        "columns": columns,
+        "total_rows": total_rows,
+        "kpi_summary": kpi_summary,
+        "upload_size": upload_size,
+        "dataset_id": dataset["id"] if dataset else None
+    }
+    return artifact, reusable
+
+async def reuse_report_artifact(
+    db,
+    report_id: str,
+    artifact: Dict[str, Any],
+    filename: str,
+    department: str,
+    user: Dict[str, Any],
+    on_status: Callable[[JobStatus], Awaitable[None]]
+) -> Dict[str, Any]:
+    """
+    Give ``report_id`` the PDF of an earlier identical upload
+    
+    The stored PDF is shared when its cover still fits (see
+    ``REPORT_DEDUP_COVER``); otherwise it is re-rendered from the stored
+    analysis, which skips parsing and every LLM call.
+    
+    Returns:
+        The ``artifact`` link stored on the reports document
+    """
+    await on_status(JobStatus.RENDERING)
+    report_store = ReportStore(db)
+    cover = {"filename": filename, "user_name": user["name"]}
+    file_doc = None
+    if REPORT_DEDUP_COVER == "reuse" or (REPORT_DEDUP_COVER == "auto" and artifact.get("cover") == cover):
+        file_doc = await report_store.link(report_id, artifact["blob_key"])
+    
+    if file_doc is None:
+        pdf_report = await generate_pdf_report(
+            department=department,
+            filename=filename,
+            data_preview=artifact["data_preview"],
+            analysis_result=artifact["analysis_data"],
+            user_name=user["name"]
+        )
+        saved = await report_store.save(report_id, pdf_report)
+        if not await db.report_files.find_one({"blob_key": artifact["blob_key"]}):
+            # Every report that shared the old PDF was deleted; adopt this one
+            await ReportArtifacts(db).relink(
+                artifact["fingerprint"], report_id, saved["blob_key"], filename, user["name"]
+            )
+    
+    await ReportArtifacts(db).touch(artifact["fingerprint"])
+    logger.info(f"♻️ Report {report_id} reuses the analysis of report {artifact['report_id']}")
+    return {
+        "source_report_id": artifact["report_id"],
+        "pdf": "rerendered" if file_doc is None else "shared",
+        "reused": True
+    }
+
+def new_report_record(report_id: str, filename: str, department: str,
+                      user: Dict[str, Any], status: JobStatus) -> Dict[str, Any]:
+    """Report metadata document for a CSV upload"""
+    return {
+        "id": report_id,
+        "title": f"AI Analysis - {filename}",
+        "department": department,
+        "report_type": ReportType.PDF.value,
+        "file_url": f"/api/reports/download/{report_id}",
+        "size": "0.0 MB",
+        "status": status.value,
+        "created_by": user["id"],
+        "created_by_name": user["name"],
+        "created_at": datetime.utcnow(),
+        "source": "csv_upload",
+        "original_filename": filename
+    }
+
+async def process_report_job(queue: JobQueue, job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job handler: run the report pipeline for a staged upload"""
+    db = queue.db
+    payload = job["payload"]
+    report_id = job["report_id"]
+    
+    async def on_status(status: JobStatus) -> None:
+        await queue.update(job["id"], status)
+        await db.reports.update_one(
+            {"id": report_id},
+            {"$set": {"status": status.value, "updated_at": datetime.utcnow()}}
+        )
+    
+    try:
+        with await open_staged_upload(db, payload["staged_upload_id"]) as source:
+            result = await run_report_pipeline(
+                db, report_id, source,
+                filename=payload["filename"],
+                department=payload["department"],
+                user=payload["user"],
+                on_status=on_status
+            )
+    except Exception as e:
+        detail = e.detail if isinstance(e, ReportPipelineError) else str(e)
+        await db.reports.update_one(
+            {"id": report_id},
+            {"$set": {"status": JobStatus.FAILED.value, "error": detail, "updated_at": datetime.utcnow()}}
+        )
+        raise RuntimeError(detail) from e
+    finally:
+        await discard_staged_upload(db, payload["staged_upload_id"])
+    
+    return result
+
 # ============================================================================
 # API ENDPOINTS
 # ============================================================================
@@ -4724,6 +5048,24 @@ async def root():
         "timestamp": datetime.utcnow().isoformat()
     }
 
+@app.get("/api/system/metrics")
+async def get_system_metrics(
+    current_user: dict = Depends(check_role([UserRole.ADMIN]))
+):
+    """Runtime metrics: executor queue depth, wait times and cache hit ratios (Admin only)"""
+    return {
+        "executors": executor_stats(),
+        "user_cache": get_user_cache().stats(),
+        "kpis": get_kpi_provider().stats(),
+        "llm_cache": get_llm_cache().stats(),
+        "prompts": get_prompt_builder().stats(),
+        "conversations": get_conversation_memory().stats(),
+        "groq": get_groq_client().stats(),
+        "analysis": get_analysis_agent().flights.stats(),
+        "report_dedup": get_dedup_stats().stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
 # ============================================================================
 # AUTHENTICATION ENDPOINTS
 # ============================================================================
@@ -4794,6 +5136,9 @@ async def login(credentials: UserLogin, db=Depends(get_database)):
         {"$set": {"refresh_token": refresh_token, "updated_at": datetime.utcnow()}}
     )
     
+    # Start the session from the current role and departments
+    await get_user_cache().invalidate(user["id"])
+    
     # Return tokens and user info
     user_response = {k: v for k, v in user.items() if k not in ["password", "refresh_token"]}
     user_response = serialize_doc(user_response)
@@ -4861,6 +5206,35 @@ async def get_current_user_info(current_user: dict = Depends(get_current_user)):
     """Get current user information"""
     return {k: v for k, v in current_user.items() if k not in ["password", "refresh_token"]}
 
+# ============================================================================
+# USER MANAGEMENT ENDPOINTS
+# ============================================================================
+
+@app.patch("/api/users/{user_id}/access")
+async def update_user_access(
+    user_id: str,
+    access: UserAccessUpdate,
+    current_user: dict = Depends(check_role([UserRole.ADMIN])),
+    db=Depends(get_database)
+):
+    """Change a user's role and/or departments (Admin only)"""
+    changes = access.model_dump(mode="json", exclude_none=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    
+    result = await db.users.update_one(
+        {"id": user_id},
+        {"$set": {**changes, "updated_at": datetime.utcnow()}}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Permissions are read from the user cache on every request
+    await get_user_cache().invalidate(user_id)
+    
+    logger.info(f"User {user_id} access updated by {current_user['id']}: {changes}")
+    return {"message": "User access updated", "user_id": user_id, **changes}
+
 # ============================================================================
 # CSV UPLOAD & ANALYSIS ENDPOINTS
 # ============================================================================
@@ -4869,10 +5243,17 @@ async def get_current_user_info(current_user: dict = Depends(get_current_user)):
 async def upload_csv_analysis(
     file: UploadFile = File(...),
     department: str = Form(None),
+    async_job: bool = Form(False),
     current_user: dict = Depends(get_current_user),
-    db=Depends(get_database)
+    db=Depends(get_database),
+    job_queue: JobQueue = Depends(get_job_queue)
 ):
-    """Upload CSV for AI analysis and report generation"""
+    """
+    Upload CSV for AI analysis and report generation
+    
+    With ``async_job`` set the upload is queued and a job id is returned
+    right away; poll ``/api/jobs/{job_id}`` or stream ``/api/jobs/{job_id}/events``.
+    """
     try:
         logger.info(f"Upload received: {file.filename}, department: {department}")
         
@@ -4905,152 +5286,50 @@ async def upload_csv_analysis(
                 detail=f"Access denied to {department} department"
             )
         
-        # Read and parse CSV
-        content = await file.read()
-        logger.info(f"File size: {len(content)} bytes")
+        report_id = str(uuid.uuid4())
+        user = {"id": current_user["id"], "name": current_user["name"]}
         
-        try:
-            csv_text = content.decode('utf-8')
-            df = pd.read_csv(io.StringIO(csv_text))
-            logger.info(f"CSV parsed successfully: {len(df)} rows, {len(df.columns)} columns")
-        except Exception as csv_error:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Invalid CSV file: {str(csv_error)}"
+        if async_job:
+            # Stage the upload and hand it to a worker
+            staged_upload_id = await stage_upload(db, file.file, file.filename)
+            await db.reports.insert_one(
+                new_report_record(report_id, file.filename, department_enum.value, user, JobStatus.QUEUED)
             )
-        
-        # Basic data validation
-        if df.empty:
-            raise HTTPException(status_code=400, detail="CSV file is empty")
-        
-        if len(df.columns) == 0:
-            raise HTTPException(status_code=400, detail="CSV file has no columns")
-        
-        # Convert DataFrame to list of dictionaries for AI processing
-        data_records = df.to_dict('records')
-        
-        # Get AI agents
-        try:
-            llama_agent = get_llama_agent()
-            analysis_agent = get_analysis_agent()
-            logger.info("AI agents initialized successfully")
-        except Exception as agent_error:
-            raise HTTPException(
-                status_code=500,
-                detail=f"AI service unavailable: {str(agent_error)}"
+            job = await job_queue.enqueue(
+                "csv_report",
+                {
+                    "staged_upload_id": staged_upload_id,
+                    "filename": file.filename,
+                    "department": department_enum.value,
+                    "user": user
+                },
+                created_by=user["id"],
+                report_id=report_id
             )
-        
-        # Prepare context for AI analysis
-        context = {
-            "department": department_enum.value,
-            "data_preview": data_records[:5],  # First 5 records for context
-            "columns": list(df.columns),
-            "total_records": len(df),
-            "data_summary": {
-                "columns": list(df.columns),
-                "total_rows": len(df),
-                "data_types": df.dtypes.to_dict()
-            }
-        }
-        
-        # Generate AI analysis with error handling
-        try:
-            analysis_result = analysis_agent.analyze_department_performance(
-                department=department_enum.value,
-                kpis=[{"label": col, "value": "Analyzing...", "change": "0%", "positive": True} for col in df.columns[:4]],
-                chart_data=data_records[:10]  # Use first 10 records for chart data
+            return JSONResponse(
+                status_code=202,
+                content={
+                    "message": "CSV upload queued for analysis",
+                    "job_id": job["id"],
+                    "report_id": report_id,
+                    "status": job["status"],
+                    "status_url": f"/api/jobs/{job['id']}",
+                    "events_url": f"/api/jobs/{job['id']}/events"
+                }
             )
-            logger.info("AI analysis completed successfully")
-        except Exception as analysis_error:
-            logger.error(f"AI analysis failed: {str(analysis_error)}")
-            # Provide fallback analysis
-            analysis_result = {
-                "summary": f"Basic analysis of {len(df)} records from {file.filename} in {department} department",
-                "insights": [
-                    f"Data loaded successfully with {len(df)} rows and {len(df.columns)} columns",
-                    "AI analysis encountered issues but data is ready for review"
-                ],
-                "recommendations": [
-                    "Review data quality and structure",
-                    "Consider manual analysis for specific insights"
-                ],
-                "trends": {
-                    "trend": "unknown", 
-                    "pattern": "Analysis limited due to technical issues",
-                    "prediction": "Further analysis required",
-                    "confidence": "low",
-                    "reasoning": "AI analysis encountered technical difficulties"
-                },
-                "anomalies": []
-            }
         
-        # Generate PDF report
         try:
-            pdf_report = await generate_pdf_report(
-                department=department_enum.value,  # Use string value, not enum
+            return await run_report_pipeline(
+                db, report_id, file.file,
                 filename=file.filename,
-                data_preview=data_records[:10],
-                analysis_result=analysis_result,
-                user_name=current_user["name"]
+                department=department_enum.value,
+                user=user
             )
-            logger.info("PDF report generated successfully")
-        except Exception as pdf_error:
-            logger.error(f"PDF generation failed: {str(pdf_error)}")
-            # Generate a simple error PDF instead of failing completely
-            pdf_report = generate_error_pdf(f"PDF generation issue: {str(pdf_error)}")
-        
-        # Store report in database
-        report_id = str(uuid.uuid4())
-        report_data = {
-            "id": report_id,
-            "title": f"AI Analysis - {file.filename}",
-            "department": department_enum.value,
-            "report_type": ReportType.PDF.value,
-            "file_url": f"/api/reports/download/{report_id}",
-            "size": f"{(len(content) / 1024 / 1024):.1f} MB",
-            "status": "completed",
-            "created_by": current_user["id"],
-            "created_by_name": current_user["name"],
-            "created_at": datetime.utcnow(),
-            "source": "csv_upload",
-            "original_filename": file.filename,
-            "analysis_data": analysis_result
-        }
+        except ReportPipelineError as pipeline_error:
+            raise HTTPException(status_code=pipeline_error.status_code, detail=pipeline_error.detail)
         
-        await db.reports.insert_one(report_data)
-        
-        # Store PDF file
-        await db.report_files.insert_one({
-            "report_id": report_id,
-            "pdf_content": base64.b64encode(pdf_report).decode('utf-8'),
-            "created_at": datetime.utcnow()
-        })
-        
-        # Log activity
-        activity = {
-            "id": str(uuid.uuid4()),
-            "action": f"CSV Analysis Report Generated: {file.filename}",
-            "user_id": current_user["id"],
-            "user_name": current_user["name"],
-            "timestamp": datetime.utcnow(),
-            "type": "csv_analysis",
-            "department": department_enum.value
-        }
-        await db.activities.insert_one(activity)
-        
-        return {
-            "message": "CSV analyzed and report generated successfully",
-            "report_id": report_id,
-            "analysis": analysis_result,
-            "data_preview": {
-                "columns": list(df.columns),
-                "first_five_rows": data_records[:5],
-                "total_rows": len(df)
-            }
-        }
-        
-    except HTTPException:
-        # Re-raise HTTP exceptions
+    except (HTTPException, ExecutorSaturatedError):
+        # Re-raise HTTP and backpressure exceptions
         raise
     except Exception as e:
         logger.error(f"Unexpected error in upload_csv_analysis: {str(e)}")
@@ -5064,6 +5343,7 @@ async def upload_csv_analysis(
 @app.get("/api/reports/download/{report_id}")
 async def download_report_pdf(
     report_id: str,
+    request: Request,
     current_user: dict = Depends(get_current_user),
     db=Depends(get_database)
 ):
@@ -5085,42 +5365,80 @@ async def download_report_pdf(
             logger.error(f"Access denied: User {current_user['id']} cannot access {report['department']}")
             raise HTTPException(status_code=403, detail="Access denied to this report")
         
-        # Get PDF content
-        pdf_file = await db.report_files.find_one({"report_id": report_id})
+        # Get PDF location
+        report_store = ReportStore(db)
+        pdf_file = await report_store.describe(report_id)
         if not pdf_file:
             logger.error(f"PDF file not found for report: {report_id}")
             raise HTTPException(status_code=404, detail="PDF file not found")
         
-        logger.info(f"PDF file found, size: {len(pdf_file['pdf_content'])} bytes")
-        
-        # Decode PDF content
-        try:
-            pdf_content = base64.b64decode(pdf_file["pdf_content"])
-            logger.info(f"PDF decoded successfully, size: {len(pdf_content)} bytes")
-        except Exception as decode_error:
-            logger.error(f"PDF decode error: {str(decode_error)}")
-            raise HTTPException(status_code=500, detail="Corrupted PDF file")
-        
         # Validate PDF content
-        if len(pdf_content) == 0:
+        if pdf_file["length"] == 0:
             logger.error("PDF content is empty")
             raise HTTPException(status_code=500, detail="Empty PDF file")
         
-        # Return PDF file
-        from fastapi.responses import Response
         filename = f"{report['title']}.pdf".replace(" ", "_")
+        length = pdf_file["length"]
+        etag = strong_etag(pdf_file["sha256"]) if pdf_file.get("sha256") else None
+        headers = {
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Accept-Ranges": "bytes",
+            "Cache-Control": "private, no-cache",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Credentials": "true",
+            "Access-Control-Expose-Headers": "ETag, Content-Range, Content-Length"
+        }
+        if etag:
+            headers["ETag"] = etag
+        if pdf_file.get("created_at"):
+            headers["Last-Modified"] = http_date(pdf_file["created_at"])
+        
+        # Revalidation is answered from the catalog document alone
+        if_none_match = request.headers.get("if-none-match")
+        if (etag_matches(if_none_match, etag) or
+                (if_none_match is None and
+                 not_modified_since(request.headers.get("if-modified-since"), pdf_file.get("created_at")))):
+            logger.info(f"PDF not modified: {report_id}")
+            return Response(status_code=304, headers={
+                key: value for key, value in headers.items() if key != "Content-Disposition"
+            })
+        
+        # Partial content; a stale If-Range falls back to the full body
+        byte_range = None
+        if_range = request.headers.get("if-range")
+        if not if_range or etag_matches(if_range, etag, weak=False):
+            try:
+                byte_range = parse_range(request.headers.get("range"), length)
+            except RangeNotSatisfiableError:
+                headers["Content-Range"] = f"bytes */{length}"
+                return Response(status_code=416, headers=headers)
+        
+        start, end = byte_range or (0, length - 1)
+        status_code = 206 if byte_range else 200
+        if byte_range:
+            headers["Content-Range"] = f"bytes {start}-{end}/{length}"
+        headers["Content-Length"] = str(end - start + 1)
+        
+        # Pull the first chunk up front so a missing blob is still a clean error response
+        pdf_stream = report_store.stream(pdf_file, start, end)
+        try:
+            first_chunk = await pdf_stream.__anext__()
+        except BlobNotFoundError as blob_error:
+            logger.error(f"PDF blob unavailable for report {report_id}: {str(blob_error)}")
+            raise HTTPException(status_code=500, detail="Corrupted PDF file")
+        
+        async def pdf_chunks():
+            yield first_chunk
+            async for chunk in pdf_stream:
+                yield chunk
         
-        logger.info(f"Returning PDF file: {filename}")
+        logger.info(f"Streaming PDF file: {filename} bytes {start}-{end}/{length} ({pdf_file['storage']})")
         
-        return Response(
-            content=pdf_content,
+        return StreamingResponse(
+            pdf_chunks(),
+            status_code=status_code,
             media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}",
-                "Content-Length": str(len(pdf_content)),
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Credentials": "true"
-            }
+            headers=headers
         )
         
     except HTTPException:
@@ -5149,7 +5467,7 @@ async def debug_report(
             return {"error": "Report not found"}
         
         # Get PDF file info
-        pdf_file = await db.report_files.find_one({"report_id": report_id})
+        pdf_file = await ReportStore(db).describe(report_id)
         
         return {
             "report_found": bool(report),
@@ -5162,9 +5480,11 @@ async def debug_report(
             },
             "pdf_file_found": bool(pdf_file),
             "pdf_file_data": {
-                "has_content": bool(pdf_file and pdf_file.get("pdf_content")),
-                "content_length": len(pdf_file.get("pdf_content", "")) if pdf_file else 0,
-                "created_at": pdf_file.get("created_at") if pdf_file else None
+                "has_content": pdf_file.get("length", 0) > 0,
+                "content_length": pdf_file.get("length", 0),
+                "storage": pdf_file.get("storage"),
+                "backend": pdf_file.get("backend"),
+                "created_at": pdf_file.get("created_at")
             } if pdf_file else None,
             "user_access": report["department"] in current_user["departments"] if report else False
         }
@@ -5221,6 +5541,72 @@ async def options_download_report():
         }
     )
 
+# ============================================================================
+# BACKGROUND JOB ENDPOINTS
+# ============================================================================
+
+JOB_EVENTS_POLL_SECONDS = float(os.getenv("JOB_EVENTS_POLL_SECONDS", "0.5"))
+JOB_EVENTS_KEEPALIVE_SECONDS = 15
+
+def serialize_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of a job document"""
+    return {k: v for k, v in job.items() if k not in ["_id", "payload", "worker_id"]}
+
+async def get_authorized_job(job_id: str, current_user: dict, job_queue: JobQueue) -> Dict[str, Any]:
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["created_by"] != current_user["id"] and current_user["role"] != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Access denied to this job")
+    return job
+
+@app.get("/api/jobs/{job_id}")
+async def get_job_status(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+    job_queue: JobQueue = Depends(get_job_queue)
+):
+    """Get status of a background report job"""
+    job = await get_authorized_job(job_id, current_user, job_queue)
+    return serialize_job(job)
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    job_queue: JobQueue = Depends(get_job_queue)
+):
+    """Server-sent events with job status changes until the job finishes"""
+    await get_authorized_job(job_id, current_user, job_queue)
+    
+    async def event_stream():
+        last_status = None
+        last_sent = time.monotonic()
+        while not await request.is_disconnected():
+            job = await job_queue.get(job_id)
+            if job is None:
+                break
+            
+            if job["status"] != last_status:
+                last_status = job["status"]
+                last_sent = time.monotonic()
+                payload = json.dumps(serialize_job(job), default=str)
+                yield f"event: status\ndata: {payload}\n\n"
+                if last_status in TERMINAL_STATUSES:
+                    break
+            elif time.monotonic() - last_sent > JOB_EVENTS_KEEPALIVE_SECONDS:
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+            
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # ============================================================================
 # DASHBOARD & KPI ENDPOINTS
 # ============================================================================
@@ -5257,20 +5643,19 @@ async def get_dashboard_stats(
 @app.get("/api/dashboard/kpis/{department}")
 async def get_department_kpis(
     department: Department,
+    request: Request,
     current_user: dict = Depends(get_current_user)
 ):
     """Get KPIs for a specific department"""
     if department not in current_user["departments"]:
         raise HTTPException(status_code=403, detail="Access denied to this department")
     
-    data = generate_mock_kpi_data(department)
-    return {
-        "department": department,
-        "kpis": data["kpis"],
-        "chart_data": data["chart_data"],
-        "summary": data["summary"],
-        "last_updated": datetime.utcnow().isoformat()
-    }
+    # Served from the pre-serialized snapshot
+    snapshot = get_kpi_provider().get(department)
+    headers = {"ETag": snapshot.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
 
 @app.get("/api/dashboard/activity")
 async def get_recent_activity(
@@ -5400,15 +5785,156 @@ async def delete_report(
     
     await db.reports.delete_one({"id": report_id})
     
+    # Remove the stored PDF
+    await ReportStore(db).delete(report_id)
+    
+    # Remove the stored dataset unless a report reusing the same upload still links to it
+    dataset_id = report.get("dataset_id")
+    if dataset_id and not await db.reports.count_documents({"dataset_id": dataset_id}):
+        await DatasetStore(db).delete(dataset_id)
+        await db.report_artifacts.update_many({"dataset_id": dataset_id}, {"$set": {"dataset_id": None}})
+    
     # Also delete related comments
     await db.comments.delete_many({"report_id": report_id})
     
     return {"message": "Report deleted successfully", "report_id": report_id}
 
+# ============================================================================
+# DATASET ENDPOINTS
+# ============================================================================
+
+async def get_authorized_dataset(dataset_id: str, current_user: dict, db) -> Dict[str, Any]:
+    dataset = await DatasetStore(db).describe(dataset_id)
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    if dataset["department"] not in current_user["departments"]:
+        raise HTTPException(status_code=403, detail="Access denied to this dataset")
+    return dataset
+
+@app.get("/api/datasets")
+async def get_datasets(
+    department: Optional[Department] = None,
+    limit: int = 50,
+    current_user: dict = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    """List stored datasets (catalog entries with schema and column statistics)"""
+    query = {"department": {"$in": current_user["departments"]}}
+    
+    if department:
+        if department not in current_user["departments"]:
+            raise HTTPException(status_code=403, detail="Access denied to this department")
+        query["department"] = department
+    
+    datasets = await db.datasets.find(query).sort("created_at", -1).limit(limit).to_list(length=limit)
+    for dataset in datasets:
+        dataset.pop("_id", None)
+    
+    return {
+        "datasets": datasets,
+        "total": await db.datasets.count_documents(query)
+    }
+
+@app.get("/api/datasets/{dataset_id}")
+async def get_dataset(
+    dataset_id: str,
+    current_user: dict = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    """Catalog entry of a stored dataset"""
+    return await get_authorized_dataset(dataset_id, current_user, db)
+
+@app.get("/api/datasets/{dataset_id}/rows")
+async def get_dataset_rows(
+    dataset_id: str,
+    columns: Optional[str] = None,
+    filters: List[str] = Query(default=[], alias="filter"),
+    sort: Optional[str] = None,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=DATASET_PAGE_DEFAULT_ROWS, ge=1, le=DATASET_PAGE_MAX_ROWS),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    """
+    One page of rows from a stored dataset
+    
+    ``columns`` is a comma-separated projection, ``filter`` (repeatable)
+    takes ``column:op:value`` with op in eq/ne/gt/gte/lt/lte/in/contains,
+    and ``sort`` lists columns with ``-`` for descending. Pass the returned
+    ``next_cursor`` as ``cursor`` for the following page.
+    """
+    dataset = await get_authorized_dataset(dataset_id, current_user, db)
+    try:
+        query = RowQuery(
+            columns=[c.strip() for c in columns.split(",") if c.strip()] if columns else None,
+            filters=parse_filters(filters),
+            sort=parse_sort(sort),
+            offset=offset,
+            limit=limit,
+            cursor=cursor
+        )
+        page = await DatasetStore(db).rows(dataset, query)
+    except DatasetQueryError as query_error:
+        raise HTTPException(status_code=400, detail=str(query_error))
+    except DatasetGoneError:
+        raise HTTPException(status_code=410, detail="Dataset file is no longer available")
+    
+    return {
+        "dataset_id": dataset_id,
+        "total_rows": dataset["rows"],
+        "offset": None if cursor else offset,
+        "limit": limit,
+        **page
+    }
+
 # ============================================================================
 # NLP QUERY ENGINE ENDPOINTS
 # ============================================================================
 
+def build_query_context(query_data: NLPQuery, current_user: dict) -> Dict[str, Any]:
+    """Context passed to the LLaMA agent for a natural language query"""
+    context = {
+        "department": query_data.department.value if query_data.department else None,
+        "user_role": current_user["role"],
+        "query_context": query_data.context or {}
+    }
+    
+    # Add department data if specified
+    if query_data.department:
+        dept_data = get_kpi_provider().get(query_data.department).data
+        context["kpis"] = dept_data["kpis"]
+        context["chart_data"] = dept_data["chart_data"]
+    
+    return context
+
+def query_response(query_data: NLPQuery, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape an agent result as a QueryResponse"""
+    return {
+        "query": query_data.query,
+        "answer": result["answer"],
+        "insights": result.get("insights", []),
+        "chart_data": result.get("chart_data"),
+        "recommendations": result.get("recommendations", [])
+    }
+
+async def log_query_activity(db, query_data: NLPQuery, current_user: dict) -> None:
+    activity = {
+        "id": str(uuid.uuid4()),
+        "action": f"LLaMA Query: {query_data.query[:50]}...",
+        "user_id": current_user["id"],
+        "user_name": current_user["name"],
+        "timestamp": datetime.utcnow(),
+        "type": "llama_query_processed",
+        "department": query_data.department.value if query_data.department else None
+    }
+    
+    await db.activities.insert_one(activity)
+
+def sse_event(event: str, data: Any) -> bytes:
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode("utf-8")
+
 @app.post("/api/query", response_model=QueryResponse)
 async def process_query(
     query_data: NLPQuery,
@@ -5424,45 +5950,73 @@ async def process_query(
         agent = get_llama_agent()
         
         # Prepare context
-        context = {
-            "department": query_data.department.value if query_data.department else None,
-            "user_role": current_user["role"],
-            "query_context": query_data.context or {}
-        }
-        
-        # Add department data if specified
-        if query_data.department:
-            dept_data = generate_mock_kpi_data(query_data.department)
-            context["kpis"] = dept_data["kpis"]
-            context["chart_data"] = dept_data["chart_data"]
+        context = build_query_context(query_data, current_user)
         
         # Process with LLaMA agent
-        result = agent.process_query(query_data.query, context)
+        result = await agent.process_query(query_data.query, context,
+                                           session_key(current_user["id"], query_data.session_id))
         
         # Log activity
-        activity = {
-            "id": str(uuid.uuid4()),
-            "action": f"LLaMA Query: {query_data.query[:50]}...",
-            "user_id": current_user["id"],
-            "user_name": current_user["name"],
-            "timestamp": datetime.utcnow(),
-            "type": "llama_query_processed",
-            "department": query_data.department.value if query_data.department else None
-        }
-        
-        await db.activities.insert_one(activity)
+        await log_query_activity(db, query_data, current_user)
         
-        return {
-            "query": query_data.query,
-            "answer": result["answer"],
-            "insights": result.get("insights", []),
-            "chart_data": result.get("chart_data"),
-            "recommendations": result.get("recommendations", [])
-        }
+        return query_response(query_data, result)
         
+    except ExecutorSaturatedError:
+        raise
+    except Exception as e:
+        logger.error(f"Query processing error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error processing query")
+
+@app.post("/api/query/stream")
+async def stream_query(
+    query_data: NLPQuery,
+    current_user: dict = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    """
+    Process natural language query, streaming the answer as Server-Sent Events
+    
+    Emits ``token`` events (``{"text": ...}``) while the answer is generated,
+    then one ``result`` event with the full QueryResponse, or an ``error``
+    event if the query fails after streaming started.
+    """
+    if query_data.department and query_data.department not in current_user["departments"]:
+        raise HTTPException(status_code=403, detail="Access denied to this department")
+    
+    try:
+        agent = get_llama_agent()
+        context = build_query_context(query_data, current_user)
     except Exception as e:
         logger.error(f"Query processing error: {str(e)}")
         raise HTTPException(status_code=500, detail="Error processing query")
+    
+    async def events():
+        try:
+            session = session_key(current_user["id"], query_data.session_id)
+            async for kind, payload in agent.stream_query(query_data.query, context, session):
+                if kind == "token":
+                    yield sse_event("token", {"text": payload})
+                else:
+                    await log_query_activity(db, query_data, current_user)
+                    yield sse_event("result", query_response(query_data, payload))
+        except Exception as e:
+            logger.error(f"Query streaming error: {str(e)}")
+            yield sse_event("error", {"detail": "Error processing query"})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.delete("/api/query/sessions/{session_id}")
+async def clear_query_session(
+    session_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Forget the conversation history of one of the current user's query sessions"""
+    await run_blocking_io(get_conversation_memory().clear, session_key(current_user["id"], session_id))
+    return {"message": "Conversation cleared", "session_id": session_id}
 
 # ============================================================================
 # AI ANALYSIS ENDPOINTS
@@ -5486,10 +6040,10 @@ async def llama_comprehensive_analysis(
         analysis_agent = get_analysis_agent()
         
         # Get department data
-        dept_data = generate_mock_kpi_data(department)
+        dept_data = get_kpi_provider().get(department).data
         
-        # Perform comprehensive analysis
-        result = analysis_agent.analyze_department_performance(
+        # Perform comprehensive analysis (concurrent identical requests share one)
+        result = await analysis_agent.analyze_department_performance_shared(
             department=department,
             kpis=dept_data["kpis"],
             chart_data=dept_data["chart_data"]
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Report file migration
+Converts legacy base64 ``pdf_content`` documents in report_files to the blob store
+
+Safe to re-run: converted documents no longer carry ``pdf_content`` and are skipped.
+
+Usage:
+    python migrate_report_files.py --dry-run
+    python migrate_report_files.py --backend mongo --batch-size 50
+"""
+
+import argparse
+import asyncio
+import base64
+import binascii
+import logging
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def migrate(backend: str, batch_size: int, dry_run: bool) -> dict:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.storage.report_store import ReportStore
+
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URI"))
+    db = client[os.getenv("MONGODB_DB_NAME", "report_generator")]
+    store = ReportStore(db, backend=backend)
+    summary = {"migrated": 0, "failed": 0, "bytes_before": 0, "bytes_after": 0}
+
+    try:
+        cursor = db.report_files.find(
+            {"pdf_content": {"$exists": True}},
+            {"report_id": 1, "pdf_content": 1}
+        ).batch_size(batch_size)
+
+        async for doc in cursor:
+            report_id = doc["report_id"]
+            try:
+                pdf_bytes = base64.b64decode(doc["pdf_content"], validate=True)
+            except (binascii.Error, TypeError) as decode_error:
+                logger.error(f"❌ {report_id}: cannot decode legacy PDF ({decode_error})")
+                summary["failed"] += 1
+                continue
+
+            summary["bytes_before"] += len(doc["pdf_content"])
+            summary["bytes_after"] += len(pdf_bytes)
+            if not dry_run:
+                await store.save(report_id, pdf_bytes)
+            summary["migrated"] += 1
+    finally:
+        client.close()
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate base64 report PDFs to the blob store")
+    parser.add_argument("--backend", default=os.getenv("REPORT_STORE_BACKEND", "mongo"),
+                        choices=["mongo", "local"], help="Target blob store backend")
+    parser.add_argument("--batch-size", type=int, default=50,
+                        help="Documents fetched per cursor batch")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Decode and count legacy documents without writing")
+    args = parser.parse_args()
+
+    summary = asyncio.run(migrate(args.backend, args.batch_size, args.dry_run))
+    saved_mb = (summary["bytes_before"] - summary["bytes_after"]) / 1024 / 1024
+    logger.info(
+        f"✅ {'Would migrate' if args.dry_run else 'Migrated'} {summary['migrated']} report files "
+        f"({summary['failed']} failed), {saved_mb:.1f} MB saved"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Test Analysis Agent
+Checks the concurrent LLM fan-out, its deadline and the blocking wrapper
+"""
+
+import asyncio
+import os
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "fake-key")
+
+from ai_models.analysis_agent import AnalysisAgent
+from benchmarks.fake_groq import fake_llama
+
+KPIS = [{"label": "Total Deals", "value": "156", "change": "+22%", "positive": True}]
+CHART_DATA = [{"month": "Jan", "deals": 20}, {"month": "Feb", "deals": 25}, {"month": "Mar", "deals": 28}]
+LATENCY = 0.3
+
+
+def test_department_calls_run_concurrently_within_the_deadline():
+    agent = AnalysisAgent()
+
+    async def run():
+        try:
+            start = time.perf_counter()
+            full = await agent.analyze_department_performance_async("sales", KPIS, CHART_DATA)
+            elapsed = time.perf_counter() - start
+            partial = await agent.analyze_department_performance_async(
+                "sales", KPIS, CHART_DATA, deadline=LATENCY / 3
+            )
+            return full, elapsed, partial
+        finally:
+            await agent.agent.client.aclose()
+
+    with fake_llama(agent.agent, latency=LATENCY) as server:
+        full, elapsed, partial = asyncio.run(run())
+
+    # Four calls of LATENCY each finish in about one when issued together
+    assert server.request_count >= 4
+    assert elapsed < 2.5 * LATENCY
+    assert "partial" not in full and full["summary"].startswith("Performance is on track")
+
+    assert partial["partial"] is True
+    assert sorted(partial["timed_out"]) == ["anomalies", "recommendations", "summary", "trends"]
+    fallback = agent._fallback_analysis("sales", KPIS, CHART_DATA)
+    assert partial["summary"] == fallback["summary"]
+
+
+def test_blocking_wrapper_refuses_a_running_loop():
+    agent = AnalysisAgent()
+
+    async def call_from_loop():
+        agent.analyze_department_performance("sales", KPIS, CHART_DATA)
+
+    try:
+        asyncio.run(call_from_loop())
+    except RuntimeError as e:
+        assert "analyze_department_performance_async" in str(e)
+    else:
+        raise AssertionError("blocking analysis ran inside an event loop")
+
+    with fake_llama(agent.agent):
+        result = agent.analyze_department_performance("sales", KPIS, CHART_DATA)
+    assert "partial" not in result and result["kpis"] == KPIS
+
+
+if __name__ == "__main__":
+    test_department_calls_run_concurrently_within_the_deadline()
+    test_blocking_wrapper_refuses_a_running_loop()
+    print("✅ Analysis agent tests passed")
@@ -0,0 +1,86 @@
+"""
+Test Anomaly Engine
+Checks the vectorized MAD/IQR pass and the multivariate IsolationForest finding
+"""
+
+import asyncio
+import threading
+
+import numpy as np
+import pandas as pd
+
+from app.ai_agents.anomaly_engine import AnomalyEngine
+from app.ai_agents.csv_analysis_agent import CSVAnalysisAgent
+
+
+def _frame(rows=2000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "sales": rng.uniform(80, 120, rows),
+        "units": rng.uniform(40, 60, rows),
+        "holiday": (rng.random(rows) < 0.05).astype(int),
+        "store": ["a", "b"] * (rows // 2),
+    })
+    df.loc[[10, 20, 30], "sales"] = [400, -200, 350]
+    df.loc[[40, 41], "sales"] = np.nan
+    return df
+
+
+def test_univariate_methods_flag_injected_outliers_per_column():
+    df = _frame()
+    for method in ("mad", "iqr"):
+        findings = {f["column"]: f for f in AnomalyEngine(method=method, multivariate=False).detect(df)}
+
+        assert "holiday" not in findings and "store" not in findings  # indicator / text columns
+        sales = findings["sales"]
+        assert {10, 20, 30} <= set(np.flatnonzero((df["sales"] < sales["lower_bound"]) |
+                                                  (df["sales"] > sales["upper_bound"])))
+        assert sales["sample_rows"][:3] == [10, 20, 30]
+        assert sales["anomaly_percentage"] == sales["anomaly_count"] / 1998 * 100
+
+        assert sales["anomaly_count"] == 3 and "units" not in findings
+
+    assert AnomalyEngine(multivariate=False).detect(df.head(10)) == []
+
+
+def test_forest_flags_rows_unusual_only_in_combination():
+    rng = np.random.default_rng(1)
+    columns = [f"m{i}" for i in range(8)]
+    df = pd.DataFrame(rng.uniform(-1, 1, (5000, 8)), columns=columns)
+    # Each value is ordinary on its own; being near the edge in every column is not
+    df.loc[7, columns] = 0.97
+
+    engine = AnomalyEngine(method="mad", multivariate=True, forest_contamination=0.001,
+                           forest_fit_rows=2000, forest_n_jobs=1)
+    findings = engine.detect(df)
+    assert len(findings) == 1  # nothing stands out per column
+
+    forest = findings[0]
+    assert forest["column"] == "multivariate" and forest["columns"] == columns
+    assert forest["sample_rows"][0] == 7
+
+
+def test_agent_runs_detection_off_the_event_loop():
+    agent = CSVAnalysisAgent()
+    threads = []
+    detect = agent.anomaly_engine.detect
+
+    def recording_detect(df):
+        threads.append(threading.current_thread())
+        return detect(df)
+
+    agent.anomaly_engine.detect = recording_detect
+
+    async def run():
+        return threading.current_thread(), await agent._detect_anomalies(_frame())
+
+    loop_thread, findings = asyncio.run(run())
+    assert threads and threads[0] is not loop_thread
+    assert {finding["column"] for finding in findings} >= {"sales"}
+
+
+if __name__ == "__main__":
+    test_univariate_methods_flag_injected_outliers_per_column()
+    test_forest_flags_rows_unusual_only_in_combination()
+    test_agent_runs_detection_off_the_event_loop()
+    print("✅ Anomaly engine tests passed")
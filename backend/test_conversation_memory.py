@@ -0,0 +1,118 @@
+"""
+Test Conversation Memory
+Checks the turn window, running summary, LRU/TTL bounds, persistence and follow-up prompts
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+
+from ai_models.conversation_memory import (
+    ConversationMemory, MongoConversationStore, session_key
+)
+from ai_models.groq_client import GroqClient
+from ai_models.llm_cache import LLMCache
+from benchmarks.fake_groq import FakeGroqServer, default_responder
+
+
+class DictCollection:
+    """Just enough of a synchronous pymongo collection for the store"""
+
+    def __init__(self):
+        self.docs = {}
+
+    def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+    def update_one(self, query, update, upsert=False):
+        self.docs.setdefault(query["_id"], {"_id": query["_id"]}).update(update["$set"])
+
+    def delete_one(self, query):
+        self.docs.pop(query["_id"], None)
+
+
+def test_window_and_summary_stay_bounded():
+    memory = ConversationMemory(window_turns=2, summary_tokens=60, max_sessions=10, ttl_seconds=60)
+    for i in range(10):
+        memory.append("u1:s", f"Question {i}?", f"Answer {i}. More detail that is not kept.")
+
+    history = memory.history("u1:s")
+    assert [m["role"] for m in history] == ["system", "user", "assistant", "user", "assistant"]
+    assert history[1]["content"] == "Question 8?" and history[4]["content"].startswith("Answer 9.")
+
+    summary = history[0]["content"]
+    assert "- Q: Question 7? A: Answer 7." in summary
+    assert "Question 0?" not in summary  # oldest summary lines dropped to fit the token cap
+    assert "More detail" not in summary
+
+    assert memory.history("u2:s") == [] and memory.history(None) == []
+
+
+def test_sessions_are_evicted_by_lru_and_ttl():
+    memory = ConversationMemory(window_turns=2, max_sessions=2, ttl_seconds=0.05)
+    memory.append("a", "q", "a")
+    memory.append("b", "q", "a")
+    memory.history("a")
+    memory.append("c", "q", "a")  # "b" was least recently used
+
+    assert memory.history("b") == []
+    assert memory.stats()["evictions"] == 1
+
+    time.sleep(0.06)
+    assert memory.history("a") == []
+    assert memory.stats()["expirations"] == 1
+
+
+def test_mongo_store_restores_sessions():
+    collection = DictCollection()
+    ConversationMemory(store=MongoConversationStore(collection)).append("u1:s", "How are sales?", "Up 12%.")
+
+    restarted = ConversationMemory(store=MongoConversationStore(collection))
+    assert [m["content"] for m in restarted.history("u1:s")] == ["How are sales?", "Up 12%."]
+    assert isinstance(collection.docs["u1:s"]["updated_at"], datetime)
+
+    restarted.clear("u1:s")
+    assert collection.docs == {}
+
+
+def test_follow_up_queries_send_only_their_session_history():
+    payloads = []
+
+    def responder(payload):
+        payloads.append(payload)
+        return default_responder(payload)
+
+    with FakeGroqServer(responder=responder) as server:
+        os.environ.setdefault("GROQ_API_KEY", "fake-key")
+        from ai_models.llama_agent import LlamaAgent
+
+        agent = LlamaAgent()
+        agent.client = GroqClient(base_url=server.base_url, requests_per_minute=0)
+        agent.cache = LLMCache(store=None, enabled=False)
+        agent.conversations = ConversationMemory(window_turns=2)
+
+        async def ask():
+            await agent.process_query("How are sales?", {}, session_key("u1", "s1"))
+            await agent.process_query("Why?", {}, session_key("u1", "s1"))
+            await agent.process_query("How are sales?", {}, session_key("u2", "s1"))
+            # Without a session id queries are one-offs: no history, nothing stored
+            await agent.process_query("Why?", {}, session_key("u1", None))
+
+        asyncio.run(ask())
+
+    follow_up = payloads[1]["messages"]
+    assert [m["role"] for m in follow_up] == ["system", "user", "assistant", "user"]
+    assert follow_up[1]["content"] == "How are sales?"
+    assert follow_up[2]["content"].startswith("Performance is on track.")
+    assert len(payloads[2]["messages"]) == 2  # another user's session starts empty
+    assert len(payloads[3]["messages"]) == 2
+    assert session_key("u1", None) is None and agent.conversations.history(None) == []
+
+
+if __name__ == "__main__":
+    test_window_and_summary_stay_bounded()
+    test_sessions_are_evicted_by_lru_and_ttl()
+    test_mongo_store_restores_sessions()
+    test_follow_up_queries_send_only_their_session_history()
+    print("✅ Conversation memory tests passed")
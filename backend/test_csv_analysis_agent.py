@@ -0,0 +1,123 @@
+"""
+Test CSV Analysis Agent
+Verifies the shared analysis context computes each primitive once per upload
+"""
+
+import asyncio
+import os
+from unittest import mock
+
+from app.ai_agents.analysis_context import AnalysisContext
+from app.ai_agents.csv_analysis_agent import CSVAnalysisAgent
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Walmart_Sales.csv")
+
+PRIMITIVES = [
+    "_compute_column_stats",
+    "_compute_missing_counts",
+    "_compute_correlations",
+    "_compute_trends",
+]
+
+STAGES = [
+    "_perform_statistical_analysis",
+    "_detect_patterns",
+    "_generate_ai_insights",
+    "_generate_recommendations",
+]
+
+
+def _load_sample() -> bytes:
+    with open(SAMPLE_CSV, "rb") as f:
+        return f.read()
+
+
+def test_primitives_run_once_per_upload():
+    """Every statistical primitive and stage runs exactly once"""
+    agent = CSVAnalysisAgent()
+    patches = [
+        mock.patch.object(AnalysisContext, name, autospec=True,
+                          side_effect=getattr(AnalysisContext, name))
+        for name in PRIMITIVES
+    ] + [
+        mock.patch.object(CSVAnalysisAgent, name, autospec=True,
+                          side_effect=getattr(CSVAnalysisAgent, name))
+        for name in STAGES
+    ]
+
+    mocks = {}
+    try:
+        for name, patcher in zip(PRIMITIVES + STAGES, patches):
+            mocks[name] = patcher.start()
+
+        result = asyncio.run(agent.analyze_csv_file(
+            _load_sample(), "Walmart_Sales.csv", {"department": "sales"}
+        ))
+    finally:
+        for patcher in patches:
+            patcher.stop()
+
+    for name, counter in mocks.items():
+        assert counter.call_count == 1, f"{name} ran {counter.call_count} times"
+
+    assert result["metadata"]["total_rows"] == 6435
+    assert "Weekly_Sales" in result["statistical_analysis"]
+
+
+def test_context_matches_per_column_statistics():
+    """Vectorized statistics agree with per-column pandas calls"""
+    import pandas as pd
+
+    df = pd.read_csv(SAMPLE_CSV)
+    context = AnalysisContext.from_frame(df)
+    data = df["Weekly_Sales"].dropna()
+    col_stats = context.column_stats["Weekly_Sales"]
+
+    assert col_stats["count"] == len(data)
+    assert abs(col_stats["mean"] - data.mean()) < 1e-6
+    assert abs(col_stats["skewness"] - data.skew()) < 1e-9
+    assert abs(col_stats["q3"] - data.quantile(0.75)) < 1e-6
+
+
+def test_batched_trends_and_correlations_match_per_column_loops():
+    """Matrix trends match linregress per column; upper-triangle pairs match the nested loop"""
+    import numpy as np
+    import pandas as pd
+    from scipy import stats
+
+    rng = np.random.default_rng(3)
+    rows = 500
+    df = pd.DataFrame({f"c{i}": np.arange(rows) * rng.normal(0, 1) + rng.normal(1e6, 200, rows)
+                       for i in range(12)})
+    df["c13"] = df["c0"] * -2 + rng.normal(0, 1, rows)
+    df["constant"] = 5.0
+    df.loc[rng.random(rows) < 0.3, ["c1", "c2"]] = np.nan
+    df.loc[8:, "sparse"] = np.nan
+    df.loc[:7, "sparse"] = np.arange(8)
+    context = AnalysisContext.from_frame(df)
+
+    expected = []
+    for column in context.numeric_columns:
+        data = df[column].dropna().values
+        if len(data) > 10:
+            result = stats.linregress(np.arange(len(data)), data)
+            if abs(result.rvalue) > 0.5:
+                expected.append((column, result.slope, abs(result.rvalue)))
+    assert expected and [t["column"] for t in context.trends] == [column for column, _, _ in expected]
+    for trend, (_, slope, strength) in zip(context.trends, expected):
+        assert trend["trend"] == ("increasing" if slope > 0 else "decreasing")
+        assert abs(trend["slope"] - slope) <= 1e-9 * abs(slope)
+        assert abs(trend["strength"] - strength) <= 1e-9
+
+    matrix = context.correlation_matrix
+    expected = [(a, b, matrix.loc[a, b]) for i, a in enumerate(matrix.columns)
+                for j, b in enumerate(matrix.columns) if i < j and abs(matrix.loc[a, b]) > 0.7]
+    assert expected
+    assert [(c["column1"], c["column2"], c["correlation"]) for c in context.strong_correlations()] == expected
+
+
+if __name__ == "__main__":
+    test_primitives_run_once_per_upload()
+    test_context_matches_per_column_statistics()
+    test_batched_trends_and_correlations_match_per_column_loops()
+    print("✅ CSV analysis agent tests passed")
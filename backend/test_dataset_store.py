@@ -0,0 +1,141 @@
+"""
+Test Dataset Store
+Round-trips uploads through Parquet and Arrow IPC files and the datasets catalog
+"""
+
+import asyncio
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# The harness points DATASET_STORE_DIR at a scratch directory; import it first
+from benchmarks.harness import load_app, make_client
+from benchmarks.fake_mongo import FakeDatabase
+from benchmarks.fake_groq import fake_llama
+from app.storage.dataset_rows import RowQuery
+from app.storage.dataset_store import DatasetGoneError, DatasetStore
+
+
+def _frame(rows=1000):
+    rng = np.random.default_rng(3)
+    return pd.DataFrame({
+        "Store": rng.integers(1, 46, rows),
+        "Date": ["05-02-2010", "12-02-2010"] * (rows // 2),
+        "Weekly_Sales": rng.uniform(2e5, 3e6, rows),
+        "Note": ["a", 1] * (rows // 2),  # mixed types are kept as strings
+    })
+
+
+def test_formats_round_trip_with_projection_and_stats():
+    df = _frame()
+
+    async def run(file_format, compression):
+        with tempfile.TemporaryDirectory() as root:
+            store = DatasetStore(FakeDatabase(), root=root, file_format=file_format,
+                                 compression=compression)
+            saved = await store.save("ds-1", df, department="sales", filename="weekly.csv")
+            dataset = await store.describe("ds-1")
+            assert dataset == saved and "_id" not in dataset
+
+            projected = await store.read_table(dataset, ["Weekly_Sales", "Store"])
+            everything = await store.load(dataset)
+            try:
+                await store.read_table(dataset, ["Missing"])
+                raise AssertionError("unknown column accepted")
+            except KeyError:
+                pass
+            return dataset, projected, everything
+
+    for file_format, compression in (("parquet", "zstd"), ("arrow", "lz4"), ("arrow", "none")):
+        dataset, projected, everything = asyncio.run(run(file_format, compression))
+
+        assert dataset["rows"] == len(df) and dataset["format"] == file_format
+        assert projected.column_names == ["Weekly_Sales", "Store"]
+        np.testing.assert_array_equal(projected.column("Store").to_numpy(), df["Store"].to_numpy())
+        pd.testing.assert_frame_equal(everything.drop(columns="Note"), df.drop(columns="Note"))
+        assert everything["Note"].tolist()[:2] == ["a", "1"]
+
+        stats = {column["name"]: column for column in dataset["columns"]}
+        assert stats["Store"]["min"] == df["Store"].min() and stats["Store"]["max"] == df["Store"].max()
+        assert abs(stats["Weekly_Sales"]["mean"] - df["Weekly_Sales"].mean()) < 1e-6
+        assert stats["Date"]["distinct"] == 2 and stats["Date"]["null_count"] == 0
+
+
+def test_other_hosts_fetch_datasets_from_gridfs():
+    df = _frame()
+
+    async def run():
+        db = FakeDatabase()
+        with tempfile.TemporaryDirectory() as web, tempfile.TemporaryDirectory() as worker:
+            await DatasetStore(db, root=worker).save("ds-1", df, department="sales")
+            # The API host has an empty disk: the file comes from GridFS and stays cached
+            store = DatasetStore(db, root=web)
+            dataset = await store.describe("ds-1")
+            page = await store.rows(dataset, RowQuery(columns=["Store"], limit=3))
+            assert os.path.exists(store.path(dataset))
+            assert [row["Store"] for row in page["rows"]] == df["Store"].tolist()[:3]
+
+            assert await store.delete("ds-1") and not await store.delete("ds-1")
+            assert not os.path.exists(store.path(dataset)) and db._buckets["datasets"] == {}
+            try:
+                # Gone from this host's disk and from GridFS
+                await store.read_table(dataset)
+                raise AssertionError("deleted dataset still readable")
+            except DatasetGoneError:
+                pass
+
+    asyncio.run(run())
+
+
+def test_upload_stores_dataset_and_exposes_catalog():
+    main, db = load_app()
+    llama = main.get_llama_agent()
+    csv = _frame(200).to_csv(index=False).encode()
+
+    async def run():
+        async with make_client(main.app) as client:
+            response = await client.post(
+                "/api/reports/upload-csv",
+                files={"file": ("weekly.csv", csv, "text/csv")},
+                data={"department": "sales"},
+            )
+            dataset_id = response.json()["dataset_id"]
+            dataset = await client.get(f"/api/datasets/{dataset_id}")
+            listing = await client.get("/api/datasets", params={"department": "sales"})
+            missing = await client.get("/api/datasets/unknown")
+
+            # A file lost from both disk and GridFS is reported as gone
+            store = DatasetStore(db)
+            catalog = await store.describe(dataset_id)
+            os.remove(store.path(catalog))
+            files = dict(db._buckets["datasets"])
+            db._buckets["datasets"].clear()
+            gone = await client.get(f"/api/datasets/{dataset_id}/rows")
+            db._buckets["datasets"].update(files)
+            linked = [db.reports.docs[0]["dataset_id"], db.data_uploads.docs[0]["dataset_id"]]
+
+            # Deleting the report deletes its dataset
+            deleted = await client.delete(f"/api/reports/{response.json()['report_id']}")
+            after_delete = await client.get(f"/api/datasets/{dataset_id}")
+        await llama.client.aclose()
+        return response, dataset, listing, missing, linked, gone, deleted, after_delete
+
+    with fake_llama(llama):
+        response, dataset, listing, missing, linked, gone, deleted, after_delete = asyncio.run(run())
+    assert response.status_code == 200
+    assert dataset.status_code == 200 and dataset.json()["rows"] == 200
+    assert dataset.json()["report_id"] == response.json()["report_id"]
+    assert listing.json()["total"] == 1 and missing.status_code == 404
+    assert linked == [dataset.json()["id"]] * 2
+    assert gone.status_code == 410
+    assert deleted.status_code == 200 and after_delete.status_code == 404
+    assert db.datasets.docs == [] and db._buckets["datasets"] == {}
+
+
+if __name__ == "__main__":
+    test_formats_round_trip_with_projection_and_stats()
+    test_other_hosts_fetch_datasets_from_gridfs()
+    test_upload_stores_dataset_and_exposes_catalog()
+    print("✅ Dataset store tests passed")
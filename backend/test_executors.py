@@ -0,0 +1,85 @@
+"""
+Test Executors
+Checks that offloaded work leaves the event loop and that saturated pools shed load with 503
+"""
+
+import asyncio
+import threading
+from unittest import mock
+
+# The harness points DATASET_STORE_DIR at a scratch directory; import it first
+from benchmarks.harness import load_app, make_client
+from benchmarks.fake_groq import fake_llama
+from app.core import executors
+from app.core.executors import (
+    ExecutorSaturatedError, ManagedExecutor, run_blocking_io, run_cpu_bound
+)
+
+
+def test_offloaded_work_runs_off_the_event_loop_thread():
+    async def run():
+        loop_thread = threading.current_thread()
+        cpu = await run_cpu_bound(threading.current_thread)
+        io = await run_blocking_io(threading.current_thread)
+        return loop_thread, cpu, io
+
+    loop_thread, cpu, io = asyncio.run(run())
+    assert cpu is not loop_thread and io is not loop_thread
+    assert cpu.name.startswith("cpu") and io.name.startswith("io")
+
+
+def test_full_queue_rejects_new_work():
+    executor = ManagedExecutor("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def run():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)  # the only worker is now busy
+        waiting = asyncio.ensure_future(executor.run(lambda: "queued"))
+        await asyncio.sleep(0)
+        try:
+            await executor.run(lambda: "rejected")
+            raise AssertionError("saturated executor accepted work")
+        except ExecutorSaturatedError:
+            pass
+        release.set()
+        return await running, await waiting
+
+    try:
+        assert asyncio.run(run()) == (True, "queued")
+        stats = executor.stats()
+        assert stats["rejected"] == 1 and stats["completed"] == 2 and stats["queued"] == 0
+    finally:
+        executor.shutdown()
+
+
+def test_saturated_executor_returns_503():
+    main, _ = load_app()
+    llama = main.get_llama_agent()
+    saturated = ManagedExecutor("cpu", max_workers=1, max_queue=0)
+
+    async def run():
+        async with make_client(main.app) as client:
+            response = await client.post(
+                "/api/reports/upload-csv",
+                files={"file": ("weekly.csv", b"Store,Weekly_Sales\n1,100.5\n", "text/csv")},
+                data={"department": "sales"},
+            )
+        await llama.client.aclose()
+        return response
+
+    try:
+        with fake_llama(llama), mock.patch.object(executors, "_cpu_executor", saturated):
+            response = asyncio.run(run())
+    finally:
+        saturated.shutdown()
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+    assert saturated.stats()["rejected"] >= 1
+
+
+if __name__ == "__main__":
+    test_offloaded_work_runs_off_the_event_loop_thread()
+    test_full_queue_rejects_new_work()
+    test_saturated_executor_returns_503()
+    print("✅ Executor tests passed")
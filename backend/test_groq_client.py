@@ -0,0 +1,123 @@
+"""
+Test Groq Client
+Checks retries against injected 429s, Retry-After handling, the token bucket and connection reuse
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from ai_models.groq_client import GroqClient, GroqRateLimitError, TokenBucket, parse_retry_after
+from benchmarks.fake_groq import FakeGroqServer, default_responder
+
+MESSAGES = [{"role": "user", "content": "How are sales?"}]
+
+
+def _client(server, **options):
+    options.setdefault("requests_per_minute", 0)
+    options.setdefault("retry_base", 0.01)
+    return GroqClient(api_key="fake-key", base_url=server.base_url, **options)
+
+
+def _chat(client):
+    return client.chat(MESSAGES, model="fake-llama", temperature=0.0, max_tokens=50)
+
+
+def test_retries_429s_waiting_for_retry_after():
+    with FakeGroqServer(inject_429s=2, retry_after=0.2) as server:
+        client = _client(server)
+        start = time.perf_counter()
+        text = asyncio.run(_chat(client))
+        elapsed = time.perf_counter() - start
+
+    assert text == default_responder({"messages": MESSAGES})
+    assert server.request_count == 3
+    assert elapsed >= 0.4
+    stats = client.stats()
+    assert stats["retries"] == 2 and stats["rate_limited"] == 2 and stats["failures"] == 0
+
+
+def test_gives_up_after_max_retries_or_long_retry_after():
+    with FakeGroqServer(inject_429s=10) as server:
+        client = _client(server, max_retries=2)
+        try:
+            asyncio.run(_chat(client))
+            assert False, "expected GroqRateLimitError"
+        except GroqRateLimitError as e:
+            assert e.status_code == 429
+    assert server.request_count == 3
+
+    with FakeGroqServer(inject_429s=1, retry_after=60) as server:
+        client = _client(server, retry_max=1)
+        try:
+            asyncio.run(_chat(client))
+            assert False, "expected GroqRateLimitError"
+        except GroqRateLimitError:
+            pass
+    assert server.request_count == 1  # waiting 60s would exceed retry_max
+
+
+def test_stream_retries_before_the_first_token():
+    async def collect(client):
+        return [delta async for delta in client.stream_chat(MESSAGES, model="fake-llama",
+                                                            temperature=0.0, max_tokens=50)]
+
+    with FakeGroqServer(inject_429s=1, retry_after=0) as server:
+        deltas = asyncio.run(collect(_client(server)))
+
+    assert len(deltas) > 1
+    assert "".join(deltas) == default_responder({"messages": MESSAGES})
+
+
+def test_token_bucket_spaces_requests_to_the_quota():
+    bucket = TokenBucket(rate_per_minute=600, capacity=2)  # 10/s
+    assert bucket.reserve() == 0 and bucket.reserve() == 0
+    assert 0.09 <= bucket.reserve() <= 0.1
+    assert 0.19 <= bucket.reserve() <= 0.2
+
+    bucket.pause(0.5)
+    assert bucket.reserve() >= 0.45
+    assert TokenBucket(rate_per_minute=0).reserve(100) == 0
+
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+def test_request_limiter_is_on_by_default():
+    # Fresh interpreter: test helpers and benchmarks set GROQ_REQUESTS_PER_MINUTE=0
+    env = {k: v for k, v in os.environ.items() if not k.startswith("GROQ_")}
+    output = subprocess.check_output(
+        [sys.executable, "-c",
+         "from ai_models.groq_client import GroqClient; "
+         "bucket = GroqClient(api_key='key').request_bucket; "
+         "print(bucket.enabled, bucket.rate * 60)"],
+        env=env, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    assert output.decode().split() == ["True", "30.0"]
+
+
+def test_requests_reuse_pooled_connections():
+    async def run(client):
+        for _ in range(10):
+            await _chat(client)
+        await asyncio.gather(*(_chat(client) for _ in range(5)))
+        await client.aclose()
+
+    with FakeGroqServer(latency=0.05) as server:
+        asyncio.run(run(_client(server)))
+
+    assert server.request_count == 15
+    assert server.connection_count <= 5
+
+
+if __name__ == "__main__":
+    test_retries_429s_waiting_for_retry_after()
+    test_gives_up_after_max_retries_or_long_retry_after()
+    test_stream_retries_before_the_first_token()
+    test_token_bucket_spaces_requests_to_the_quota()
+    test_request_limiter_is_on_by_default()
+    test_requests_reuse_pooled_connections()
+    print("✅ Groq client tests passed")
@@ -0,0 +1,59 @@
+"""
+Test HTTP cache helpers
+Covers ETag matching, If-Modified-Since and Range parsing for PDF downloads
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.core.http_cache import (
+    strong_etag, http_date, etag_matches, not_modified_since, parse_range, RangeNotSatisfiableError
+)
+
+
+def test_etag_matching():
+    etag = strong_etag("abc123")
+
+    assert etag == '"abc123"'
+    assert etag_matches('"abc123"', etag)
+    assert etag_matches('"other", W/"abc123"', etag)
+    assert not etag_matches('W/"abc123"', etag, weak=False)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"abc123"', None)
+
+
+def test_not_modified_since():
+    created = datetime(2024, 3, 1, 12, 30, 15, 500000)
+    header = http_date(created)
+
+    assert header == "Fri, 01 Mar 2024 12:30:15 GMT"
+    assert not_modified_since(header, created)
+    assert not not_modified_since("Fri, 01 Mar 2024 12:30:14 GMT", created)
+    assert not not_modified_since("not a date", created)
+
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=-500", 100) == (0, 99)
+    assert parse_range("bytes=50-5000", 100) == (50, 99)
+    # Ignored rather than rejected: multi-range, inverted and foreign units
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("bytes=9-0", 100) is None
+    assert parse_range("items=0-1", 100) is None
+
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_range("bytes=100-", 100)
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_range("bytes=-0", 100)
+
+
+if __name__ == "__main__":
+    test_etag_matching()
+    test_not_modified_since()
+    test_parse_range()
+    print("✅ HTTP cache helper tests passed")
@@ -2,17 +2,21 @@
 Test LLaMA Agent
 """
 
+import asyncio
 import os
 from dotenv import load_dotenv
-from ai_models.llama_agent import get_llama_agent
 
 load_dotenv()
+os.environ.setdefault("GROQ_API_KEY", "fake-key")
+
+from ai_models.llama_agent import LlamaAgent
+from benchmarks.fake_groq import fake_llama
 
 def test_query():
     """Test basic query"""
     print("🧪 Testing LLaMA Agent...")
     
-    agent = get_llama_agent()
+    agent = LlamaAgent()
     
     # Test query
     context = {
@@ -23,15 +27,24 @@ def test_query():
         ]
     }
     
-    result = agent.process_query(
-        "What was the Q2 sales performance?",
-        context
-    )
+    async def ask():
+        try:
+            return await agent.process_query(
+                "What was the Q2 sales performance?",
+                context
+            )
+        finally:
+            await agent.client.aclose()
+    
+    # process_query is a coroutine; run it against the fake Groq server
+    with fake_llama(agent):
+        result = asyncio.run(ask())
     
     print("\n✅ Query Result:")
     print(f"Answer: {result['answer']}")
     print(f"\nInsights: {result['insights']}")
     print(f"\nRecommendations: {result['recommendations']}")
+    assert result["answer"] and result["insights"] and result["recommendations"]
 
 if __name__ == "__main__":
-    test_query()
\ No newline at end of file
+    test_query()
@@ -0,0 +1,68 @@
+"""
+Test LLM Cache
+Checks content addressing, LRU/TTL behaviour, per-method opt-out and the disk tier
+"""
+
+import tempfile
+import time
+
+from ai_models.llm_cache import LLMCache, DiskLLMStore, cache_key
+
+MESSAGES = [{"role": "user", "content": "Summarize sales"}]
+
+
+def test_key_covers_model_sampling_and_messages():
+    key = cache_key("llama", 0.5, 300, MESSAGES)
+
+    assert key == cache_key("llama", 0.5, 300, [dict(m) for m in MESSAGES])
+    assert key != cache_key("llama", 0.7, 300, MESSAGES)
+    assert key != cache_key("llama", 0.5, 500, MESSAGES)
+    assert key != cache_key("mixtral", 0.5, 300, MESSAGES)
+    assert key != cache_key("llama", 0.5, 300, [{"role": "user", "content": "Summarize hr"}])
+
+
+def test_lru_ttl_and_method_opt_out():
+    cache = LLMCache(max_entries=2, method_ttls={"process_query": 0, "analyze_trends": 0.05},
+                     default_ttl=60, store=None, enabled=True)
+
+    cache.set("generate_report_summary", "a", "A")
+    cache.set("generate_report_summary", "b", "B")
+    assert cache.get("generate_report_summary", "a") == "A"
+    cache.set("generate_report_summary", "c", "C")  # evicts "b", the least recently used
+    assert cache.get("generate_report_summary", "b") is None
+    assert cache.get("generate_report_summary", "c") == "C"
+
+    cache.set("process_query", "q", "answer")
+    assert cache.get("process_query", "q") is None
+
+    cache.set("analyze_trends", "t", "{}")
+    assert cache.get("analyze_trends", "t") == "{}"
+    time.sleep(0.06)
+    assert cache.get("analyze_trends", "t") is None
+
+    stats = cache.stats()
+    assert stats["evictions"] == 2
+    assert stats["methods"]["generate_report_summary"] == {
+        "hits": 2, "persisted_hits": 0, "misses": 1, "bypassed": 0, "hit_ratio": round(2 / 3, 4)
+    }
+    assert stats["methods"]["process_query"]["bypassed"] == 1
+    assert stats["hits"] == 3 and stats["misses"] == 2
+
+
+def test_disk_tier_survives_a_new_process_cache():
+    with tempfile.TemporaryDirectory() as root:
+        LLMCache(store=DiskLLMStore(root), enabled=True).set("detect_anomalies", "k", "[]")
+
+        fresh = LLMCache(store=DiskLLMStore(root), enabled=True)
+        assert fresh.get("detect_anomalies", "k") == "[]"
+        assert fresh.get("detect_anomalies", "k") == "[]"
+
+        stats = fresh.stats()["methods"]["detect_anomalies"]
+        assert stats["persisted_hits"] == 1 and stats["hits"] == 1
+
+
+if __name__ == "__main__":
+    test_key_covers_model_sampling_and_messages()
+    test_lru_ttl_and_method_opt_out()
+    test_disk_tier_survives_a_new_process_cache()
+    print("✅ LLM cache tests passed")
@@ -0,0 +1,88 @@
+"""
+Test API Middleware
+Covers JSON errors, the token-expired rewrite and CORS headers on both
+"""
+
+from fastapi import FastAPI, HTTPException
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.middleware import ApiMiddleware
+
+ORIGIN = "http://localhost:5173"
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(ApiMiddleware)
+    app.add_middleware(CORSMiddleware, allow_origins=[ORIGIN], allow_credentials=True,
+                       allow_methods=["*"], allow_headers=["*"])
+
+    @app.get("/api/reports")
+    async def expired():
+        raise HTTPException(status_code=401, detail="Token has expired",
+                            headers={"WWW-Authenticate": "Bearer error='token_expired'"})
+
+    @app.get("/api/auth/me")
+    async def expired_auth():
+        raise HTTPException(status_code=401, detail="Token has expired",
+                            headers={"WWW-Authenticate": "Bearer error='token_expired'"})
+
+    @app.get("/api/invalid")
+    async def invalid():
+        raise HTTPException(status_code=401, detail="Invalid token",
+                            headers={"WWW-Authenticate": "Bearer error='invalid_token'"})
+
+    @app.get("/api/boom")
+    async def boom():
+        raise RuntimeError("kaboom")
+
+    @app.get("/api/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk{i};".encode()
+        return StreamingResponse(chunks())
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_unhandled_exception_becomes_json_with_cors():
+    response = _client().get("/api/boom", headers={"origin": ORIGIN})
+
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Internal server error", "error": "kaboom"}
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+
+
+def test_expired_token_is_flagged_outside_auth_routes():
+    client = _client()
+
+    response = client.get("/api/reports", headers={"origin": ORIGIN})
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Token expired", "code": "token_expired"}
+    assert response.headers["x-token-expired"] == "true"
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+
+    response = client.get("/api/auth/me")
+    assert response.json() == {"detail": "Token has expired"}
+    assert "x-token-expired" not in response.headers
+
+    response = client.get("/api/invalid")
+    assert response.json() == {"detail": "Invalid token"}
+    assert "x-token-expired" not in response.headers
+
+
+def test_streaming_responses_pass_through():
+    response = _client().get("/api/stream")
+
+    assert response.status_code == 200
+    assert response.text == "chunk0;chunk1;chunk2;"
+
+
+if __name__ == "__main__":
+    test_unhandled_exception_becomes_json_with_cors()
+    test_expired_token_is_flagged_outside_auth_routes()
+    test_streaming_responses_pass_through()
+    print("✅ Middleware tests passed")
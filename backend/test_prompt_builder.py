@@ -0,0 +1,58 @@
+"""
+Test Prompt Builder
+Checks compact rendering, token estimates and per-method budgets
+"""
+
+import json
+
+from ai_models.prompt_builder import PromptBuilder, estimate_tokens, render_context, render_table
+
+CHART = [{"month": m, "sales": 1000.0 + i * 250.5, "orders": 40 + i}
+         for i, m in enumerate(["Jan", "Feb", "Mar", "Apr", "May", "Jun"])]
+
+
+def test_records_render_as_csv_and_nested_context_as_lines():
+    text = render_context({"department": "sales", "kpis": CHART[:2], "meta": {"rows": 2}})
+
+    assert text == "\n".join([
+        "department: sales",
+        "kpis (2 rows):",
+        "  month,sales,orders",
+        "  Jan,1000,40",
+        "  Feb,1250.5,41",
+        "meta:",
+        "  rows: 2",
+    ])
+    assert estimate_tokens(text) < estimate_tokens(json.dumps({"kpis": CHART[:2]}, indent=2))
+
+
+def test_long_tables_are_sampled_with_a_summary_line():
+    rows = [{"week": i, "sales": float(i)} for i in range(100)]
+    lines = render_table(rows, max_rows=5).split("\n")
+
+    assert lines[1] == "0,0" and lines[5] == "99,99"
+    assert lines[-1] == "(5 of 100 rows shown; all rows: week min=0 mean=49.5 max=99; sales min=0 mean=49.5 max=99)"
+
+
+def test_render_fits_the_method_budget():
+    rows = [{"store": i % 45, "date": f"{i % 28 + 1:02d}-02-2010", "weekly_sales": 1643690.9 + i}
+            for i in range(5000)]
+    builder = PromptBuilder(budgets={"analyze_trends": 400, "detect_anomalies": 40}, max_rows=200, min_rows=6)
+
+    sampled = builder.render("analyze_trends", rows)
+    assert estimate_tokens(sampled) <= 400
+    assert "of 5000 rows shown" in sampled
+
+    truncated = builder.render("detect_anomalies", rows)
+    assert truncated.endswith("... (truncated)")
+    assert estimate_tokens(truncated) <= 50
+
+    tokens = builder.record("analyze_trends", [{"role": "user", "content": sampled}])
+    assert builder.stats()["methods"]["analyze_trends"]["prompt_tokens"] == tokens
+
+
+if __name__ == "__main__":
+    test_records_render_as_csv_and_nested_context_as_lines()
+    test_long_tables_are_sampled_with_a_summary_line()
+    test_render_fits_the_method_budget()
+    print("✅ Prompt builder tests passed")
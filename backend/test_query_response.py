@@ -0,0 +1,80 @@
+"""
+Test Query Response
+Checks that process_query answers with one structured completion, falls back on free text and streams
+"""
+
+import asyncio
+import json
+import os
+
+from ai_models.groq_client import GroqClient
+from ai_models.llm_cache import LLMCache
+from benchmarks.fake_groq import (
+    FakeGroqServer, QUERY_RESPONSE, RECOMMENDATIONS_RESPONSE, STREAM_QUERY_RESPONSE
+)
+
+CONTEXT = {"department": "sales", "chart_data": [{"month": "Jan", "deals": 20}]}
+
+
+def _agent(server):
+    os.environ.setdefault("GROQ_API_KEY", "fake-key")
+    from ai_models.llama_agent import LlamaAgent
+
+    agent = LlamaAgent()
+    agent.client = GroqClient(base_url=server.base_url, requests_per_minute=0)
+    agent.cache = LLMCache(store=None, enabled=False)
+    return agent
+
+
+async def _collect(events):
+    return [event async for event in events]
+
+
+def test_structured_answer_takes_one_call():
+    with FakeGroqServer() as server:
+        result = asyncio.run(_agent(server).process_query("How are sales?", CONTEXT))
+
+    expected = json.loads(QUERY_RESPONSE)
+    assert server.request_count == 1
+    assert result["answer"] == expected["answer"]
+    assert result["insights"] == expected["insights"]
+    assert result["recommendations"] == expected["recommendations"]
+    assert result["chart_data"] == CONTEXT["chart_data"]
+
+
+def test_invalid_structured_answer_falls_back_to_a_second_call():
+    def responder(payload):
+        if payload["messages"][0]["role"] == "system":
+            # Valid JSON, but missing the required recommendations
+            return json.dumps({"answer": "Sales grew 12% quarter over quarter.", "insights": []})
+        return RECOMMENDATIONS_RESPONSE
+
+    with FakeGroqServer(responder=responder) as server:
+        result = asyncio.run(_agent(server).process_query("How are sales?", CONTEXT))
+
+    assert server.request_count == 2
+    assert result["recommendations"][0] == "Expand the highest performing channels"
+    assert result["chart_data"] == CONTEXT["chart_data"]
+
+
+def test_stream_relays_the_answer_then_one_result():
+    with FakeGroqServer() as server:
+        events = asyncio.run(_collect(_agent(server).stream_query("How are sales?", CONTEXT)))
+
+    tokens = [payload for kind, payload in events if kind == "token"]
+    kind, result = events[-1]
+    answer = STREAM_QUERY_RESPONSE.split("###JSON")[0]
+
+    assert server.request_count == 1
+    assert len(tokens) > 1 and "".join(tokens) == answer
+    assert kind == "result" and [k for k, _ in events].count("result") == 1
+    assert result["answer"] == answer.strip()
+    assert result["recommendations"] == json.loads(QUERY_RESPONSE)["recommendations"]
+    assert result["chart_data"] == CONTEXT["chart_data"]
+
+
+if __name__ == "__main__":
+    test_structured_answer_takes_one_call()
+    test_invalid_structured_answer_falls_back_to_a_second_call()
+    test_stream_relays_the_answer_then_one_result()
+    print("✅ Query response tests passed")
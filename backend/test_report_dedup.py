@@ -0,0 +1,98 @@
+"""
+Test Report Deduplication
+Checks that repeat uploads reuse the stored analysis and PDF instead of calling the LLM again
+"""
+
+import asyncio
+import io
+
+from app.storage.report_dedup import upload_fingerprint
+from ai_models.groq_client import GroqClient
+from ai_models.llm_cache import LLMCache
+from benchmarks.fake_groq import FakeGroqServer
+from benchmarks.harness import load_app, make_client
+
+CSV = b"Store,Date,Weekly_Sales\n" + b"".join(
+    f"{i % 3},05-02-2010,{1000 + i * 7}\n".encode() for i in range(200)
+)
+
+
+def test_fingerprint_covers_bytes_department_and_config():
+    source = io.BytesIO(CSV)
+    fingerprint = upload_fingerprint(source, "sales", {"model": "a"}, chunk_size=100)
+    assert source.tell() == 0 and fingerprint.size == len(CSV)
+
+    assert upload_fingerprint(io.BytesIO(CSV), "sales", {"model": "a"}).key == fingerprint.key
+    assert upload_fingerprint(io.BytesIO(CSV), "hr", {"model": "a"}).key != fingerprint.key
+    assert upload_fingerprint(io.BytesIO(CSV), "sales", {"model": "b"}).key != fingerprint.key
+    assert upload_fingerprint(io.BytesIO(CSV + b"1,05-02-2010,1\n"), "sales", {"model": "a"}).key \
+        != fingerprint.key
+
+
+def test_repeat_uploads_reuse_analysis_and_share_pdf():
+    main, db = load_app()
+    llama = main.get_llama_agent()
+    saved = llama.__dict__.get("client"), llama.cache
+    before = main.get_dedup_stats().stats()
+
+    async def upload(client, filename="weekly.csv", department="sales"):
+        response = await client.post(
+            "/api/reports/upload-csv",
+            files={"file": (filename, CSV, "text/csv")},
+            data={"department": department},
+        )
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    async def run(server):
+        async with make_client(main.app) as client:
+            first = await upload(client)
+            calls = server.request_count
+            again = await upload(client)
+            renamed = await upload(client, filename="weekly_copy.csv")
+            assert server.request_count == calls  # no LLM calls for repeats
+            other = await upload(client, department="finance")
+            assert server.request_count > calls
+
+            # The shared PDF outlives the report that first stored it
+            shared = await client.get(f"/api/reports/download/{again['report_id']}")
+            assert (await client.delete(f"/api/reports/{first['report_id']}")).status_code == 200
+            after_delete = await client.get(f"/api/reports/download/{again['report_id']}")
+        await llama.client.aclose()
+        return first, again, renamed, other, shared, after_delete
+
+    with FakeGroqServer() as server:
+        llama.client = GroqClient(api_key="fake-key", base_url=server.base_url, requests_per_minute=0)
+        llama.cache = LLMCache(store=None, enabled=False)
+        try:
+            first, again, renamed, other, shared, after_delete = asyncio.run(run(server))
+        finally:
+            llama.client, llama.cache = saved
+            if saved[0] is None:
+                del llama.client
+
+    assert not first["deduplicated"] and again["deduplicated"] and renamed["deduplicated"]
+    assert not other["deduplicated"]
+    assert again["analysis"] == first["analysis"]
+    assert again["data_preview"] == first["data_preview"]
+
+    reports = {doc["id"]: doc for doc in db.reports.docs}
+    assert reports[again["report_id"]]["artifact"]["pdf"] == "shared"
+    assert reports[again["report_id"]]["artifact"]["source_report_id"] == first["report_id"]
+    assert reports[renamed["report_id"]]["artifact"]["pdf"] == "rerendered"
+    assert reports[other["report_id"]]["artifact"]["fingerprint"] != \
+        reports[again["report_id"]]["artifact"]["fingerprint"]
+
+    assert shared.status_code == 200 and after_delete.content == shared.content
+    assert shared.content.startswith(b"%PDF")
+
+    stats = main.get_dedup_stats().stats()
+    assert stats["hits"] - before["hits"] == 2
+    assert stats["misses"] - before["misses"] == 2
+    assert stats["pdfs_shared"] - before["pdfs_shared"] == 1
+
+
+if __name__ == "__main__":
+    test_fingerprint_covers_bytes_department_and_config()
+    test_repeat_uploads_reuse_analysis_and_share_pdf()
+    print("✅ Report deduplication tests passed")
@@ -0,0 +1,85 @@
+"""
+Test Report Store
+Round-trips PDFs through each blob backend and the legacy base64 reader
+"""
+
+import asyncio
+import base64
+import os
+import tempfile
+
+from app.storage.report_store import ReportStore, LocalBlobBackend, STORAGE_LEGACY_BASE64
+from benchmarks.fake_mongo import FakeDatabase
+
+PDF_BYTES = b"%PDF-1.4\n" + os.urandom(100_003) + b"\n%%EOF"
+
+
+async def _collect(iterator) -> bytes:
+    return b"".join([chunk async for chunk in iterator])
+
+
+def test_mongo_backend_round_trip():
+    async def run():
+        store = ReportStore(FakeDatabase(), backend="mongo")
+        saved = await store.save("report-1", PDF_BYTES)
+        file_doc = await store.describe("report-1")
+
+        assert saved["storage"] == "binary"
+        assert file_doc["length"] == len(PDF_BYTES)
+        assert "pdf_content" not in file_doc
+        assert await store.read(file_doc) == PDF_BYTES
+        assert await _collect(store.stream(file_doc, 10, 5000, chunk_size=1000)) == PDF_BYTES[10:5001]
+
+    asyncio.run(run())
+
+
+def test_local_backend_round_trip():
+    async def run():
+        with tempfile.TemporaryDirectory() as root:
+            store = ReportStore(FakeDatabase(), backend="local")
+            store.backend = store._backends["local"] = LocalBlobBackend(root)
+            await store.save("report-2", PDF_BYTES)
+            file_doc = await store.describe("report-2")
+
+            assert file_doc["storage"] == "file"
+            assert await store.read(file_doc) == PDF_BYTES
+            assert await _collect(store.stream(file_doc, 99_000)) == PDF_BYTES[99_000:]
+
+            await store.delete("report-2")
+            assert await store.describe("report-2") is None
+            assert not os.listdir(os.path.join(root, "re"))
+
+    asyncio.run(run())
+
+
+def test_legacy_base64_reader_and_migration():
+    async def run():
+        db = FakeDatabase()
+        await db.report_files.insert_one({
+            "report_id": "legacy",
+            "pdf_content": base64.b64encode(PDF_BYTES).decode("utf-8")
+        })
+        store = ReportStore(db, backend="mongo")
+        file_doc = await store.describe("legacy")
+
+        assert file_doc["storage"] == STORAGE_LEGACY_BASE64
+        assert file_doc["length"] == len(PDF_BYTES)
+        assert await _collect(store.stream(file_doc, chunk_size=4096)) == PDF_BYTES
+        for start, end in [(0, 0), (1, 2), (5, 4100), (4095, 4097), (len(PDF_BYTES) - 3, None)]:
+            expected = PDF_BYTES[start:None if end is None else end + 1]
+            assert await _collect(store.stream(file_doc, start, end, chunk_size=4096)) == expected
+
+        await store.save("legacy", await store.read(file_doc))
+        migrated = await store.describe("legacy")
+        assert "pdf_content" not in migrated
+        assert migrated["storage"] == "binary"
+        assert await store.read(migrated) == PDF_BYTES
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_mongo_backend_round_trip()
+    test_local_backend_round_trip()
+    test_legacy_base64_reader_and_migration()
+    print("✅ Report store tests passed")
@@ -0,0 +1,104 @@
+"""
+Test Schema Inference
+Checks sampled dtype inference, per-chunk widening and the memory it saves on uploads
+"""
+
+import asyncio
+import io
+import math
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from app.ai_agents.csv_analysis_agent import CSVAnalysisAgent
+from app.ingestion.csv_stream import ingest_csv
+from app.ingestion.schema_inference import SCHEMA_SAMPLE_ROWS, compact_frame
+from app.storage.dataset_rows import RowGroupReader, RowQuery, parse_sort, query_rows
+from app.storage.dataset_store import read_dataset, write_dataset
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Walmart_Sales.csv")
+
+
+def test_walmart_columns_are_compacted():
+    with open(SAMPLE_CSV, "rb") as f:
+        compact = ingest_csv(f, rows_per_chunk=1000)
+        f.seek(0)
+        default = ingest_csv(f, rows_per_chunk=1000, compact=False)
+
+    types = {field.name: str(field.type) for field in compact.table.schema}
+    assert types["Store"] == types["Holiday_Flag"] == "int8"
+    assert types["Date"] == "timestamp[ns]" and types["Weekly_Sales"] == "double"
+    assert compact.schema["dates"] == {"Date": "%d-%m-%Y"}
+    assert compact.memory_usage_mb < default.memory_usage_mb
+
+    expected = pd.read_csv(SAMPLE_CSV)
+    parsed = compact.to_pandas()
+    assert (parsed["Date"] == pd.to_datetime(expected["Date"], dayfirst=True)).all()
+    assert (parsed["Store"] == expected["Store"]).all()
+    pd.testing.assert_series_equal(parsed["Weekly_Sales"], expected["Weekly_Sales"])
+
+
+def test_chunks_widen_and_keep_values_the_sample_missed():
+    rows = SCHEMA_SAMPLE_ROWS + 500
+    df = pd.DataFrame({
+        "Units": np.arange(rows) % 100,
+        "Region": np.array(["north", "south"])[np.arange(rows) % 2],
+        "Day": np.array(["13-01-2011", "03-01-2011"])[np.arange(rows) % 2],
+        # Fits day-first and month-first alike
+        "Ambiguous": np.array(["03-01-2011", "04-02-2011"])[np.arange(rows) % 2],
+    })
+    # Past the sample: a wider integer, a new category and a day in another layout
+    df.loc[rows - 1, "Units"] = 40000
+    df.loc[rows - 2, "Region"] = "east"
+    df.loc[rows - 3, "Day"] = "2011/01/03"
+    ingest = ingest_csv(io.BytesIO(df.to_csv(index=False).encode()), rows_per_chunk=2500)
+    table = ingest.table
+
+    # The reported schema is the one finally applied
+    assert ingest.schema == {"integers": {"Units": "int32"}, "categories": ["Region", "Ambiguous"],
+                             "dates": {}}
+    assert str(table.schema.field("Units").type) == "int32"
+    regions = table["Region"]
+    assert pa.types.is_dictionary(regions.type)
+    assert all(chunk.dictionary.equals(regions.chunk(regions.num_chunks - 1).dictionary) for chunk in regions.chunks)
+    assert table["Units"].to_pylist() == df["Units"].tolist()
+    assert table["Region"].to_pylist() == df["Region"].tolist()
+    # The late mismatch turns the whole column back into its original text
+    assert str(table.schema.field("Day").type) == "string"
+    assert table["Day"].to_pylist() == df["Day"].tolist()
+    assert table["Ambiguous"].to_pylist() == df["Ambiguous"].tolist()
+    assert table.num_rows == rows
+
+    # One dictionary per column: Arrow IPC files accept the table as is
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "data.arrow")
+        write_dataset(path, table, "arrow", "none", row_group_rows=4096)
+        assert read_dataset(path, "arrow", ["Region"], "none")["Region"].to_pylist() == df["Region"].tolist()
+        page = query_rows(RowGroupReader(path, "arrow"), RowQuery(sort=parse_sort("Region"), limit=1))
+        assert page["rows"][0]["Region"] == "east"
+
+
+def test_analysis_metadata_reports_compacted_memory():
+    with open(SAMPLE_CSV, "rb") as f:
+        payload = f.read()
+    default = pd.read_csv(io.BytesIO(payload))
+    compact, saved = compact_frame(default)
+    assert saved > 0
+    assert saved == default.memory_usage(deep=True).sum() - compact.memory_usage(deep=True).sum()
+
+    result = asyncio.run(CSVAnalysisAgent().analyze_csv_file(payload, "Walmart_Sales.csv", {"department": "sales"}))
+    metadata = result["metadata"]
+    # memory_usage_mb is measured after compaction, so it shows the saving
+    assert "memory_saved_mb" not in metadata
+    assert math.isclose(metadata["memory_usage_mb"], compact.memory_usage(deep=True).sum() / 1024 ** 2)
+    assert result["statistical_analysis"]["Store"]["max"] == 45.0
+
+
+if __name__ == "__main__":
+    test_walmart_columns_are_compacted()
+    test_chunks_widen_and_keep_values_the_sample_missed()
+    test_analysis_metadata_reports_compacted_memory()
+    print("✅ Schema inference tests passed")
@@ -0,0 +1,84 @@
+"""
+Test Single-Flight
+Checks that concurrent identical LLM analyses share one set of upstream calls
+"""
+
+import asyncio
+
+from app.core.singleflight import SingleFlight, flight_key
+from ai_models.groq_client import GroqClient
+from ai_models.llm_cache import LLMCache
+from benchmarks.fake_groq import FakeGroqServer
+from benchmarks.harness import load_app, make_client
+
+
+def test_concurrent_callers_share_one_call_and_its_errors():
+    calls = []
+
+    async def compute(value):
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        if value == "bad":
+            raise ValueError("upstream failed")
+        return {"value": value}
+
+    async def run():
+        flights = SingleFlight("test")
+        results = await asyncio.gather(*(flights.do("a", lambda: compute("a")) for _ in range(10)),
+                                       flights.do("b", lambda: compute("b")))
+        assert all(result is results[0] for result in results[:10])
+        assert results[10] == {"value": "b"}
+
+        errors = await asyncio.gather(*(flights.do("c", lambda: compute("bad")) for _ in range(3)),
+                                      return_exceptions=True)
+        assert all(isinstance(error, ValueError) for error in errors)
+
+        await flights.do("a", lambda: compute("a"))  # finished flights are not cached
+        return flights.stats()
+
+    stats = asyncio.run(run())
+    assert calls == ["a", "b", "bad", "a"]
+    assert stats["calls"] == 15 and stats["executions"] == 4 and stats["coalesced"] == 11
+    assert stats["in_flight"] == 0
+
+    assert flight_key("sales", {"a": 1, "b": 2}) == flight_key("sales", {"b": 2, "a": 1})
+    assert flight_key("sales", {"a": 1}) != flight_key("hr", {"a": 1})
+
+
+def test_fifty_concurrent_llama_analyses_make_one_set_of_upstream_calls():
+    main, _ = load_app()
+    agent = main.get_analysis_agent()
+    llama = agent.agent
+    saved = llama.__dict__.get("client"), llama.cache
+
+    async def run(server):
+        async with make_client(main.app) as client:
+            responses = await asyncio.gather(*(
+                client.post("/api/analytics/llama-analysis", json={"department": "sales"})
+                for _ in range(50)
+            ))
+        await llama.client.aclose()
+        return responses
+
+    with FakeGroqServer(latency=0.2) as server:
+        llama.client = GroqClient(api_key="fake-key", base_url=server.base_url, requests_per_minute=0)
+        llama.cache = LLMCache(store=None, enabled=False)
+        try:
+            responses = asyncio.run(run(server))
+        finally:
+            llama.client, llama.cache = saved
+            if saved[0] is None:
+                del llama.client
+
+    assert all(response.status_code == 200 for response in responses)
+    analyses = [response.json()["analysis"] for response in responses]
+    assert all(analysis == analyses[0] for analysis in analyses)
+    assert "partial" not in analyses[0]
+    # summary, trends, anomalies and recommendations: one call each for all 50 requests
+    assert server.request_count == 4
+
+
+if __name__ == "__main__":
+    test_concurrent_callers_share_one_call_and_its_errors()
+    test_fifty_concurrent_llama_analyses_make_one_set_of_upstream_calls()
+    print("✅ Single-flight tests passed")
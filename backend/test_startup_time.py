@@ -0,0 +1,54 @@
+"""
+Test Startup Time
+Guards the cold-start import budget of main using python -X importtime
+"""
+
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Cumulative time `import main` may take; raise it for slow CI hosts
+IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "2500"))
+IMPORT_ATTEMPTS = 3
+
+# Loaded on first use only; importing any of them at startup is a regression
+DEFERRED_PACKAGES = ("groq", "langchain", "langchain_groq", "sklearn", "scipy", "plotly", "jsonschema")
+
+
+def _import_main():
+    """Cumulative import time in microseconds for every module loaded by `import main`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_heavy_packages_are_not_imported_at_startup():
+    loaded = {name.split(".")[0] for name in _import_main()}
+
+    assert not loaded & set(DEFERRED_PACKAGES), sorted(loaded & set(DEFERRED_PACKAGES))
+
+
+def test_import_main_within_budget():
+    # Best of a few runs so a busy host doesn't fail the build
+    best = min(_import_main()["main"] / 1000 for _ in range(IMPORT_ATTEMPTS))
+
+    assert best <= IMPORT_BUDGET_MS, f"import main took {best:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
+
+
+if __name__ == "__main__":
+    test_heavy_packages_are_not_imported_at_startup()
+    test_import_main_within_budget()
+    print("✅ Startup time tests passed")
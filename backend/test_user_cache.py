@@ -0,0 +1,114 @@
+"""
+Test User Cache
+Checks TTL, LRU eviction, invalidation and hit-ratio accounting for get_current_user
+"""
+
+import asyncio
+import time
+
+from app.core.user_cache import UserCache
+
+
+def _loader(calls: list, user: dict):
+    async def load():
+        calls.append(user["id"])
+        return dict(user)
+    return load
+
+
+def test_hits_skip_the_loader_and_strip_secrets():
+    async def run():
+        cache = UserCache(ttl_seconds=60, max_entries=10, redis_url=None)
+        calls = []
+        user = {"id": "u1", "role": "admin", "departments": ["sales"],
+                "password": "hash", "refresh_token": "token"}
+
+        first = await cache.get_or_load("u1", _loader(calls, user))
+        for _ in range(7):
+            again = await cache.get_or_load("u1", _loader(calls, user))
+
+        assert calls == ["u1"]
+        assert "password" not in first and "refresh_token" not in first
+        again["departments"].append("hr")
+        assert (await cache.get_or_load("u1", _loader(calls, user)))["departments"] == ["sales"]
+
+        stats = cache.stats()
+        assert stats["misses"] == 1 and stats["hits"] == 8
+        assert stats["hit_ratio"] == round(8 / 9, 4)
+        assert stats["mongo_queries_saved_last_minute"] == 8
+
+    asyncio.run(run())
+
+
+def test_ttl_expiry_and_lru_eviction():
+    async def run():
+        cache = UserCache(ttl_seconds=0.05, max_entries=2, redis_url=None)
+        calls = []
+        for user_id in ("a", "b", "a", "c"):
+            await cache.get_or_load(user_id, _loader(calls, {"id": user_id}))
+        # "b" was least recently used when "c" arrived
+        await cache.get_or_load("b", _loader(calls, {"id": "b"}))
+        assert calls == ["a", "b", "c", "b"]
+        assert cache.stats()["evictions"] == 2
+
+        time.sleep(0.06)
+        await cache.get_or_load("c", _loader(calls, {"id": "c"}))
+        assert calls[-1] == "c"
+
+    asyncio.run(run())
+
+
+def test_invalidation_reloads_and_wins_over_in_flight_load():
+    async def run():
+        cache = UserCache(ttl_seconds=60, max_entries=10, redis_url=None)
+        calls = []
+        await cache.get_or_load("u1", _loader(calls, {"id": "u1", "role": "viewer"}))
+        await cache.invalidate("u1")
+        user = await cache.get_or_load("u1", _loader(calls, {"id": "u1", "role": "admin"}))
+        assert user["role"] == "admin"
+        assert len(calls) == 2
+
+        # A load that started before an invalidation must not be cached
+        release = asyncio.Event()
+
+        async def slow_load():
+            await release.wait()
+            return {"id": "u2", "role": "viewer"}
+
+        pending = asyncio.create_task(cache.get_or_load("u2", slow_load))
+        await asyncio.sleep(0)
+        await cache.invalidate("u2")
+        release.set()
+        assert (await pending)["role"] == "viewer"
+        fresh = await cache.get_or_load("u2", _loader(calls, {"id": "u2", "role": "manager"}))
+        assert fresh["role"] == "manager"
+
+    asyncio.run(run())
+
+
+def test_concurrent_misses_share_one_load():
+    async def run():
+        cache = UserCache(ttl_seconds=60, max_entries=10, redis_url=None)
+        calls = []
+
+        async def slow_load():
+            calls.append("u1")
+            await asyncio.sleep(0.01)
+            return {"id": "u1", "departments": ["sales"]}
+
+        users = await asyncio.gather(*[cache.get_or_load("u1", slow_load) for _ in range(8)])
+
+        assert calls == ["u1"]
+        assert all(user == {"id": "u1", "departments": ["sales"]} for user in users)
+        assert len({id(user) for user in users}) == 8
+        assert cache.stats()["coalesced"] == 7
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_hits_skip_the_loader_and_strip_secrets()
+    test_ttl_expiry_and_lru_eviction()
+    test_invalidation_reloads_and_wins_over_in_flight_load()
+    test_concurrent_misses_share_one_load()
+    print("✅ User cache tests passed")
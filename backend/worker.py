@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Report generation worker
+Claims queued report jobs from MongoDB and runs the report pipeline
+
+Run alongside the API with JOB_QUEUE_BACKEND=mongo. Each process has its own
+event loop, executors and MongoDB client, so throughput scales with cores.
+
+Usage:
+    python worker.py --processes 4
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def run_worker_process(index: int) -> None:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.jobs.queue import JobQueue
+    from main import process_report_job
+
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URI"))
+    db = client[os.getenv("MONGODB_DB_NAME", "report_generator")]
+    queue = JobQueue(db)
+    worker_id = f"{socket.gethostname()}-{os.getpid()}-{index}"
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await asyncio.gather(
+            queue.run_worker(process_report_job, worker_id, stop),
+            queue.run_stale_recovery(stop)
+        )
+    finally:
+        client.close()
+
+
+def worker_main(index: int) -> None:
+    asyncio.run(run_worker_process(index))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report generation worker")
+    parser.add_argument("--processes", type=int,
+                        default=int(os.getenv("JOB_WORKER_PROCESSES", str(os.cpu_count() or 1))),
+                        help="Number of worker processes to start")
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        worker_main(0)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=worker_main, args=(i,)) for i in range(args.processes)]
+    for process in processes:
+        process.start()
+    logger.info(f"🚀 Started {len(processes)} report worker processes")
+
+    def forward_signal(signum, frame):
+        for process in processes:
+            process.terminate()
+    signal.signal(signal.SIGTERM, forward_signal)
+
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()